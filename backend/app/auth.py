@@ -1,19 +1,40 @@
+import asyncio
+import multiprocessing
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 from typing import Optional
 
 import bcrypt
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.database import get_db
-from app.models.user import User
+from app.database import get_read_db, get_async_db
+from app.models.user import User, UserRole
 from app.schemas.user import TokenData
+from app.shared_cache import shared_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
+# 검증된 토큰 -> (user id, username, role). 캐시 적중 시 JWT 검증과 DB 조회를 모두 생략.
+# 워커끼리 공유하며 users 테이블이 바뀌면 (역할 변경, 삭제) 모든 워커에서 무효화된다
+user_cache = shared_cache.namespace(
+    "users", settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS, tables=("users",)
+)
+
+# 묶음 요청(app.routers.batch) 을 인증한 사용자. 하위 요청은 토큰을 다시 확인하지 않는다
+batch_user: ContextVar[Optional[User]] = ContextVar("batch_user", default=None)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(
@@ -25,10 +46,112 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return bcrypt.hashpw(
         password.encode('utf-8'),
-        bcrypt.gensalt()
+        bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     ).decode('utf-8')
 
 
+def needs_rehash(hashed_password: str) -> bool:
+    """True if the hash was made with a different cost than BCRYPT_ROUNDS"""
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated, size-limited process pool.
+
+    Requests waiting on bcrypt do not hold a Starlette threadpool thread.
+    When PASSWORD_HASH_MAX_PENDING jobs are already queued or running, new
+    ones are rejected straight away with 503 instead of queueing. A pool
+    whose worker died (OOM kill) is replaced and the job retried once.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.rejected = 0
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: 자식 프로세스는 bcrypt 만 import 하므로 gunicorn 워커에서도 안전
+                self._executor = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        with self._lock:
+            # 다른 요청이 이미 새 풀로 바꿨으면 그대로 둔다
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _submit(self, func, *args):
+        for _ in range(2):
+            executor = self._pool()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+            except BrokenProcessPool:
+                self._discard(executor)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Password hashing is restarting, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+    async def _run(self, func, *args):
+        if settings.PASSWORD_HASH_WORKERS <= 0:
+            return await run_in_threadpool(func, *args)
+
+        with self._lock:
+            if self.pending >= settings.PASSWORD_HASH_MAX_PENDING:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many concurrent logins, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self.pending += 1
+        try:
+            return await self._submit(func, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(
+            bcrypt.checkpw, plain_password.encode('utf-8'), hashed_password.encode('utf-8')
+        )
+
+    async def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+        hashed = await self._run(bcrypt.hashpw, password.encode('utf-8'), salt)
+        return hashed.decode('utf-8')
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": settings.PASSWORD_HASH_WORKERS,
+                "max_pending": settings.PASSWORD_HASH_MAX_PENDING,
+                "pending": self.pending,
+                "rejected": self.rejected,
+                "rounds": settings.BCRYPT_ROUNDS,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+password_hasher = PasswordHasher()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -40,29 +163,73 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _cached_user(token: str) -> Optional[User]:
+    cached = user_cache.get(token)
+    if cached is None:
+        return None
+    user_id, username, role = cached
+    return User(id=user_id, username=username, role=UserRole(role))
+
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
+            raise _credentials_exception()
+        TokenData(username=username)
     except JWTError:
-        raise credentials_exception
+        raise _credentials_exception()
+    return payload
 
-    user = db.query(User).filter(User.username == token_data.username).first()
+
+def _remember(token: str, payload: dict, user: Optional[User], versions: list) -> User:
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    # 토큰 만료 시각을 넘겨서 캐시에 남지 않도록 TTL 을 제한
+    user_cache.set(
+        token, (user.id, user.username, user.role.value),
+        ttl=payload.get("exp", 0) - time.time(), versions=versions,
+    )
     return user
 
 
+def get_current_user(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)
+) -> User:
+    user = batch_user.get() or _cached_user(token)
+    if user is not None:
+        return user
+
+    payload = _decode_token(token)
+    versions = user_cache.snapshot()
+    user = db.query(User).filter(User.username == payload["sub"]).first()
+    # 요청이 끝날 때까지 (스트리밍 업로드 동안) 읽기 커넥션을 붙잡지 않도록 바로 반납
+    db.close()
+    return _remember(token, payload, user, versions)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> User:
+    user = batch_user.get() or _cached_user(token)
+    if user is not None:
+        return user
+
+    payload = _decode_token(token)
+    versions = user_cache.snapshot()
+    user = (await db.execute(select(User).filter(User.username == payload["sub"]))).scalars().first()
+    return _remember(token, payload, user, versions)
+
+
 def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role.value != "admin":
         raise HTTPException(
@@ -72,6 +239,15 @@ def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     return current_user
 
 
+def get_metrics_scraper(
+    token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)
+) -> None:
+    """GET /metrics: the METRICS_TOKEN bearer token or an admin user's token"""
+    if settings.METRICS_TOKEN and secrets.compare_digest(token, settings.METRICS_TOKEN):
+        return
+    get_current_admin(get_current_user(token, db))
+
+
 def get_current_teacher_or_admin(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role.value not in ["admin", "teacher"]:
         raise HTTPException(
@@ -79,3 +255,9 @@ def get_current_teacher_or_admin(current_user: User = Depends(get_current_user))
             detail="Not enough permissions"
         )
     return current_user
+
+
+def get_current_teacher_or_admin_async(
+    current_user: User = Depends(get_current_user_async)
+) -> User:
+    return get_current_teacher_or_admin(current_user)
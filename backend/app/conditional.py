@@ -0,0 +1,58 @@
+"""Conditional GET from table versions (app.versions).
+
+Read routes declare the tables their response depends on:
+
+    @router.get("/dashboard", dependencies=[Depends(conditional("students", "grades"))])
+
+``conditional`` authenticates the request, derives an ETag and
+Last-Modified from those versions and answers a matching If-None-Match
+with 304 before the route opens a query. Last-Modified is informational
+only: with one-second resolution it cannot tell apart two writes in the
+same second, so If-Modified-Since is not used for 304s.
+"""
+import hashlib
+from datetime import date, datetime
+from email.utils import formatdate
+from typing import Callable, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from app.auth import get_current_user
+from app.versions import table_versions
+
+
+def _etag(request: Request, tables: Tuple[str, ...], today: Optional[date]) -> str:
+    key = "|".join((
+        table_versions.epoch, repr(table_versions.get(tables)), request.url.path,
+        request.url.query, request.headers.get("accept", ""), str(today or ""),
+    ))
+    return '"' + hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def conditional(*tables: str, daily: bool = False, auth: Callable = get_current_user) -> Callable:
+    """Dependency that sends ETag / Last-Modified for a response built from
+    ``tables`` and raises 304 when the client's copy is current. ``daily``
+    responses (anything using date.today()) also change at midnight."""
+    def check(request: Request, response: Response, current_user=Depends(auth)) -> None:
+        today = date.today() if daily else None
+        etag = _etag(request, tables, today)
+        modified = table_versions.modified(tables)
+        if today is not None:
+            modified = max(modified, datetime.combine(today, datetime.min.time()).timestamp())
+        headers = {
+            "ETag": etag,
+            "Last-Modified": formatdate(modified, usegmt=True),
+            "Cache-Control": "no-cache",
+        }
+        if _etag_matches(request.headers.get("if-none-match", ""), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
+    return check
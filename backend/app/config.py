@@ -6,6 +6,37 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_SIZE: int = 1024
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    BCRYPT_ROUNDS: int = 12
+    # 0 이면 기존처럼 요청 스레드에서 bcrypt 실행
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    # True 면 학생/출결/성적 라우터가 AsyncSession (sqlite 는 aiosqlite) 을 사용
+    ASYNC_DB: bool = False
+    # production: WAL 등 PRAGMA 적용, 읽기 커넥션 풀과 프로세스당 쓰기 커넥션 하나로 분리
+    SQLITE_PROFILE: str = "default"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 16384
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_READ_POOL_SIZE: int = 4
+    # True 면 단건 출결/성적 등록을 모아서 한 트랜잭션으로 커밋 (app.write_queue)
+    WRITE_COALESCE: bool = False
+    WRITE_BATCH_SIZE: int = 100
+    WRITE_BATCH_WINDOW_MS: float = 5.0
+    # 학생 자동완성 색인을 DB 에서 다시 읽는 주기 (다른 워커의 변경 반영, 0 이면 안 함)
+    SUGGEST_REFRESH_SECONDS: int = 60
+    # 워커 간 공유 캐시 (app.shared_cache): auto 는 SQLite 파일 DB 면 sqlite, 아니면 memory
+    CACHE_BACKEND: str = "auto"
+    CACHE_TTL_SECONDS: int = 300
+    STATS_CACHE_SIZE: int = 256
+    ROSTER_CACHE_SIZE: int = 64
+    # POST /api/batch 한 번에 실행할 수 있는 최대 하위 요청 수
+    BATCH_MAX_REQUESTS: int = 20
+    # 라우트별 요청 지표 수집과 GET /metrics (Prometheus 텍스트 형식)
+    METRICS_ENABLED: bool = True
+    # GET /metrics 의 Bearer 토큰 (스크레이퍼용); 비어 있으면 관리자 로그인 토큰만 허용
+    METRICS_TOKEN: str = ""
 
     class Config:
         env_file = ".env"
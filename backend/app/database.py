@@ -1,20 +1,170 @@
-from sqlalchemy import create_engine
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# 읽기 전용 요청은 읽기 커넥션 풀을 사용 (SQLITE_PROFILE=production 일 때만 분리됨)
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+# POST 이지만 조회만 하는 경로 (POST /api/batch)
+READ_PATHS = ("/api/batch",)
+
+# 묶음 요청(app.routers.batch) 안의 하위 요청이 함께 쓰는 세션
+batch_session: ContextVar[Optional[Session]] = ContextVar("batch_session", default=None)
+
+
+def _is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database not in (None, "", ":memory:")
+
+
+def sqlite_pragmas(read_only: bool = False) -> list:
+    """PRAGMA statements run on every new connection of the production profile"""
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA cache_size = -{settings.SQLITE_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size = {settings.SQLITE_MMAP_SIZE}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    else:
+        pragmas += ["PRAGMA journal_mode = WAL", "PRAGMA synchronous = NORMAL"]
+    return pragmas
+
+
+def configure_sqlite(engine, read_only: bool = False) -> None:
+    """Apply the production pragmas to ``engine``. Writers open transactions
+    with BEGIN IMMEDIATE, so a read-then-write request waits for the write lock
+    (busy_timeout) up front instead of failing with "database is locked" when
+    it later tries to upgrade its read lock."""
+    pragmas = sqlite_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # pysqlite 의 암묵적 BEGIN 을 끄고 트랜잭션 시작은 아래 begin 이벤트가 담당
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(connection):
+        connection.exec_driver_sql("BEGIN" if read_only else "BEGIN IMMEDIATE")
+
+
+def _create_engines(url: str):
+    """(writer, reader) engines; the same engine twice outside the production profile"""
+    if settings.SQLITE_PROFILE != "production" or not _is_sqlite_file(url):
+        writer = create_engine(url, connect_args={"check_same_thread": False})
+        return writer, writer
+
+    timeout = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+    # 프로세스당 쓰기 커넥션 하나: 프로세스 안의 쓰기는 풀에서, 프로세스 간 쓰기는 busy_timeout 으로 줄을 선다
+    writer = create_engine(
+        url, connect_args={"check_same_thread": False, "timeout": timeout},
+        pool_size=1, max_overflow=0, pool_timeout=timeout,
+    )
+    reader = create_engine(
+        url, connect_args={"check_same_thread": False, "timeout": timeout},
+        pool_size=settings.SQLITE_READ_POOL_SIZE, max_overflow=0, pool_timeout=timeout,
+    )
+    configure_sqlite(writer)
+    configure_sqlite(reader, read_only=True)
+    return writer, reader
+
+
+engine, read_engine = _create_engines(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
+# DATABASE_URL 에 드라이버가 지정되지 않았을 때 사용하는 비동기 드라이버
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg", "mysql": "aiomysql"}
+
+
+def get_db(request: Request):
+    shared = batch_session.get()
+    if shared is not None:
+        yield shared
+        return
+    read = request.method in READ_METHODS or request.url.path in READ_PATHS
+    factory = ReadSessionLocal if read else SessionLocal
+    db = factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
 
-def get_db():
-    db = SessionLocal()
+def get_read_db():
+    """Read session regardless of the request method (the auth lookup), so a
+    write request does not take the writer connection before it needs it"""
+    shared = batch_session.get()
+    if shared is not None:
+        yield shared
+        return
+    db = ReadSessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_session_factory() -> sessionmaker:
+    """Writer session factory for routes that open one short session per
+    batch (streaming imports) instead of holding one across awaits"""
+    return SessionLocal
+
+
+def run_in_session(factory: sessionmaker, func, *args):
+    """``func(db, *args)`` in a new session of ``factory``, closed afterwards"""
+    with factory() as db:
+        return func(db, *args)
+
+
+def begin_read_snapshot(db: Session) -> None:
+    """Start the read transaction of ``db`` now so every later query sees the
+    same snapshot. pysqlite only opens one before writes; the production read
+    engine already did in its begin event."""
+    connection = db.connection()
+    if connection.dialect.name == "sqlite" and not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql("BEGIN")
+
+
+def async_database_url(url: str) -> str:
+    """sqlite:///app.db -> sqlite+aiosqlite:///app.db; explicit drivers are kept"""
+    parsed = make_url(url)
+    if "+" in parsed.drivername or parsed.drivername not in ASYNC_DRIVERS:
+        return url
+    return parsed.set(
+        drivername=f"{parsed.drivername}+{ASYNC_DRIVERS[parsed.drivername]}"
+    ).render_as_string(hide_password=False)
+
+
+# ASYNC_DB 가 켜져 있을 때만 만든다 (비동기 드라이버는 선택 의존성)
+async_engine = None
+AsyncSessionLocal = None
+if settings.ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(async_database_url(settings.DATABASE_URL))
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if settings.SQLITE_PROFILE == "production" and _is_sqlite_file(settings.DATABASE_URL):
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def _async_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in sqlite_pragmas():
+                cursor.execute(pragma)
+            cursor.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
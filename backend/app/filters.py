@@ -0,0 +1,121 @@
+"""Query-string filters and ``include=student`` for the attendance and grade
+list and export routes.
+
+Each filter class is a FastAPI dependency (``Depends()``) whose ``apply``
+adds the matching predicates to a Query or select(). Attendance and grade
+columns are compared directly (date and status use ix_attendances_date_status,
+subject and score ix_grades_subject_score). Subject is a case-insensitive
+substring, as the grades page always matched it, resolved to subject names
+through the small grade_subject_rollups table; class and student name
+filters become one ``student_id IN (SELECT students.id ...)`` subquery,
+with names matched through the search index in ``app.search``.
+
+``with_student`` swaps the selected entity for its columns plus the
+student's name, number and class from one JOIN, so list rows carry them
+without a lazy load through ``Attendance.student`` / ``Grade.student``.
+"""
+from datetime import date
+from typing import Optional, Union
+
+from fastapi import Query as QueryParam
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Query, Session
+
+from app.models.attendance import Attendance, AttendanceStatus
+from app.models.grade import Grade
+from app.models.rollup import GradeSubjectRollup
+from app.models.student import Student
+from app.responses import row_columns
+from app import search
+
+INCLUDE_STUDENT = "student"
+
+
+def _filter_students(db: Session, query, student_column, class_name: Optional[str],
+                     student_name: Optional[str]):
+    if not class_name and not student_name:
+        return query
+    students = search.search(db, select(Student.id), {"name": student_name}, class_name=class_name)
+    return query.filter(student_column.in_(students.order_by(None)))
+
+
+def with_student(query: Union[Query, Select], model, include: Optional[str]) -> Union[Query, Select]:
+    """Rows of ``model`` columns with student_name, student_number and class_name
+    when ``include`` is "student"; ``query`` unchanged otherwise"""
+    if include != INCLUDE_STUDENT:
+        return query
+    columns = (
+        *row_columns(model),
+        Student.name.label("student_name"), Student.student_number, Student.class_name,
+    )
+    if isinstance(query, Select):
+        query = query.with_only_columns(*columns)
+    else:
+        query = query.with_entities(*columns)
+    return query.join(Student, Student.id == model.student_id)
+
+
+class AttendanceFilters:
+    def __init__(
+        self,
+        day: Optional[date] = QueryParam(None, alias="date", description="Exact date"),
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[AttendanceStatus] = None,
+        student_id: Optional[int] = None,
+        class_name: Optional[str] = None,
+        student_name: Optional[str] = QueryParam(None, description="Student name (초성 allowed)"),
+    ):
+        self.day = day
+        self.start_date = start_date
+        self.end_date = end_date
+        self.status = status
+        self.student_id = student_id
+        self.class_name = class_name
+        self.student_name = student_name
+
+    def apply(self, db: Session, query: Union[Query, Select]) -> Union[Query, Select]:
+        if self.day:
+            query = query.filter(Attendance.date == self.day)
+        if self.start_date:
+            query = query.filter(Attendance.date >= self.start_date)
+        if self.end_date:
+            query = query.filter(Attendance.date <= self.end_date)
+        if self.status:
+            query = query.filter(Attendance.status == self.status)
+        if self.student_id is not None:
+            query = query.filter(Attendance.student_id == self.student_id)
+        return _filter_students(db, query, Attendance.student_id, self.class_name, self.student_name)
+
+
+class GradeFilters:
+    def __init__(
+        self,
+        subject: Optional[str] = QueryParam(None, description="Subject (case-insensitive substring)"),
+        min_score: Optional[float] = None,
+        max_score: Optional[float] = None,
+        student_id: Optional[int] = None,
+        class_name: Optional[str] = None,
+        student_name: Optional[str] = QueryParam(None, description="Student name (초성 allowed)"),
+    ):
+        self.subject = subject
+        self.min_score = min_score
+        self.max_score = max_score
+        self.student_id = student_id
+        self.class_name = class_name
+        self.student_name = student_name
+
+    def apply(self, db: Session, query: Union[Query, Select]) -> Union[Query, Select]:
+        if self.subject:
+            # 부분 일치하는 과목명을 롤업 테이블에서 찾아 ix_grades_subject_score 로 조회
+            subjects = select(GradeSubjectRollup.subject).filter(
+                GradeSubjectRollup.subject.icontains(self.subject, autoescape=True)
+            )
+            query = query.filter(Grade.subject.in_(subjects))
+        if self.min_score is not None:
+            query = query.filter(Grade.score >= self.min_score)
+        if self.max_score is not None:
+            query = query.filter(Grade.score <= self.max_score)
+        if self.student_id is not None:
+            query = query.filter(Grade.student_id == self.student_id)
+        return _filter_students(db, query, Grade.student_id, self.class_name, self.student_name)
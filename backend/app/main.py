@@ -1,16 +1,58 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import engine, Base
-from app.routers import auth, students, attendance, grades, stats
+from app.auth import get_metrics_scraper, password_hasher
+from app.write_queue import write_queue
+from app.config import settings
+from app.database import engine, read_engine, async_engine, Base, SessionLocal, ReadSessionLocal
+from app.routers import auth, students, attendance, grades, stats, batch
+from app import metrics
+from app.rollups import ensure_rollups
+from app.migrations import upgrade
+from app.pagination import NEXT_CURSOR_HEADER
+from app.suggest import student_suggestions
+
+# Per-request query count and DB time (app.metrics)
+if settings.METRICS_ENABLED:
+    for instrumented in (engine, read_engine):
+        metrics.instrument_engine(instrumented)
+    if async_engine is not None:
+        metrics.instrument_engine(async_engine.sync_engine)
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+upgrade(engine)
+
+# Build statistics rollups for databases created before they existed
+with SessionLocal() as db:
+    ensure_rollups(db)
+
+# Student picker autocomplete index
+with ReadSessionLocal() as db:
+    student_suggestions.load(db)
+
+if settings.ASYNC_DB:
+    from app.routers import students_async as students
+    from app.routers import attendance_async as attendance
+    from app.routers import grades_async as grades
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    password_hasher.shutdown()
+    write_queue.shutdown()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
 app = FastAPI(
     title="Student Management System",
     description="API for attendance and grade management",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -20,14 +62,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Request metrics; added last so it wraps the other middleware too
+if settings.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(students.router)
 app.include_router(attendance.router)
 app.include_router(grades.router)
 app.include_router(stats.router)
+app.include_router(batch.router)
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, dependencies=[Depends(get_metrics_scraper)])
 
 
 @app.get("/")
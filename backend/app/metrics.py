@@ -0,0 +1,227 @@
+"""Per-route request metrics in Prometheus text format (GET /metrics).
+
+``MetricsMiddleware`` is a plain ASGI middleware (no BaseHTTPMiddleware
+task or body buffering). For every HTTP request it records, per method,
+route template (``/api/students/{student_id}``, not the raw path) and
+status code:
+
+- request count and latency histogram
+- response body size histogram
+- DB time histogram and query count, from cursor events on the engines in
+  app.database (``instrument_engine``), summed per request through a
+  context variable that the threadpool copies into sync routes
+
+plus a gauge of requests in flight per method (the route is only known
+once routing has finished). Everything is kept in plain dicts and lists
+touched only from the event loop thread, so recording costs a few dict
+lookups and three bisects. Requests made by POST /api/batch are recorded
+as requests of their own route as well.
+
+Values are per worker process; with several gunicorn workers each scrape
+sees the worker that served it. Scrapes need ``Authorization: Bearer
+<METRICS_TOKEN>`` or, like the other stats endpoints, an admin's token
+(``auth.get_metrics_scraper``).
+
+    python -m benchmarks.bench_metrics   # middleware overhead per request
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Response
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10_000, 100_000, 1_000_000, 10_000_000)
+# 라우트에 매칭되지 않은 요청 (404 등) 의 route 레이블; 임의 경로로 시계열이 늘지 않게 한다
+UNMATCHED_ROUTE = "<unmatched>"
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 요청 하나의 [쿼리 수, DB 시간(초)]; 미들웨어 밖(시작 시 적재, 쓰기 스레드)에서는 None
+_request_db: ContextVar[Optional[List]] = ContextVar("request_db", default=None)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def lines(self, name: str, labels: str) -> List[str]:
+        lines = []
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {total}')
+        total += self.counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {total}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {total}")
+        return lines
+
+
+class RouteSeries:
+    __slots__ = ("latency", "size", "db_time", "db_queries")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.db_queries = 0
+
+
+class Metrics:
+    def __init__(self):
+        self.series: Dict[Tuple[str, str, int], RouteSeries] = {}
+        self.in_flight: Dict[str, int] = {}
+        # 요청 밖에서 실행된 쿼리 (쓰기 스레드, 시작 시 작업); 여러 스레드에서 더하므로 잠금
+        self._background_lock = threading.Lock()
+        self.background_queries = 0
+        self.background_db_time = 0.0
+
+    def record(self, method: str, route: str, status: int, seconds: float, size: int,
+               db_queries: int, db_time: float) -> None:
+        key = (method, route, status)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = RouteSeries()
+        series.latency.observe(seconds)
+        series.size.observe(size)
+        series.db_time.observe(db_time)
+        series.db_queries += db_queries
+
+    def record_background(self, seconds: float) -> None:
+        with self._background_lock:
+            self.background_queries += 1
+            self.background_db_time += seconds
+
+    def clear(self) -> None:
+        self.series.clear()
+        with self._background_lock:
+            self.background_queries = 0
+            self.background_db_time = 0.0
+
+    def render(self) -> str:
+        """All metrics in Prometheus text exposition format"""
+        series = sorted(self.series.items())
+        lines = [
+            "# HELP http_requests_total Requests by method, route template and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        labelled = [
+            (f'method="{method}",route="{_escape(route)}",status="{status}"', entry)
+            for (method, route, status), entry in series
+        ]
+        lines += [f"http_requests_total{{{labels}}} {sum(entry.latency.counts)}" for labels, entry in labelled]
+        for name, kind, help_text, attribute in (
+            ("http_request_duration_seconds", "histogram", "Request latency.", "latency"),
+            ("http_response_size_bytes", "histogram", "Response body size.", "size"),
+            ("http_request_db_seconds", "histogram", "Time spent in SQL per request.", "db_time"),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for labels, entry in labelled:
+                lines += getattr(entry, attribute).lines(name, labels)
+        lines += [
+            "# HELP http_request_db_queries_total SQL statements run by requests.",
+            "# TYPE http_request_db_queries_total counter",
+        ]
+        lines += [f"http_request_db_queries_total{{{labels}}} {entry.db_queries}" for labels, entry in labelled]
+        lines += [
+            "# HELP http_requests_in_flight Requests being handled.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        lines += [f'http_requests_in_flight{{method="{method}"}} {count}'
+                  for method, count in sorted(self.in_flight.items())]
+        lines += [
+            "# HELP db_background_queries_total SQL statements run outside requests.",
+            "# TYPE db_background_queries_total counter",
+            f"db_background_queries_total {self.background_queries}",
+            "# HELP db_background_seconds_total Time spent in SQL outside requests.",
+            "# TYPE db_background_seconds_total counter",
+            f"db_background_seconds_total {self.background_db_time}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.metrics = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.metrics
+        method = scope["method"]
+        registry.in_flight[method] = registry.in_flight.get(method, 0) + 1
+        db = [0, 0.0]
+        token = _request_db.set(db)
+        response = [500, 0]
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                response[1] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - started
+            _request_db.reset(token)
+            registry.in_flight[method] -= 1
+            route = scope.get("route")
+            registry.record(
+                method, getattr(route, "path", UNMATCHED_ROUTE), response[0], seconds, response[1],
+                db[0], db[1],
+            )
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["metrics_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("metrics_started", time.perf_counter())
+    db = _request_db.get()
+    if db is None:
+        metrics.record_background(elapsed)
+        return
+    db[0] += 1
+    db[1] += elapsed
+
+
+def instrument_engine(engine) -> None:
+    """Count statements and time spent in SQL on ``engine`` (sync or the
+    sync_engine of an async engine)"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+router = APIRouter(tags=["metrics"])
+
+
+# app.main 이 auth.get_metrics_scraper 를 의존성으로 붙여 등록한다
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(metrics.render(), media_type=PROMETHEUS_TYPE)
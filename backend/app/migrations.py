@@ -0,0 +1,148 @@
+"""Schema upgrades for databases created by older versions.
+
+``Base.metadata.create_all`` only creates missing tables, so indexes added
+to existing tables later, and the student search tables, are created here,
+and indexes the models no longer declare are dropped.
+Run at startup after create_all, or by hand:
+
+    python -m app.migrations
+
+A unique index is never built over duplicate rows: ``upgrade`` raises
+DuplicateRowsError instead, and the duplicates are removed (all but the
+newest row per key) only by the explicit command
+
+    python -m app.migrations dedupe --dry-run          # report only
+    python -m app.migrations dedupe --backup rows.ndjson
+"""
+import json
+import sys
+from typing import Dict, List, Optional, TextIO
+
+from sqlalchemy import delete, func, inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.attendance import Attendance
+from app.models.grade import Grade
+from app.search import ensure_search_index
+
+# 유니크 인덱스 -> (모델, 키 열). 인덱스를 만들기 전에 중복 행이 없어야 한다
+DEDUPE_BEFORE = {
+    "uq_grades_student_subject": (Grade, (Grade.student_id, Grade.subject)),
+    "uq_attendances_student_date": (Attendance, (Attendance.student_id, Attendance.date)),
+}
+
+
+class DuplicateRowsError(RuntimeError):
+    """Duplicate rows block a unique index; run ``python -m app.migrations dedupe``"""
+
+
+def _duplicates(model, key):
+    """Rows that are not the newest of their key"""
+    newest = select(func.max(model.id)).group_by(*key)
+    return select(model.__table__).where(model.id.not_in(newest)).order_by(model.id)
+
+
+def count_duplicates(db: Session, index_name: str) -> int:
+    model, key = DEDUPE_BEFORE[index_name]
+    return db.scalar(select(func.count()).select_from(_duplicates(model, key).subquery()))
+
+
+def dedupe(db: Session, backup: Optional[TextIO] = None, dry_run: bool = False) -> Dict[str, int]:
+    """Remove all but the newest row per key of every DEDUPE_BEFORE index,
+    writing each removed row to ``backup`` as an NDJSON line
+    ({"table": ..., "row": {...}}); returns rows removed per table"""
+    from app.rollups import rebuild_rollups
+
+    removed = {}
+    for model, key in DEDUPE_BEFORE.values():
+        rows = db.execute(_duplicates(model, key)).mappings().all()
+        removed[model.__tablename__] = len(rows)
+        if backup is not None:
+            for row in rows:
+                backup.write(json.dumps({"table": model.__tablename__, "row": dict(row)}, default=str) + "\n")
+        if rows and not dry_run:
+            ids = [row["id"] for row in rows]
+            db.execute(delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False))
+    if dry_run:
+        db.rollback()
+    elif any(removed.values()):
+        db.commit()
+        rebuild_rollups(db)
+    return removed
+
+
+# 다른 인덱스가 앞부분 열로 대신하는, 예전 버전이 만든 인덱스
+OBSOLETE_INDEXES = {
+    "attendances": ("ix_attendances_date",),  # ix_attendances_date_status (date, status)
+}
+
+
+def upgrade(engine: Engine) -> List[str]:
+    """Create every model index missing from the database and drop
+    OBSOLETE_INDEXES; returns the names of the created indexes. Raises
+    DuplicateRowsError when existing rows would violate a new unique index."""
+    inspector = inspect(engine)
+    created = []
+    with Session(engine) as db:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name in existing:
+                    continue
+                if index.name in DEDUPE_BEFORE:
+                    duplicates = count_duplicates(db, index.name)
+                    db.rollback()
+                    if duplicates:
+                        raise DuplicateRowsError(
+                            f"{duplicates} duplicate rows in {table.name} block the unique index "
+                            f"{index.name}; review them with `python -m app.migrations dedupe --dry-run` "
+                            f"and remove them with `python -m app.migrations dedupe --backup <file>`"
+                        )
+                index.create(bind=engine, checkfirst=True)
+                created.append(index.name)
+            for name in OBSOLETE_INDEXES.get(table.name, ()):
+                if name in existing:
+                    with engine.begin() as connection:
+                        connection.execute(text(f"DROP INDEX {name}"))
+    return created + ensure_search_index(engine)
+
+
+def main(argv: List[str]) -> int:
+    from app.database import SessionLocal, engine
+
+    usage = "usage: python -m app.migrations [dedupe (--dry-run | --backup FILE)]"
+    Base.metadata.create_all(bind=engine)
+    if not argv:
+        try:
+            names = upgrade(engine)
+        except DuplicateRowsError as error:
+            print(error)
+            return 1
+        print(f"Created indexes: {', '.join(names)}" if names else "Indexes are up to date")
+        return 0
+
+    if argv == ["dedupe", "--dry-run"]:
+        backup, dry_run = sys.stdout, True
+    elif len(argv) == 3 and argv[:2] == ["dedupe", "--backup"]:
+        backup, dry_run = open(argv[2], "x", encoding="utf-8"), False
+    else:
+        print(usage)
+        return 2
+    try:
+        with SessionLocal() as db:
+            removed = dedupe(db, backup, dry_run)
+    finally:
+        if backup is not sys.stdout:
+            backup.close()
+    verb = "Would remove" if dry_run else "Removed"
+    for table, count in removed.items():
+        print(f"{verb} {count} duplicate {table} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,3 +2,7 @@ from app.models.user import User
 from app.models.student import Student
 from app.models.attendance import Attendance
 from app.models.grade import Grade
+from app.models.rollup import AttendanceDailyRollup, GradeSubjectRollup
+
+# 학생 검색 색인(FTS5) 테이블과 동기화 이벤트 등록
+from app import search  # noqa: E402,F401
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 
@@ -13,6 +13,12 @@ class AttendanceStatus(str, enum.Enum):
 
 class Attendance(Base):
     __tablename__ = "attendances"
+    __table_args__ = (
+        # 학생당 하루 한 건 (중복 출결 확인, 학생별 조회)
+        Index("uq_attendances_student_date", "student_id", "date", unique=True),
+        # 일자별 상태 집계
+        Index("ix_attendances_date_status", "date", "status"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
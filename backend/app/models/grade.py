@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -6,6 +6,12 @@ from app.database import Base
 
 class Grade(Base):
     __tablename__ = "grades"
+    __table_args__ = (
+        # 학생당 과목별 성적은 하나 (일괄 등록 upsert 의 충돌 키)
+        Index("uq_grades_student_subject", "student_id", "subject", unique=True),
+        # 과목별 목록과 점수 구간 필터
+        Index("ix_grades_subject_score", "subject", "score"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("students.id"), nullable=False)
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Float, Date, Enum
+
+from app.database import Base
+from app.models.attendance import AttendanceStatus
+
+
+class AttendanceDailyRollup(Base):
+    """Attendance counts per (date, class, status), kept in sync by app.rollups"""
+    __tablename__ = "attendance_daily_rollups"
+
+    date = Column(Date, primary_key=True)
+    class_name = Column(String(50), primary_key=True)
+    status = Column(Enum(AttendanceStatus), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class GradeSubjectRollup(Base):
+    """Score aggregates per (subject, class), kept in sync by app.rollups"""
+    __tablename__ = "grade_subject_rollups"
+
+    subject = Column(String(50), primary_key=True)
+    class_name = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0.0)
+    score_sq_sum = Column(Float, nullable=False, default=0.0)
+    min_score = Column(Float)
+    max_score = Column(Float)
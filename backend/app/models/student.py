@@ -10,7 +10,7 @@ class Student(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     student_number = Column(String(20), unique=True, index=True, nullable=False)
-    class_name = Column(String(50), nullable=False)
+    class_name = Column(String(50), index=True, nullable=False)
 
     attendances = relationship("Attendance", back_populates="student", cascade="all, delete-orphan")
     grades = relationship("Grade", back_populates="student", cascade="all, delete-orphan")
@@ -0,0 +1,124 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+Pages are ordered by a unique tuple of columns, e.g. (id) or (date, id).
+The next page starts strictly after the last row of the current one,
+``WHERE (date, id) > (:date, :id)``, so it is an index range scan whose
+cost does not grow with the page number. The opaque cursor for the next
+page is returned in the ``X-Next-Cursor`` response header, which keeps
+the response bodies plain lists. The legacy ``skip`` offset still works.
+"""
+import base64
+import json
+from datetime import date
+from typing import List, Optional
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import Integer, Select, column, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _to_json(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _from_json(column, value):
+    if column.type.python_type is date:
+        return date.fromisoformat(value)
+    return column.type.python_type(value)
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        return [_from_json(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _page_query(query, cursor: Optional[str], skip: int, limit: int, columns):
+    """Apply the keyset filter, ordering and limit + 1 to a Query or a Select"""
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        if len(columns) > 1:
+            query = query.filter(tuple_(*columns) > tuple(values))
+        else:
+            query = query.filter(columns[0] > values[0])
+    query = query.order_by(*columns)
+    if skip:
+        query = query.offset(skip)
+    return query.limit(limit + 1)
+
+
+def _trim_page(rows: List, response: Response, limit: int, columns) -> List:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last, column.key) for column in columns]
+        )
+    return rows
+
+
+def paginate(query: Query, response: Response, cursor: Optional[str], skip: int,
+             limit: int, *columns) -> List:
+    """Return one page of ``query`` ordered by ``columns`` and set the next cursor header"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    rows = _page_query(query, cursor, skip, limit, columns).all()
+    return _trim_page(rows, response, limit, columns)
+
+
+def paginate_offset(query: Query, response: Response, cursor: Optional[str], skip: int,
+                    limit: int) -> List:
+    """Page through an already ordered ``query`` by offset, e.g. search results
+    ranked by relevance, which have no unique key to seek on. The cursor then
+    carries the next offset."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    skip = _offset(cursor, skip)
+    return _trim_offset_page(query.offset(skip).limit(limit + 1).all(), response, skip, limit)
+
+
+def _offset(cursor: Optional[str], skip: int) -> int:
+    if cursor:
+        (skip,) = decode_cursor(cursor, [column("offset", Integer)])
+    return skip
+
+
+def _trim_offset_page(rows: List, response: Response, skip: int, limit: int) -> List:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([skip + limit])
+    return rows
+
+
+async def paginate_async(db: AsyncSession, statement: Select, response: Response,
+                         cursor: Optional[str], skip: int, limit: int, *columns) -> List:
+    """``paginate`` for a ``select()`` of one ORM entity, or of columns, on an AsyncSession"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    result = await db.execute(_page_query(statement, cursor, skip, limit, columns))
+    rows = result.scalars().all() if len(statement.column_descriptions) == 1 else result.all()
+    return _trim_page(list(rows), response, limit, columns)
+
+
+async def paginate_offset_async(db: AsyncSession, statement: Select, response: Response,
+                                cursor: Optional[str], skip: int, limit: int) -> List:
+    """``paginate_offset`` for a ``select()`` of ORM entities on an AsyncSession"""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    skip = _offset(cursor, skip)
+    rows = (await db.execute(statement.offset(skip).limit(limit + 1))).scalars().all()
+    return _trim_offset_page(list(rows), response, skip, limit)
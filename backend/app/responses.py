@@ -0,0 +1,123 @@
+"""Fast JSON path and compact formats for large read-only lists.
+
+List routes select plain column tuples (``row_columns``) instead of ORM
+entities and ``list_response`` encodes them with orjson straight into the
+response body. That skips identity-map hydration, per-row Pydantic
+validation and the stdlib encoder; the route's ``response_model`` still
+documents the default shape. Columns must already be in their JSON form
+apart from what orjson handles natively (dates, enums).
+
+``?format=columns`` (or ``Accept: application/vnd.columns+json``) returns
+one array per column instead of one object per row, with the repetitive
+status / subject / class_name values dictionary-encoded:
+
+    {"length": 2,
+     "columns": {"id": [1, 2], "date": ["2024-03-04", "2024-03-04"], "status": [0, 1]},
+     "dictionaries": {"status": ["출석", "지각"]}}
+
+``?format=msgpack`` (or ``Accept: application/msgpack``) is the same
+document as MessagePack, with dates as ISO strings.
+
+``cached_page`` / ``cache_page`` keep a page of rows and its next cursor
+in an app.shared_cache namespace, before encoding, so every format is
+served from the same entry.
+
+    python -m benchmarks.bench_serialize   # compare the paths and formats
+"""
+from collections import namedtuple
+from datetime import date
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+import msgpack
+import orjson
+from fastapi import Header, Query, Response
+
+from app.pagination import NEXT_CURSOR_HEADER
+
+COLUMNS_TYPE = "application/vnd.columns+json"
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+# 값 종류가 적어 사전 인코딩하는 컬럼
+DICTIONARY_COLUMNS = ("status", "subject", "class_name")
+
+
+def row_columns(model) -> tuple:
+    """Every column of ``model``'s table, to select rows instead of entities"""
+    return tuple(model.__table__.columns)
+
+
+def list_format(
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(json|columns|msgpack)$",
+                               description="json (default), columns or msgpack"),
+    accept: str = Header(""),
+) -> str:
+    """Response format from ``?format=`` or, failing that, the Accept header"""
+    if fmt:
+        return fmt
+    accepted = {value.split(";")[0].strip().lower() for value in accept.split(",")}
+    if accepted & set(MSGPACK_TYPES):
+        return "msgpack"
+    if COLUMNS_TYPE in accepted:
+        return "columns"
+    return "json"
+
+
+def columnar(rows: Sequence) -> dict:
+    """Column arrays of ``rows``, DICTIONARY_COLUMNS replaced by indexes into
+    ``dictionaries``"""
+    keys = rows[0]._fields if rows else ()
+    columns = {}
+    dictionaries = {}
+    for key, values in zip(keys, zip(*rows)):
+        if key in DICTIONARY_COLUMNS:
+            codes = {}
+            columns[key] = [codes.setdefault(value, len(codes)) for value in values]
+            dictionaries[key] = list(codes)
+        else:
+            columns[key] = list(values)
+    return {"length": len(rows), "columns": columns, "dictionaries": dictionaries}
+
+
+def _msgpack_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def list_response(rows: Sequence, response: Response, fmt: str = "json") -> Response:
+    """Encode column rows in ``fmt``, keeping the headers (e.g. X-Next-Cursor)
+    already set on the route's ``response``"""
+    headers = {**response.headers, "Vary": "Accept"}
+    if fmt == "columns":
+        return Response(orjson.dumps(columnar(rows)), media_type=COLUMNS_TYPE, headers=headers)
+    if fmt == "msgpack":
+        body = msgpack.packb(columnar(rows), default=_msgpack_default)
+        return Response(body, media_type=MSGPACK_TYPES[0], headers=headers)
+    keys = rows[0]._fields if rows else ()
+    body = orjson.dumps([dict(zip(keys, row)) for row in rows])
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@lru_cache(maxsize=None)
+def _row_type(fields: tuple):
+    return namedtuple("Row", fields)
+
+
+def cached_page(namespace, key, response: Response) -> Optional[List]:
+    """Rows cached under ``key``, with the next cursor header restored; None on a miss"""
+    page = namespace.get(key)
+    if page is None:
+        return None
+    if page["next"]:
+        response.headers[NEXT_CURSOR_HEADER] = page["next"]
+    row = _row_type(tuple(page["fields"]))
+    return [row(*values) for values in page["rows"]]
+
+
+def cache_page(namespace, key, response: Response, rows: Sequence, versions: list) -> None:
+    """Store ``rows`` (column tuples) and the next cursor read under ``versions``"""
+    namespace.set(key, {
+        "fields": list(rows[0]._fields) if rows else [],
+        "rows": [list(row) for row in rows],
+        "next": response.headers.get(NEXT_CURSOR_HEADER),
+    }, versions=versions)
@@ -0,0 +1,326 @@
+"""Incrementally maintained rollup tables for attendance and grade statistics.
+
+The write routes call these helpers inside their own transaction so the
+rollups always commit (or roll back) together with the base rows. Stats
+reads then scan classes x days rollup rows instead of every attendance
+and grade record.
+
+    python -m app.rollups rebuild   # recompute all rollups from base tables
+    python -m app.rollups check     # compare rollups with a full recompute
+"""
+import math
+import sys
+from collections import Counter
+from datetime import date
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.attendance import Attendance, AttendanceStatus
+from app.models.grade import Grade
+from app.models.rollup import AttendanceDailyRollup, GradeSubjectRollup
+from app.models.student import Student
+from app.versions import table_versions
+
+
+def _shift_attendance(db: Session, class_name: str, day: date,
+                      status_value: AttendanceStatus, delta: int) -> None:
+    key = (
+        AttendanceDailyRollup.date == day,
+        AttendanceDailyRollup.class_name == class_name,
+        AttendanceDailyRollup.status == status_value,
+    )
+    result = db.execute(
+        update(AttendanceDailyRollup).where(*key).values(
+            count=AttendanceDailyRollup.count + delta
+        )
+    )
+    if result.rowcount == 0:
+        if delta > 0:
+            db.execute(insert(AttendanceDailyRollup).values(
+                date=day, class_name=class_name, status=status_value, count=delta
+            ))
+    elif delta < 0:
+        db.execute(delete(AttendanceDailyRollup).where(*key, AttendanceDailyRollup.count <= 0))
+
+
+def _add_scores(db: Session, class_name: str, subject: str, count: int,
+                total: float, squares: float, low: float, high: float) -> None:
+    rollup = GradeSubjectRollup
+    result = db.execute(
+        update(rollup).where(
+            rollup.subject == subject, rollup.class_name == class_name
+        ).values(
+            count=rollup.count + count,
+            score_sum=rollup.score_sum + total,
+            score_sq_sum=rollup.score_sq_sum + squares,
+            min_score=case((rollup.min_score <= low, rollup.min_score), else_=low),
+            max_score=case((rollup.max_score >= high, rollup.max_score), else_=high),
+        )
+    )
+    if result.rowcount == 0:
+        db.execute(insert(rollup).values(
+            subject=subject, class_name=class_name, count=count, score_sum=total,
+            score_sq_sum=squares, min_score=low, max_score=high
+        ))
+
+
+def _remove_scores(db: Session, class_name: str, subject: str, count: int,
+                   total: float, squares: float, *exclude) -> None:
+    """Subtract scores and re-derive min/max from the rows that remain.
+
+    ``exclude`` filters out the grade rows being removed, so this can run
+    before the base rows are deleted or changed.
+    """
+    rollup = GradeSubjectRollup
+    key = (rollup.subject == subject, rollup.class_name == class_name)
+    low, high = db.query(func.min(Grade.score), func.max(Grade.score)).join(
+        Student, Student.id == Grade.student_id
+    ).filter(
+        Student.class_name == class_name, Grade.subject == subject, *exclude
+    ).one()
+    db.execute(
+        update(rollup).where(*key).values(
+            count=rollup.count - count,
+            score_sum=rollup.score_sum - total,
+            score_sq_sum=rollup.score_sq_sum - squares,
+            min_score=low,
+            max_score=high,
+        )
+    )
+    db.execute(delete(rollup).where(*key, rollup.count <= 0))
+
+
+def add_attendance(db: Session, class_name: str, attendance: Attendance) -> None:
+    _shift_attendance(db, class_name, attendance.date, attendance.status, 1)
+
+
+def add_attendance_rows(db: Session, rows: Iterable[Tuple[str, date, AttendanceStatus]]) -> None:
+    """Add many (class_name, date, status) rows with one statement per rollup group"""
+    for (class_name, day, status_value), count in Counter(rows).items():
+        _shift_attendance(db, class_name, day, status_value, count)
+
+
+def remove_attendance(db: Session, class_name: str, attendance: Attendance) -> None:
+    _shift_attendance(db, class_name, attendance.date, attendance.status, -1)
+
+
+def add_grade(db: Session, class_name: str, subject: str, score: float) -> None:
+    _add_scores(db, class_name, subject, 1, score, score * score, score, score)
+
+
+def remove_grade(db: Session, class_name: str, grade: Grade) -> None:
+    """Call before ``grade`` is deleted or modified"""
+    _remove_scores(
+        db, class_name, grade.subject, 1, grade.score, grade.score * grade.score,
+        Grade.id != grade.id
+    )
+
+
+def apply_grade_changes(db: Session, added: Iterable[Tuple[str, str, float]],
+                        removed: Iterable[Tuple[str, str, float]] = ()) -> None:
+    """Apply many (class_name, subject, score) additions and removals at once.
+
+    Call after the base rows have been written: min/max of every touched
+    group are re-derived from the grades table with one grouped query.
+    """
+    deltas = {}
+    for sign, rows in ((1, added), (-1, removed)):
+        for class_name, subject, score in rows:
+            delta = deltas.setdefault((class_name, subject), [0, 0.0, 0.0])
+            delta[0] += sign
+            delta[1] += sign * score
+            delta[2] += sign * score * score
+    if not deltas:
+        return
+
+    class_names = {class_name for class_name, _ in deltas}
+    subjects = {subject for _, subject in deltas}
+    extremes = {
+        (class_name, subject): (low, high)
+        for class_name, subject, low, high in db.query(
+            Student.class_name, Grade.subject, func.min(Grade.score), func.max(Grade.score)
+        ).join(Student, Student.id == Grade.student_id).filter(
+            Student.class_name.in_(class_names), Grade.subject.in_(subjects)
+        ).group_by(Student.class_name, Grade.subject)
+    }
+
+    rollup = GradeSubjectRollup
+    for (class_name, subject), (count, total, squares) in deltas.items():
+        key = (rollup.subject == subject, rollup.class_name == class_name)
+        low, high = extremes.get((class_name, subject), (None, None))
+        result = db.execute(
+            update(rollup).where(*key).values(
+                count=rollup.count + count,
+                score_sum=rollup.score_sum + total,
+                score_sq_sum=rollup.score_sq_sum + squares,
+                min_score=low,
+                max_score=high,
+            )
+        )
+        if result.rowcount == 0 and count > 0:
+            db.execute(insert(rollup).values(
+                subject=subject, class_name=class_name, count=count, score_sum=total,
+                score_sq_sum=squares, min_score=low, max_score=high
+            ))
+        elif count < 0:
+            db.execute(delete(rollup).where(*key, rollup.count <= 0))
+
+
+def _student_attendance_groups(db: Session, student_id: int):
+    return db.query(
+        Attendance.date, Attendance.status, func.count(Attendance.id)
+    ).filter(Attendance.student_id == student_id).group_by(
+        Attendance.date, Attendance.status
+    ).all()
+
+
+def _student_grade_groups(db: Session, student_id: int):
+    return db.query(
+        Grade.subject,
+        func.count(Grade.id),
+        func.sum(Grade.score),
+        func.sum(Grade.score * Grade.score),
+        func.min(Grade.score),
+        func.max(Grade.score),
+    ).filter(Grade.student_id == student_id).group_by(Grade.subject).all()
+
+
+def remove_student(db: Session, student: Student) -> None:
+    """Subtract all of a student's rows. Call before they are deleted"""
+    for day, status_value, count in _student_attendance_groups(db, student.id):
+        _shift_attendance(db, student.class_name, day, status_value, -count)
+    for subject, count, total, squares, _, _ in _student_grade_groups(db, student.id):
+        _remove_scores(
+            db, student.class_name, subject, count, total, squares,
+            Grade.student_id != student.id
+        )
+
+
+def move_student(db: Session, student: Student, new_class_name: str) -> None:
+    """Re-file a student's rows under a new class. Call before the update"""
+    attendance_groups = _student_attendance_groups(db, student.id)
+    grade_groups = _student_grade_groups(db, student.id)
+    remove_student(db, student)
+    for day, status_value, count in attendance_groups:
+        _shift_attendance(db, new_class_name, day, status_value, count)
+    for subject, count, total, squares, low, high in grade_groups:
+        _add_scores(db, new_class_name, subject, count, total, squares, low, high)
+
+
+def _attendance_recompute():
+    return select(
+        Attendance.date, Student.class_name, Attendance.status, func.count(Attendance.id)
+    ).join(Student, Student.id == Attendance.student_id).group_by(
+        Attendance.date, Student.class_name, Attendance.status
+    )
+
+
+def _grade_recompute():
+    return select(
+        Grade.subject,
+        Student.class_name,
+        func.count(Grade.id),
+        func.sum(Grade.score),
+        func.sum(Grade.score * Grade.score),
+        func.min(Grade.score),
+        func.max(Grade.score),
+    ).join(Student, Student.id == Grade.student_id).group_by(Grade.subject, Student.class_name)
+
+
+def rebuild_rollups(db: Session) -> None:
+    """Recompute every rollup row from the base tables in one transaction and
+    bump the versions of its source tables"""
+    db.execute(delete(AttendanceDailyRollup))
+    db.execute(delete(GradeSubjectRollup))
+    db.execute(insert(AttendanceDailyRollup).from_select(
+        ["date", "class_name", "status", "count"], _attendance_recompute()
+    ))
+    db.execute(insert(GradeSubjectRollup).from_select(
+        ["subject", "class_name", "count", "score_sum", "score_sq_sum", "min_score", "max_score"],
+        _grade_recompute()
+    ))
+    db.commit()
+    # 집계 테이블은 버전이 없으므로 집계 결과를 캐시한 응답은 원본 테이블 버전으로 무효화한다
+    table_versions.bump("attendances", "grades")
+
+
+def ensure_rollups(db: Session) -> None:
+    """Build rollups for databases that predate the rollup tables"""
+    has_base = db.query(Attendance.id).first() or db.query(Grade.id).first()
+    has_rollups = (
+        db.query(AttendanceDailyRollup.count).first()
+        or db.query(GradeSubjectRollup.count).first()
+    )
+    if has_base and not has_rollups:
+        rebuild_rollups(db)
+
+
+def _close(a: Optional[float], b: Optional[float]) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+
+
+def check_rollups(db: Session) -> List[str]:
+    """Return a description of every rollup row that differs from a full recompute"""
+    problems = []
+
+    expected = {
+        (day, class_name, status_value): count
+        for day, class_name, status_value, count in db.execute(_attendance_recompute())
+    }
+    actual = {
+        (row.date, row.class_name, row.status): row.count
+        for row in db.query(AttendanceDailyRollup)
+    }
+    for key in sorted(expected.keys() | actual.keys(), key=str):
+        if expected.get(key, 0) != actual.get(key, 0):
+            problems.append(
+                f"attendance {key}: expected {expected.get(key, 0)}, found {actual.get(key, 0)}"
+            )
+
+    expected = {
+        (row[0], row[1]): tuple(row[2:]) for row in db.execute(_grade_recompute())
+    }
+    actual = {
+        (row.subject, row.class_name): (
+            row.count, row.score_sum, row.score_sq_sum, row.min_score, row.max_score
+        )
+        for row in db.query(GradeSubjectRollup)
+    }
+    empty = (0, 0.0, 0.0, None, None)
+    for key in sorted(expected.keys() | actual.keys(), key=str):
+        want, have = expected.get(key, empty), actual.get(key, empty)
+        if want[0] != have[0] or not all(_close(a, b) for a, b in zip(want[1:], have[1:])):
+            problems.append(f"grades {key}: expected {want}, found {have}")
+
+    return problems
+
+
+def main(argv: List[str]) -> int:
+    from app.database import Base, SessionLocal, engine
+
+    if len(argv) != 1 or argv[0] not in ("rebuild", "check"):
+        print("usage: python -m app.rollups [rebuild|check]")
+        return 2
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if argv[0] == "rebuild":
+            rebuild_rollups(db)
+            print("Rollups rebuilt")
+            return 0
+        problems = check_rollups(db)
+        for problem in problems:
+            print(problem)
+        print(f"{len(problems)} inconsistent rollup rows")
+        return 1 if problems else 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
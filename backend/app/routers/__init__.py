@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+
+
+def replace_routes(sync_router: APIRouter, async_router: APIRouter) -> APIRouter:
+    """Routes of ``sync_router`` with same-named endpoints taken from ``async_router``.
+
+    Route order (and so path matching) stays that of the sync router;
+    endpoints with no async version keep their sync implementation.
+    """
+    replacements = {route.name: route for route in async_router.routes}
+    router = APIRouter()
+    router.routes.extend(replacements.pop(route.name, route) for route in sync_router.routes)
+    if replacements:
+        raise ValueError(f"No sync route to replace: {sorted(replacements)}")
+    return router
@@ -1,47 +1,91 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.attendance import Attendance
 from app.models.student import Student
 from app.models.user import User
-from app.schemas.attendance import AttendanceCreate, AttendanceResponse
+from app.schemas.attendance import (
+    AttendanceCreate, AttendanceResponse, AttendanceBulkCreate, AttendanceBulkRowResult,
+    AttendanceBulkResponse
+)
+from app.pagination import paginate, DEFAULT_PAGE_SIZE
+from app.filters import AttendanceFilters, with_student
+from app.responses import list_format, list_response, row_columns
+from app.streaming import export_response, EXPORT_CHUNK_SIZE
 from app.auth import get_current_user, get_current_teacher_or_admin
+from app.conditional import conditional
+from app.singleflight import coalesced
+from app.write_queue import write_queue
+from app import rollups
 
 router = APIRouter(prefix="/api/attendance", tags=["attendance"])
 
 
-@router.get("/", response_model=List[AttendanceResponse])
+@router.get("/", response_model=List[AttendanceResponse],
+            dependencies=[Depends(conditional("attendances", "students"))])
+@coalesced("attendances", "students")
 def get_attendances(
+    response: Response,
     skip: int = 0,
-    limit: int = 10000,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    filters: AttendanceFilters = Depends(),
+    include: Optional[str] = Query(None, pattern="^student$", description="student: embed student columns"),
+    fmt: str = Depends(list_format),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    attendances = db.query(Attendance).offset(skip).limit(limit).all()
-    return attendances
+    query = with_student(filters.apply(db, db.query(*row_columns(Attendance))), Attendance, include)
+    rows = paginate(query, response, cursor, skip, limit, Attendance.date, Attendance.id)
+    return list_response(rows, response, fmt)
 
 
-@router.get("/student/{student_id}", response_model=List[AttendanceResponse])
-def get_student_attendance(
-    student_id: int,
+@router.get("/export")
+def export_attendances(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    filters: AttendanceFilters = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    attendances = db.query(Attendance).filter(
-        Attendance.student_id == student_id
-    ).all()
-    return attendances
+    """Stream attendance records as CSV or NDJSON through a server-side cursor"""
+    query = db.query(
+        Attendance.id, Attendance.student_id, Student.student_number, Student.name,
+        Student.class_name, Attendance.date, Attendance.status
+    ).join(Student, Student.id == Attendance.student_id)
+    query = filters.apply(db, query).order_by(Attendance.date, Attendance.id).execution_options(
+        yield_per=EXPORT_CHUNK_SIZE
+    )
 
+    columns = ["id", "student_id", "student_number", "name", "class_name", "date", "status"]
+    return export_response(query, columns, fmt, "attendance", db.close)
 
-@router.post("/", response_model=AttendanceResponse)
-def create_attendance(
-    attendance: AttendanceCreate,
+
+@router.get("/student/{student_id}", response_model=List[AttendanceResponse],
+            dependencies=[Depends(conditional("attendances", "students"))])
+def get_student_attendance(
+    student_id: int,
+    include: Optional[str] = Query(None, pattern="^student$", description="student: embed student columns"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_teacher_or_admin)
+    current_user: User = Depends(get_current_user)
 ):
+    query = db.query(Attendance).filter(Attendance.student_id == student_id)
+    return with_student(query, Attendance, include).all()
+
+
+def _duplicate_attendance() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Attendance already recorded for this date"
+    )
+
+
+def _insert_attendance(db: Session, attendance: AttendanceCreate) -> AttendanceResponse:
+    """Validate and flush one attendance row with its rollup; the caller commits"""
     student = db.query(Student).filter(Student.id == attendance.student_id).first()
     if not student:
         raise HTTPException(
@@ -54,16 +98,123 @@ def create_attendance(
         Attendance.date == attendance.date
     ).first()
     if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Attendance already recorded for this date"
-        )
+        raise _duplicate_attendance()
 
     new_attendance = Attendance(**attendance.model_dump())
     db.add(new_attendance)
-    db.commit()
-    db.refresh(new_attendance)
-    return new_attendance
+    rollups.add_attendance(db, student.class_name, new_attendance)
+    try:
+        db.flush()
+    except IntegrityError:
+        # 동시에 들어온 같은 날짜 요청은 유니크 인덱스가 막는다
+        raise _duplicate_attendance()
+    return AttendanceResponse.model_validate(new_attendance)
+
+
+@router.post("/", response_model=AttendanceResponse)
+def create_attendance(
+    attendance: AttendanceCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    if write_queue.enabled:
+        # 인증 조회에 쓴 쓰기 커넥션을 돌려준다 (production 프로필은 쓰기 커넥션이 하나)
+        db.close()
+        return write_queue.run(_insert_attendance, attendance)
+
+    created = _insert_attendance(db, attendance)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise _duplicate_attendance()
+    return created
+
+
+# 확인과 저장 사이에 다른 요청이 같은 출결을 넣었을 때 출석부 전체를 다시 확인하는 횟수
+ROLL_CALL_ATTEMPTS = 2
+
+
+def _recorded_attendance(db: Session, student_ids: set, dates: set) -> set:
+    return set(
+        db.query(Attendance.student_id, Attendance.date).filter(
+            Attendance.student_id.in_(student_ids), Attendance.date.in_(dates)
+        ).all()
+    )
+
+
+@router.post("/bulk", response_model=AttendanceBulkResponse)
+def create_attendance_bulk(
+    sheet: AttendanceBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Record a whole roll call in one transaction; invalid rows are reported, not raised"""
+    for _ in range(ROLL_CALL_ATTEMPTS):
+        try:
+            return _record_roll_call(db, sheet)
+        except IntegrityError:
+            # 다시 확인하면 먼저 저장된 행은 "이미 기록됨" 오류로 보고된다
+            db.rollback()
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Attendance changed during the roll call, please retry"
+    )
+
+
+def _record_roll_call(db: Session, sheet: AttendanceBulkCreate) -> AttendanceBulkResponse:
+    rows = sheet.rows()
+    student_ids = {row.student_id for row in rows}
+    dates = {row.date for row in rows}
+
+    # 학생 존재 여부와 기존 출결을 각각 한 번의 쿼리로 확인
+    class_by_student = dict(
+        db.query(Student.id, Student.class_name).filter(Student.id.in_(student_ids)).all()
+    ) if rows else {}
+    recorded = _recorded_attendance(db, student_ids, dates) if rows else set()
+
+    results = []
+    accepted = []
+    seen = set()
+    for index, row in enumerate(rows):
+        key = (row.student_id, row.date)
+        error = None
+        if row.student_id not in class_by_student:
+            error = "Student not found"
+        elif sheet.class_name is not None and class_by_student[row.student_id] != sheet.class_name:
+            error = f"Student is not in class {sheet.class_name}"
+        elif key in recorded:
+            error = "Attendance already recorded for this date"
+        elif key in seen:
+            error = "Duplicate row in request"
+        results.append(AttendanceBulkRowResult(
+            index=index, student_id=row.student_id, date=row.date, error=error
+        ))
+        if error is None:
+            seen.add(key)
+            accepted.append((index, row))
+
+    if accepted:
+        db.execute(insert(Attendance), [row.model_dump() for _, row in accepted])
+        # (student_id, date) 는 요청 안에서 유일하므로 한 번의 조회로 새 id를 매핑
+        new_ids = {
+            (student_id, day): attendance_id
+            for attendance_id, student_id, day in db.query(
+                Attendance.id, Attendance.student_id, Attendance.date
+            ).filter(
+                Attendance.student_id.in_(student_ids), Attendance.date.in_(dates)
+            ).all()
+        }
+        for index, row in accepted:
+            results[index].id = new_ids[(row.student_id, row.date)]
+        rollups.add_attendance_rows(
+            db, ((class_by_student[row.student_id], row.date, row.status) for _, row in accepted)
+        )
+        db.commit()
+
+    return AttendanceBulkResponse(
+        created=len(accepted), failed=len(rows) - len(accepted), results=results
+    )
 
 
 @router.delete("/{attendance_id}")
@@ -79,6 +230,7 @@ def delete_attendance(
             detail="Attendance not found"
         )
 
+    rollups.remove_attendance(db, attendance.student.class_name, attendance)
     db.delete(attendance)
     db.commit()
     return {"message": "Attendance deleted successfully"}
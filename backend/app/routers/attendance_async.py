@@ -0,0 +1,127 @@
+"""AsyncSession versions of the attendance routes, used when ASYNC_DB is set"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models.attendance import Attendance
+from app.models.student import Student
+from app.models.user import User
+from app.schemas.attendance import AttendanceCreate, AttendanceResponse
+from app.pagination import paginate_async, DEFAULT_PAGE_SIZE
+from app.filters import AttendanceFilters, with_student
+from app.responses import list_format, list_response, row_columns
+from app.auth import get_current_user_async, get_current_teacher_or_admin_async
+from app.conditional import conditional
+from app.singleflight import coalesced
+from app.routers import attendance, replace_routes
+from app import rollups
+
+_router = APIRouter(prefix="/api/attendance", tags=["attendance"])
+
+
+@_router.get("/", response_model=List[AttendanceResponse],
+             dependencies=[Depends(conditional("attendances", "students", auth=get_current_user_async))])
+@coalesced("attendances", "students")
+async def get_attendances(
+    response: Response,
+    skip: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    filters: AttendanceFilters = Depends(),
+    include: Optional[str] = Query(None, pattern="^student$", description="student: embed student columns"),
+    fmt: str = Depends(list_format),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    statement = filters.apply(db, select(*row_columns(Attendance)))
+    statement = with_student(statement, Attendance, include)
+    rows = await paginate_async(
+        db, statement, response, cursor, skip, limit, Attendance.date, Attendance.id
+    )
+    return list_response(rows, response, fmt)
+
+
+@_router.get("/student/{student_id}", response_model=List[AttendanceResponse],
+             dependencies=[Depends(conditional("attendances", "students", auth=get_current_user_async))])
+async def get_student_attendance(
+    student_id: int,
+    include: Optional[str] = Query(None, pattern="^student$", description="student: embed student columns"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    statement = select(Attendance).filter(Attendance.student_id == student_id)
+    if include:
+        return (await db.execute(with_student(statement, Attendance, include))).all()
+    return (await db.execute(statement)).scalars().all()
+
+
+@_router.post("/", response_model=AttendanceResponse)
+async def create_attendance(
+    attendance: AttendanceCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_teacher_or_admin_async)
+):
+    class_name = await db.scalar(
+        select(Student.class_name).filter(Student.id == attendance.student_id)
+    )
+    if class_name is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+
+    existing = await db.scalar(select(Attendance.id).filter(
+        Attendance.student_id == attendance.student_id,
+        Attendance.date == attendance.date
+    ))
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Attendance already recorded for this date"
+        )
+
+    new_attendance = Attendance(**attendance.model_dump())
+    db.add(new_attendance)
+    await db.run_sync(rollups.add_attendance, class_name, new_attendance)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # 동시에 들어온 같은 날짜 요청은 유니크 인덱스가 막는다
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Attendance already recorded for this date"
+        )
+    await db.refresh(new_attendance)
+    return new_attendance
+
+
+@_router.delete("/{attendance_id}")
+async def delete_attendance(
+    attendance_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_teacher_or_admin_async)
+):
+    row = (await db.execute(
+        select(Attendance, Student.class_name)
+        .join(Student, Student.id == Attendance.student_id)
+        .filter(Attendance.id == attendance_id)
+    )).first()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attendance not found"
+        )
+
+    db_attendance, class_name = row
+    await db.run_sync(rollups.remove_attendance, class_name, db_attendance)
+    await db.delete(db_attendance)
+    await db.commit()
+    return {"message": "Attendance deleted successfully"}
+
+
+router = replace_routes(attendance.router, _router)
@@ -1,54 +1,86 @@
 from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token
-from app.auth import verify_password, get_password_hash, create_access_token
+from app.auth import (
+    create_access_token, get_current_admin, needs_rehash, password_hasher, user_cache
+)
 from app.config import settings
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
+def _find_user(db: Session, username: str):
+    user = db.query(User).filter(User.username == username).first()
+    # bcrypt 를 기다리는 동안 커넥션을 붙잡지 않도록 세션을 닫아 풀에 반납
+    db.close()
+    return user
+
+
+def _save(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+# bcrypt 는 password_hasher 의 프로세스 풀에서 실행되고, DB 작업만 스레드풀을 사용
 @router.post("/register", response_model=UserResponse)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.username == user.username).first()
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(_find_user, db, user.username)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
 
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     new_user = User(
         username=user.username,
         password_hash=hashed_password,
         role=user.role
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
+    return await run_in_threadpool(_save, db, new_user)
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = await run_in_threadpool(_find_user, db, form_data.username)
+    if not user or not await password_hasher.verify(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # BCRYPT_ROUNDS 가 바뀌었으면 평문 비밀번호를 알고 있는 지금 새 비용으로 다시 해시
+    if needs_rehash(user.password_hash):
+        user.password_hash = await password_hasher.hash(form_data.password)
+        await run_in_threadpool(_save, db, user)
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
+
+
+@router.get("/cache-stats")
+def get_cache_stats(current_user: User = Depends(get_current_admin)):
+    """Hit/miss counters of the token -> user cache"""
+    return user_cache.stats()
+
+
+@router.get("/hasher-stats")
+def get_hasher_stats(current_user: User = Depends(get_current_admin)):
+    """Queue depth and rejections of the password hashing pool"""
+    return password_hasher.stats()
@@ -0,0 +1,132 @@
+"""POST /api/batch: several GET requests in one round trip.
+
+Sub-requests go through the app in-process, one after another, in the
+order given. They share the batch's authenticated user (``auth.batch_user``)
+and its read session (``database.batch_session``), whose transaction is
+opened before the first sub-request so every result comes from one
+snapshot. Each item gets its own status code; a 404 or 422 in one item
+does not fail the others. Routes on AsyncSession (ASYNC_DB) still open
+their own session. An item's ``etag`` is sent as If-None-Match, so an
+unchanged result comes back as a body-less 304 (see app.conditional).
+JSON bodies are embedded as JSON; any other body (``format=msgpack``) is
+base64-encoded, with ``"encoding": "base64"`` and its content-type header.
+Streaming exports cannot be batched (schemas.batch.BatchItem).
+
+    POST /api/batch
+    {"requests": [{"path": "/api/stats/dashboard"},
+                  {"path": "/api/stats/attendance/daily", "params": {"days": 14}}]}
+
+    {"responses": [{"status": 200, "headers": {...}, "body": {...}}, ...]}
+"""
+import asyncio
+import base64
+import json
+from urllib.parse import urlencode, urlsplit
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.auth import batch_user, get_current_user
+from app.database import batch_session, begin_read_snapshot, get_db
+from app.models.user import User
+from app.schemas.batch import BatchItem, BatchItemResponse, BatchRequest, BatchResponse
+
+router = APIRouter(prefix="/api/batch", tags=["batch"])
+
+# 하위 요청에 그대로 전달하는 요청 헤더
+FORWARDED_HEADERS = (b"authorization", b"accept-language")
+# 하위 응답에서 빼는 헤더 (묶음 응답 본문에 다시 인코딩되므로 의미 없음)
+DROPPED_HEADERS = ("content-length",)
+
+
+def _scope(request: Request, item: BatchItem) -> dict:
+    parts = urlsplit(item.path)
+    query = "&".join(filter(None, [parts.query, urlencode(item.params or {}, doseq=True)]))
+    headers = [(key, value) for key, value in request.scope["headers"] if key in FORWARDED_HEADERS]
+    headers.append((b"accept", b"application/json"))
+    if item.etag:
+        headers.append((b"if-none-match", item.etag.encode("latin-1")))
+    scope = {
+        key: request.scope[key]
+        for key in ("type", "asgi", "http_version", "scheme", "server", "client", "root_path", "state")
+        if key in request.scope
+    }
+    scope.update(
+        method="GET", path=parts.path, raw_path=parts.path.encode(),
+        query_string=query.encode(), headers=headers,
+    )
+    return scope
+
+
+def _is_json(content_type: str) -> bool:
+    return content_type.startswith("application/json")
+
+
+async def _dispatch(request: Request, item: BatchItem) -> BatchItemResponse:
+    if urlsplit(item.path).path.rstrip("/") == router.prefix:
+        return BatchItemResponse(status=400, body={"detail": "Batch requests cannot be nested"})
+
+    start = {}
+    chunks = []
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # 본문은 이미 보냈다: 응답이 끝날 때까지 기다렸다가 연결 종료를 알린다
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            start.update(message)
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await request.app(_scope(request, item), receive, send)
+    except Exception:
+        # 처리되지 않은 예외는 해당 항목만 500 으로 응답
+        if not start:
+            return BatchItemResponse(status=500, body={"detail": "Internal Server Error"})
+    finally:
+        finished.set()
+
+    headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in start.get("headers", [])}
+    for key in DROPPED_HEADERS:
+        headers.pop(key, None)
+    response = BatchItemResponse(status=start.get("status", 500), headers=headers)
+    body = b"".join(chunks)
+    if not body:
+        return response
+    if _is_json(headers.get("content-type", "")):
+        headers.pop("content-type")
+        response.body = json.loads(body)
+    else:
+        response.body, response.encoding = base64.b64encode(body).decode("ascii"), "base64"
+    return response
+
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    payload: BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    await run_in_threadpool(begin_read_snapshot, db)
+    session_token = batch_session.set(db)
+    user_token = batch_user.set(current_user)
+    try:
+        # 세션을 함께 쓰므로 하위 요청은 순서대로 하나씩 실행
+        responses = [await _dispatch(request, item) for item in payload.requests]
+    finally:
+        batch_user.reset(user_token)
+        batch_session.reset(session_token)
+    return BatchResponse(responses=responses)
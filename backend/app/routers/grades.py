@@ -1,45 +1,210 @@
-from typing import List
+import json
+import tempfile
+from typing import IO, Iterator, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
 
-from app.database import get_db
+from app.database import get_db, get_session_factory, run_in_session
 from app.models.grade import Grade
 from app.models.student import Student
 from app.models.user import User
-from app.schemas.grade import GradeCreate, GradeResponse
+from app.schemas.grade import GradeCreate, GradeResponse, GradeBulkRowResult, GradeBulkResponse
+from app.pagination import paginate, DEFAULT_PAGE_SIZE
+from app.filters import GradeFilters, with_student
+from app.responses import list_format, list_response, row_columns
 from app.auth import get_current_user, get_current_teacher_or_admin
+from app.conditional import conditional
+from app.singleflight import coalesced
+from app.streaming import (
+    iter_records, iter_batches, validation_message, export_response, Record, EXPORT_CHUNK_SIZE
+)
+from app.write_queue import write_queue
+from app import rollups
 
 router = APIRouter(prefix="/api/grades", tags=["grades"])
 
+# 일괄 등록 시 한 트랜잭션에서 처리하는 행 수
+GRADE_IMPORT_BATCH_SIZE = 1000
+# 행별 결과가 이 크기를 넘으면 메모리 대신 임시 파일에 모은다
+GRADE_RESULT_SPOOL_BYTES = 1024 * 1024
+GRADE_RESULT_CHUNK_SIZE = 64 * 1024
+# INSERT ... ON CONFLICT 를 지원하는 방언; 그 외 DB 는 INSERT 와 UPDATE 를 따로 실행
+UPSERT_DIALECTS = {"postgresql": postgresql, "sqlite": sqlite}
 
-@router.get("/", response_model=List[GradeResponse])
+
+def _duplicate_grade(db: Session, student_id: int, subject: str, exclude_id: int = None) -> bool:
+    query = db.query(Grade.id).filter(Grade.student_id == student_id, Grade.subject == subject)
+    if exclude_id is not None:
+        query = query.filter(Grade.id != exclude_id)
+    return query.first() is not None
+
+
+def _upsert_statement(db: Session):
+    """INSERT ... ON CONFLICT (student_id, subject) DO UPDATE SET score, or
+    None if the database has no ON CONFLICT"""
+    dialect = UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+    if dialect is None:
+        return None
+    statement = dialect.insert(Grade)
+    return statement.on_conflict_do_update(
+        index_elements=[Grade.student_id, Grade.subject],
+        set_={"score": statement.excluded.score}
+    )
+
+
+def _write_grades(db: Session, rows: List[tuple]) -> None:
+    """Write (action, row) pairs, at most one per (student_id, subject)"""
+    statement = _upsert_statement(db)
+    if statement is not None:
+        db.execute(statement, [row for _, row in rows])
+        return
+    inserts = [row for action, row in rows if action == "insert"]
+    updates = [
+        {"key_student_id": row["student_id"], "key_subject": row["subject"], "score": row["score"]}
+        for action, row in rows if action == "update"
+    ]
+    if inserts:
+        db.execute(insert(Grade), inserts)
+    if updates:
+        db.execute(
+            update(Grade.__table__).where(
+                Grade.student_id == bindparam("key_student_id"),
+                Grade.subject == bindparam("key_subject"),
+            ).values(score=bindparam("score")),
+            updates
+        )
+
+
+def _upsert_grade_batch(db: Session, batch: List[Record]) -> List[GradeBulkRowResult]:
+    results = []
+    valid = []
+    for index, data in batch:
+        result = GradeBulkRowResult(index=index, action="error")
+        results.append(result)
+        if isinstance(data, str):
+            result.error = data
+            continue
+        try:
+            grade = GradeCreate.model_validate(data)
+        except ValidationError as exc:
+            result.error = validation_message(exc)
+            continue
+        result.student_id, result.subject = grade.student_id, grade.subject
+        valid.append((result, grade))
+
+    student_ids = {grade.student_id for _, grade in valid}
+    subjects = {grade.subject for _, grade in valid}
+    class_by_student = dict(
+        db.query(Student.id, Student.class_name).filter(Student.id.in_(student_ids)).all()
+    )
+    current = {
+        (student_id, subject): score
+        for student_id, subject, score in db.query(
+            Grade.student_id, Grade.subject, Grade.score
+        ).filter(Grade.student_id.in_(student_ids), Grade.subject.in_(subjects))
+    }
+
+    # 같은 배치에서 반복된 키는 마지막 행만 쓴다: PostgreSQL 은 한 INSERT ... ON CONFLICT 가
+    # 같은 행을 두 번 바꾸는 것을 거부한다
+    rows, added, removed = {}, [], []
+    for result, grade in valid:
+        class_name = class_by_student.get(grade.student_id)
+        if class_name is None:
+            result.error = "Student not found"
+            continue
+        key = (grade.student_id, grade.subject)
+        if key in current:
+            result.action = "update"
+            removed.append((class_name, grade.subject, current[key]))
+        else:
+            result.action = "insert"
+        current[key] = grade.score
+        added.append((class_name, grade.subject, grade.score))
+        # 처음 본 행의 동작(insert/update)을 유지하고 값만 바꾼다
+        rows[key] = (rows[key][0] if key in rows else result.action, grade.model_dump())
+
+    if rows:
+        _write_grades(db, list(rows.values()))
+        ids = {
+            (student_id, subject): grade_id
+            for grade_id, student_id, subject in db.query(
+                Grade.id, Grade.student_id, Grade.subject
+            ).filter(Grade.student_id.in_(student_ids), Grade.subject.in_(subjects))
+        }
+        for result in results:
+            if result.action != "error":
+                result.id = ids[(result.student_id, result.subject)]
+        rollups.apply_grade_changes(db, added, removed)
+    # 모든 행이 오류여도 조회 트랜잭션을 끝낸다
+    db.commit()
+    return results
+
+
+@router.get("/", response_model=List[GradeResponse],
+            dependencies=[Depends(conditional("grades", "students"))])
+@coalesced("grades", "students")
 def get_grades(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    filters: GradeFilters = Depends(),
+    include: Optional[str] = Query(None, pattern="^student$", description="student: embed student columns"),
+    fmt: str = Depends(list_format),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    grades = db.query(Grade).offset(skip).limit(limit).all()
-    return grades
+    query = with_student(filters.apply(db, db.query(*row_columns(Grade))), Grade, include)
+    rows = paginate(query, response, cursor, skip, limit, Grade.id)
+    return list_response(rows, response, fmt)
 
 
-@router.get("/student/{student_id}", response_model=List[GradeResponse])
-def get_student_grades(
-    student_id: int,
+@router.get("/export")
+def export_grades(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    filters: GradeFilters = Depends(),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    grades = db.query(Grade).filter(Grade.student_id == student_id).all()
-    return grades
+    """Stream grades as CSV or NDJSON through a server-side cursor"""
+    query = db.query(
+        Grade.id, Grade.student_id, Student.student_number, Student.name,
+        Student.class_name, Grade.subject, Grade.score
+    ).join(Student, Student.id == Grade.student_id)
+    query = filters.apply(db, query).order_by(Grade.id).execution_options(yield_per=EXPORT_CHUNK_SIZE)
 
+    columns = ["id", "student_id", "student_number", "name", "class_name", "subject", "score"]
+    return export_response(query, columns, fmt, "grades", db.close)
 
-@router.post("/", response_model=GradeResponse)
-def create_grade(
-    grade: GradeCreate,
+
+@router.get("/student/{student_id}", response_model=List[GradeResponse],
+            dependencies=[Depends(conditional("grades", "students"))])
+def get_student_grades(
+    student_id: int,
+    include: Optional[str] = Query(None, pattern="^student$", description="student: embed student columns"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_teacher_or_admin)
+    current_user: User = Depends(get_current_user)
 ):
+    query = db.query(Grade).filter(Grade.student_id == student_id)
+    return with_student(query, Grade, include).all()
+
+
+def _duplicate_grade_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Grade already recorded for this subject"
+    )
+
+
+def _insert_grade(db: Session, grade: GradeCreate) -> GradeResponse:
+    """Validate and flush one grade with its rollup; the caller commits"""
     student = db.query(Student).filter(Student.id == grade.student_id).first()
     if not student:
         raise HTTPException(
@@ -47,11 +212,84 @@ def create_grade(
             detail="Student not found"
         )
 
+    if _duplicate_grade(db, grade.student_id, grade.subject):
+        raise _duplicate_grade_exception()
+
     new_grade = Grade(**grade.model_dump())
     db.add(new_grade)
-    db.commit()
-    db.refresh(new_grade)
-    return new_grade
+    rollups.add_grade(db, student.class_name, grade.subject, grade.score)
+    try:
+        db.flush()
+    except IntegrityError:
+        raise _duplicate_grade_exception()
+    return GradeResponse.model_validate(new_grade)
+
+
+@router.post("/", response_model=GradeResponse)
+def create_grade(
+    grade: GradeCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    if write_queue.enabled:
+        # 인증 조회에 쓴 쓰기 커넥션을 돌려준다 (production 프로필은 쓰기 커넥션이 하나)
+        db.close()
+        return write_queue.run(_insert_grade, grade)
+
+    created = _insert_grade(db, grade)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise _duplicate_grade_exception()
+    return created
+
+
+def _bulk_body(counts: GradeBulkResponse, results: IO[bytes]) -> Iterator[bytes]:
+    """GradeBulkResponse JSON with the spooled, comma-separated ``results``"""
+    try:
+        yield json.dumps(counts.model_dump(exclude={"results"}))[:-1].encode() + b', "results": ['
+        results.seek(0)
+        while chunk := results.read(GRADE_RESULT_CHUNK_SIZE):
+            yield chunk
+        yield b"]}"
+    finally:
+        results.close()
+
+
+@router.post("/bulk", response_model=GradeBulkResponse)
+async def upsert_grades_bulk(
+    request: Request,
+    session_factory: sessionmaker = Depends(get_session_factory),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Upsert grades on (student_id, subject) from a streamed CSV
+    (student_id,subject,score header), NDJSON or JSON array body.
+    Each batch of rows is committed separately; the response has one
+    result per row, spooled to a temporary file while the body streams in."""
+    counts = GradeBulkResponse()
+    results = tempfile.SpooledTemporaryFile(max_size=GRADE_RESULT_SPOOL_BYTES)
+    try:
+        async for batch in iter_batches(iter_records(request), GRADE_IMPORT_BATCH_SIZE):
+            # 배치마다 세션을 열고 닫는다: 본문을 기다리는 동안 쓰기 커넥션을 잡고 있지 않도록
+            batch_results = await run_in_threadpool(
+                run_in_session, session_factory, _upsert_grade_batch, batch
+            )
+            for result in batch_results:
+                if result.action == "insert":
+                    counts.inserted += 1
+                elif result.action == "update":
+                    counts.updated += 1
+                else:
+                    counts.failed += 1
+            results.write(b"".join(
+                (b"," if results.tell() or index else b"") + result.model_dump_json().encode()
+                for index, result in enumerate(batch_results)
+            ))
+    except BaseException:
+        results.close()
+        raise
+    return StreamingResponse(_bulk_body(counts, results), media_type="application/json")
 
 
 @router.put("/{grade_id}", response_model=GradeResponse)
@@ -68,11 +306,31 @@ def update_grade(
             detail="Grade not found"
         )
 
+    student = db_grade.student
+    if grade.student_id != db_grade.student_id:
+        student = db.query(Student).filter(Student.id == grade.student_id).first()
+        if not student:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Student not found"
+            )
+
+    if _duplicate_grade(db, grade.student_id, grade.subject, exclude_id=grade_id):
+        raise _duplicate_grade_exception()
+
+    rollups.remove_grade(db, db_grade.student.class_name, db_grade)
+    rollups.add_grade(db, student.class_name, grade.subject, grade.score)
+
     db_grade.student_id = grade.student_id
     db_grade.subject = grade.subject
     db_grade.score = grade.score
 
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # 동시에 같은 학생·과목으로 바뀐 성적은 유니크 인덱스가 막는다
+        db.rollback()
+        raise _duplicate_grade_exception()
     db.refresh(db_grade)
     return db_grade
 
@@ -90,6 +348,7 @@ def delete_grade(
             detail="Grade not found"
         )
 
+    rollups.remove_grade(db, grade.student.class_name, grade)
     db.delete(grade)
     db.commit()
     return {"message": "Grade deleted successfully"}
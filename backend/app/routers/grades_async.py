@@ -0,0 +1,153 @@
+"""AsyncSession versions of the grade routes, used when ASYNC_DB is set"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models.grade import Grade
+from app.models.student import Student
+from app.models.user import User
+from app.schemas.grade import GradeCreate, GradeResponse
+from app.pagination import paginate_async, DEFAULT_PAGE_SIZE
+from app.filters import GradeFilters, with_student
+from app.responses import list_format, list_response, row_columns
+from app.auth import get_current_user_async, get_current_teacher_or_admin_async
+from app.conditional import conditional
+from app.singleflight import coalesced
+from app.routers import grades, replace_routes
+from app import rollups
+
+_router = APIRouter(prefix="/api/grades", tags=["grades"])
+
+
+async def _class_name_or_404(db: AsyncSession, student_id: int) -> str:
+    class_name = await db.scalar(select(Student.class_name).filter(Student.id == student_id))
+    if class_name is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+    return class_name
+
+
+def _duplicate_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Grade already recorded for this subject"
+    )
+
+
+@_router.get("/", response_model=List[GradeResponse],
+             dependencies=[Depends(conditional("grades", "students", auth=get_current_user_async))])
+@coalesced("grades", "students")
+async def get_grades(
+    response: Response,
+    skip: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    filters: GradeFilters = Depends(),
+    include: Optional[str] = Query(None, pattern="^student$", description="student: embed student columns"),
+    fmt: str = Depends(list_format),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    statement = with_student(filters.apply(db, select(*row_columns(Grade))), Grade, include)
+    rows = await paginate_async(db, statement, response, cursor, skip, limit, Grade.id)
+    return list_response(rows, response, fmt)
+
+
+@_router.get("/student/{student_id}", response_model=List[GradeResponse],
+             dependencies=[Depends(conditional("grades", "students", auth=get_current_user_async))])
+async def get_student_grades(
+    student_id: int,
+    include: Optional[str] = Query(None, pattern="^student$", description="student: embed student columns"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    statement = select(Grade).filter(Grade.student_id == student_id)
+    if include:
+        return (await db.execute(with_student(statement, Grade, include))).all()
+    return (await db.execute(statement)).scalars().all()
+
+
+@_router.post("/", response_model=GradeResponse)
+async def create_grade(
+    grade: GradeCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_teacher_or_admin_async)
+):
+    class_name = await _class_name_or_404(db, grade.student_id)
+
+    if await db.run_sync(grades._duplicate_grade, grade.student_id, grade.subject):
+        raise _duplicate_exception()
+
+    new_grade = Grade(**grade.model_dump())
+    db.add(new_grade)
+    await db.run_sync(rollups.add_grade, class_name, grade.subject, grade.score)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise _duplicate_exception()
+    await db.refresh(new_grade)
+    return new_grade
+
+
+@_router.put("/{grade_id}", response_model=GradeResponse)
+async def update_grade(
+    grade_id: int,
+    grade: GradeCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_teacher_or_admin_async)
+):
+    db_grade = await db.get(Grade, grade_id)
+    if not db_grade:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Grade not found"
+        )
+
+    old_class_name = await _class_name_or_404(db, db_grade.student_id)
+    class_name = old_class_name
+    if grade.student_id != db_grade.student_id:
+        class_name = await _class_name_or_404(db, grade.student_id)
+
+    if await db.run_sync(grades._duplicate_grade, grade.student_id, grade.subject, grade_id):
+        raise _duplicate_exception()
+
+    await db.run_sync(rollups.remove_grade, old_class_name, db_grade)
+    await db.run_sync(rollups.add_grade, class_name, grade.subject, grade.score)
+
+    db_grade.student_id = grade.student_id
+    db_grade.subject = grade.subject
+    db_grade.score = grade.score
+
+    await db.commit()
+    await db.refresh(db_grade)
+    return db_grade
+
+
+@_router.delete("/{grade_id}")
+async def delete_grade(
+    grade_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_teacher_or_admin_async)
+):
+    db_grade = await db.get(Grade, grade_id)
+    if not db_grade:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Grade not found"
+        )
+
+    class_name = await _class_name_or_404(db, db_grade.student_id)
+    await db.run_sync(rollups.remove_grade, class_name, db_grade)
+    await db.delete(db_grade)
+    await db.commit()
+    return {"message": "Grade deleted successfully"}
+
+
+router = replace_routes(grades.router, _router)
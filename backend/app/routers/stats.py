@@ -0,0 +1,272 @@
+import math
+from datetime import date, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.attendance import AttendanceStatus
+from app.models.grade import Grade
+from app.models.rollup import AttendanceDailyRollup, GradeSubjectRollup
+from app.models.student import Student
+from app.models.user import User
+from app.schemas.stats import (
+    AttendanceCounts, ClassCount, DashboardResponse, AttendanceSummary, DailyAttendance,
+    GradeSummary, SubjectGradeStats, GradeDistribution, StudentRanking
+)
+from app.auth import get_current_user, get_current_admin
+from app.conditional import conditional
+from app.config import settings
+from app.shared_cache import cached, shared_cache
+from app.singleflight import coalesced, single_flight
+from app.write_queue import write_queue
+
+router = APIRouter(prefix="/api/stats", tags=["stats"])
+
+# 통계 결과는 워커 간 공유 캐시에 두고, 의존하는 테이블이 바뀌면 다시 계산
+stats_cache = shared_cache.namespace(
+    "stats", settings.STATS_CACHE_SIZE, tables=("students", "attendances", "grades")
+)
+
+# 등급 구간 (하한 점수 기준, 나머지는 F)
+GRADE_BUCKETS = [("A", 90), ("B", 80), ("C", 70), ("D", 60)]
+
+
+# 출결/성적 집계는 app.rollups 가 유지하는 롤업 테이블에서 읽는다
+def _status_count(status_value: AttendanceStatus):
+    return func.coalesce(
+        func.sum(case(
+            (AttendanceDailyRollup.status == status_value, AttendanceDailyRollup.count),
+            else_=0
+        )), 0
+    )
+
+
+def _total_count():
+    return func.coalesce(func.sum(AttendanceDailyRollup.count), 0).label("total")
+
+
+def _status_columns():
+    """출결 상태별 집계 컬럼 (present, late, absent 순)"""
+    return [
+        _status_count(status_value).label(status_value.name)
+        for status_value in AttendanceStatus
+    ]
+
+
+def _counts_from_row(row) -> dict:
+    return {status_value.name: int(getattr(row, status_value.name) or 0)
+            for status_value in AttendanceStatus}
+
+
+def _round(value: Optional[float]) -> float:
+    return round(float(value), 1) if value is not None else 0.0
+
+
+@router.get("/dashboard", response_model=DashboardResponse,
+            dependencies=[Depends(conditional("students", "attendances", "grades", daily=True))])
+@cached(stats_cache, "students", "attendances", "grades", daily=True)
+@coalesced("students", "attendances", "grades")
+def get_dashboard(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    class_rows = db.query(
+        Student.class_name, func.count(Student.id)
+    ).group_by(Student.class_name).order_by(Student.class_name).all()
+
+    today_row = db.query(*_status_columns()).filter(
+        AttendanceDailyRollup.date == date.today()
+    ).one()
+
+    grade_count, score_sum = db.query(
+        func.coalesce(func.sum(GradeSubjectRollup.count), 0),
+        func.sum(GradeSubjectRollup.score_sum),
+    ).one()
+
+    return DashboardResponse(
+        student_count=sum(count for _, count in class_rows),
+        class_distribution=[
+            ClassCount(class_name=class_name, count=count)
+            for class_name, count in class_rows
+        ],
+        today_attendance=AttendanceCounts(**_counts_from_row(today_row)),
+        average_score=_round(score_sum / grade_count if grade_count else None),
+        total_grades=grade_count,
+    )
+
+
+@router.get("/attendance/summary", response_model=AttendanceSummary,
+            dependencies=[Depends(conditional("attendances"))])
+@cached(stats_cache, "attendances")
+@coalesced("attendances")
+def get_attendance_summary(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    query = db.query(_total_count(), *_status_columns())
+    if start_date:
+        query = query.filter(AttendanceDailyRollup.date >= start_date)
+    if end_date:
+        query = query.filter(AttendanceDailyRollup.date <= end_date)
+    row = query.one()
+
+    counts = _counts_from_row(row)
+    total = row.total
+    rate = round(counts["present"] / total * 100, 1) if total else 0.0
+    return AttendanceSummary(total=total, attendance_rate=rate, **counts)
+
+
+@router.get("/attendance/daily", response_model=List[DailyAttendance],
+            dependencies=[Depends(conditional("attendances", daily=True))])
+@cached(stats_cache, "attendances", daily=True)
+@coalesced("attendances")
+def get_attendance_daily(
+    days: int = Query(7, ge=1, le=366),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    end = date.today()
+    start = end - timedelta(days=days - 1)
+
+    rows = db.query(
+        AttendanceDailyRollup.date, _total_count(), *_status_columns()
+    ).filter(
+        AttendanceDailyRollup.date >= start, AttendanceDailyRollup.date <= end
+    ).group_by(AttendanceDailyRollup.date).all()
+    by_date = {row.date: row for row in rows}
+
+    # 기록이 없는 날짜도 0으로 채워서 반환
+    result = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        row = by_date.get(day)
+        if row is None:
+            result.append(DailyAttendance(date=day))
+        else:
+            result.append(DailyAttendance(date=day, total=row.total, **_counts_from_row(row)))
+    return result
+
+
+@router.get("/grades/summary", response_model=GradeSummary,
+            dependencies=[Depends(conditional("grades"))])
+@cached(stats_cache, "grades")
+@coalesced("grades")
+def get_grades_summary(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    total, score_sum, highest, lowest = db.query(
+        func.coalesce(func.sum(GradeSubjectRollup.count), 0),
+        func.sum(GradeSubjectRollup.score_sum),
+        func.max(GradeSubjectRollup.max_score),
+        func.min(GradeSubjectRollup.min_score),
+    ).one()
+    return GradeSummary(
+        total=total, average=_round(score_sum / total if total else None),
+        highest=highest, lowest=lowest
+    )
+
+
+@router.get("/grades/by-subject", response_model=List[SubjectGradeStats],
+            dependencies=[Depends(conditional("grades"))])
+@cached(stats_cache, "grades")
+@coalesced("grades")
+def get_grades_by_subject(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    rows = db.query(
+        GradeSubjectRollup.subject,
+        func.sum(GradeSubjectRollup.count),
+        func.sum(GradeSubjectRollup.score_sum),
+        func.sum(GradeSubjectRollup.score_sq_sum),
+        func.max(GradeSubjectRollup.max_score),
+        func.min(GradeSubjectRollup.min_score),
+    ).group_by(GradeSubjectRollup.subject).order_by(GradeSubjectRollup.subject).all()
+
+    result = []
+    for subject, count, score_sum, score_sq_sum, highest, lowest in rows:
+        average = score_sum / count
+        variance = max(score_sq_sum / count - average * average, 0.0)
+        result.append(SubjectGradeStats(
+            subject=subject, count=count, average=_round(average),
+            stddev=_round(math.sqrt(variance)), highest=highest, lowest=lowest
+        ))
+    return result
+
+
+@router.get("/grades/distribution", response_model=GradeDistribution,
+            dependencies=[Depends(conditional("grades"))])
+@cached(stats_cache, "grades")
+@coalesced("grades")
+def get_grades_distribution(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    bucket = case(
+        *[(Grade.score >= lower, letter) for letter, lower in GRADE_BUCKETS],
+        else_="F"
+    ).label("bucket")
+    rows = db.query(bucket, func.count(Grade.id)).group_by(bucket).all()
+    return GradeDistribution(**{letter: count for letter, count in rows})
+
+
+@router.get("/grades/ranking", response_model=List[StudentRanking],
+            dependencies=[Depends(conditional("students", "grades"))])
+@cached(stats_cache, "students", "grades")
+@coalesced("students", "grades")
+def get_grades_ranking(
+    limit: int = Query(10, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    averages = db.query(
+        Grade.student_id,
+        func.avg(Grade.score).label("average"),
+        func.count(Grade.id).label("grade_count"),
+    ).group_by(Grade.student_id).subquery()
+    rank = func.rank().over(order_by=averages.c.average.desc()).label("rank")
+
+    rows = db.query(
+        rank,
+        Student.id,
+        Student.name,
+        Student.student_number,
+        Student.class_name,
+        averages.c.average,
+        averages.c.grade_count,
+    ).join(averages, averages.c.student_id == Student.id).order_by(
+        averages.c.average.desc(), Student.id
+    ).limit(limit).all()
+
+    return [
+        StudentRanking(
+            rank=row.rank, student_id=row.id, name=row.name,
+            student_number=row.student_number, class_name=row.class_name,
+            average=_round(row.average), grade_count=row.grade_count
+        )
+        for row in rows
+    ]
+
+
+@router.get("/cache")
+def get_cache_stats(current_user: User = Depends(get_current_admin)):
+    """Size, evictions and per-worker hit rate of each shared cache namespace"""
+    return shared_cache.stats()
+
+
+@router.get("/single-flight")
+def get_single_flight_stats(current_user: User = Depends(get_current_admin)):
+    """Executions and coalesced (saved) calls per route of the single-flight layer"""
+    return single_flight.stats()
+
+
+@router.get("/write-queue")
+def get_write_queue_stats(current_user: User = Depends(get_current_admin)):
+    """Commits per second and rows per commit of the attendance/grade write coalescer"""
+    return write_queue.stats()
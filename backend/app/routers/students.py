@@ -1,50 +1,176 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session, selectinload, sessionmaker
 
-from app.database import get_db
+from app.database import get_db, get_session_factory, run_in_session
+from app.models.attendance import Attendance, AttendanceStatus
+from app.models.grade import Grade
 from app.models.student import Student
 from app.models.user import User
-from app.schemas.student import StudentCreate, StudentUpdate, StudentResponse
+from app.schemas.student import (
+    StudentCreate, StudentUpdate, StudentResponse, StudentImportError, StudentImportResponse
+)
+from app.schemas.stats import (
+    StudentProfile, StudentAttendanceStats, AttendanceRates, StudentGradeStats, SubjectScore
+)
+from app.pagination import paginate, paginate_offset, DEFAULT_PAGE_SIZE
+from app.responses import cache_page, cached_page, list_format, list_response, row_columns
+from app.shared_cache import shared_cache
+from app.config import settings
+from app.suggest import student_suggestions, DEFAULT_SUGGEST_LIMIT
 from app.auth import get_current_user, get_current_teacher_or_admin
+from app.conditional import conditional
+from app.singleflight import coalesced
+from app.streaming import iter_records, iter_batches, validation_message, Record
+from app import rollups, search
 
 router = APIRouter(prefix="/api/students", tags=["students"])
 
+# 학생 명단 페이지 (출결/성적 화면의 학생 선택 목록) 는 워커 간 공유 캐시에 둔다
+roster_cache = shared_cache.namespace("roster", settings.ROSTER_CACHE_SIZE, tables=("students",))
 
-@router.get("/", response_model=List[StudentResponse])
+# 명단 가져오기 시 한 트랜잭션에서 처리하는 행 수와 응답에 담는 최대 오류 수
+STUDENT_IMPORT_BATCH_SIZE = 2000
+STUDENT_IMPORT_ERROR_LIMIT = 100
+
+
+def _import_student_batch(db: Session, batch: List[Record]) -> List[StudentImportError]:
+    errors = []
+    valid = []
+    for index, data in batch:
+        if isinstance(data, str):
+            errors.append(StudentImportError(index=index, error=data))
+            continue
+        try:
+            student = StudentCreate.model_validate(data)
+        except ValidationError as exc:
+            errors.append(StudentImportError(
+                index=index, student_number=data.get("student_number"), error=validation_message(exc)
+            ))
+            continue
+        valid.append((index, student))
+
+    # 학번 중복은 배치 단위로 유니크 인덱스를 한 번 조회해서 확인
+    taken = {
+        number for (number,) in db.query(Student.student_number).filter(
+            Student.student_number.in_({student.student_number for _, student in valid})
+        )
+    }
+    rows = []
+    for index, student in valid:
+        if student.student_number in taken:
+            errors.append(StudentImportError(
+                index=index, student_number=student.student_number,
+                error="Student number already exists"
+            ))
+            continue
+        taken.add(student.student_number)
+        rows.append(student.model_dump())
+
+    if rows:
+        students = _insert_students(db, rows)
+        # Core insert 는 ORM 이벤트가 없으므로 검색 색인을 직접 추가
+        search.index_students(db, students)
+        db.commit()
+        student_suggestions.put_many(students)
+    return errors
+
+
+def _insert_students(db: Session, rows: List[dict]) -> List[tuple]:
+    """Insert ``rows``; returns their (id, name, student_number, class_name)"""
+    columns = (Student.id, Student.name, Student.student_number, Student.class_name)
+    if db.get_bind().dialect.insert_executemany_returning:
+        return [tuple(row) for row in db.execute(insert(Student.__table__).returning(*columns), rows)]
+    # RETURNING 이 없는 DB: 커밋 전에 같은 트랜잭션에서 새 id 를 읽는다
+    db.execute(insert(Student.__table__), rows)
+    return [tuple(row) for row in db.execute(
+        select(*columns).filter(Student.student_number.in_([row["student_number"] for row in rows]))
+    )]
+
+
+@router.get("/", response_model=List[StudentResponse],
+            dependencies=[Depends(conditional("students"))])
+@coalesced("students")
 def get_students(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fmt: str = Depends(list_format),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    students = db.query(Student).offset(skip).limit(limit).all()
-    return students
+    key = (cursor, skip, limit)
+    rows = cached_page(roster_cache, key, response)
+    if rows is None:
+        versions = roster_cache.snapshot()
+        rows = paginate(db.query(*row_columns(Student)), response, cursor, skip, limit, Student.id)
+        cache_page(roster_cache, key, response, rows, versions)
+    return list_response(rows, response, fmt)
 
 
-@router.get("/search", response_model=List[StudentResponse])
+@router.post("/import", response_model=StudentImportResponse)
+async def import_students(
+    request: Request,
+    session_factory: sessionmaker = Depends(get_session_factory),
+    current_user: User = Depends(get_current_teacher_or_admin)
+):
+    """Import a roster streamed as CSV (name,student_number,class_name header)
+    NDJSON or a JSON array. Each batch is committed separately; only the first
+    STUDENT_IMPORT_ERROR_LIMIT row errors are returned."""
+    response = StudentImportResponse()
+    async for batch in iter_batches(iter_records(request), STUDENT_IMPORT_BATCH_SIZE):
+        # 배치마다 세션을 열고 닫는다: 본문을 기다리는 동안 쓰기 커넥션을 잡고 있지 않도록
+        errors = await run_in_threadpool(run_in_session, session_factory, _import_student_batch, batch)
+        response.imported += len(batch) - len(errors)
+        response.failed += len(errors)
+        room = STUDENT_IMPORT_ERROR_LIMIT - len(response.errors)
+        response.errors.extend(errors[:room])
+        response.errors_truncated = response.errors_truncated or len(errors) > room
+    return response
+
+
+@router.get("/search", response_model=List[StudentResponse],
+            dependencies=[Depends(conditional("students"))])
 def search_students(
-    name: Optional[str] = Query(None, description="Student name search"),
+    response: Response,
+    q: Optional[str] = Query(None, description="Search name, student number and class"),
+    name: Optional[str] = Query(None, description="Student name search (초성 allowed)"),
     student_number: Optional[str] = Query(None, description="Student number search"),
     class_name: Optional[str] = Query(None, description="Class name search"),
+    skip: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Search students by name, student number, or class"""
-    query = db.query(Student)
+    """Search students by name (or its 초성, e.g. ㄱㅊㅅ), student number, or class,
+    best matches first"""
+    query = search.search(
+        db, db.query(Student), {"any": q, "name": name, "student_number": student_number},
+        class_name=class_name
+    )
+    return paginate_offset(query, response, cursor, skip, limit)
 
-    if name:
-        query = query.filter(Student.name.contains(name))
-    if student_number:
-        query = query.filter(Student.student_number.contains(student_number))
-    if class_name:
-        query = query.filter(Student.class_name == class_name)
 
-    return query.all()
+@router.get("/suggest", response_model=List[StudentResponse])
+def suggest_students(
+    q: str = Query(..., description="Name, student number or 초성 prefix"),
+    limit: int = DEFAULT_SUGGEST_LIMIT,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Typeahead for student pickers, served from the in-memory prefix index"""
+    student_suggestions.ensure_loaded(db)
+    return student_suggestions.suggest(q, limit)
 
 
-@router.get("/{student_id}", response_model=StudentResponse)
+@router.get("/{student_id}", response_model=StudentResponse,
+            dependencies=[Depends(conditional("students"))])
 def get_student(
     student_id: int,
     db: Session = Depends(get_db),
@@ -59,6 +185,100 @@ def get_student(
     return student
 
 
+def _percent(count: int, total: int) -> float:
+    return round(count / total * 100, 1) if total else 0.0
+
+
+def _attendance_stats(db: Session, student_id: int) -> StudentAttendanceStats:
+    counts = dict(
+        db.query(Attendance.status, func.count(Attendance.id))
+        .filter(Attendance.student_id == student_id).group_by(Attendance.status).all()
+    )
+    total = sum(counts.values())
+    by_status = {status_value.name: counts.get(status_value, 0) for status_value in AttendanceStatus}
+    return StudentAttendanceStats(
+        total=total, attendance_rate=_percent(by_status["present"], total), **by_status,
+        rates=AttendanceRates(**{name: _percent(count, total) for name, count in by_status.items()})
+    )
+
+
+def _grade_stats(db: Session, student: Student) -> StudentGradeStats:
+    """Per-subject class average and rank, and the class rank by average, for ``student``"""
+    classmates = select(Student.id).filter(Student.class_name == student.class_name)
+
+    # 학생이 가진 과목만 같은 반 안에서 순위 계산
+    by_subject = db.query(
+        Grade.student_id, Grade.subject, Grade.score,
+        func.avg(Grade.score).over(partition_by=Grade.subject).label("class_average"),
+        func.rank().over(partition_by=Grade.subject, order_by=Grade.score.desc()).label("class_rank"),
+        func.count().over(partition_by=Grade.subject).label("class_size"),
+    ).filter(
+        Grade.student_id.in_(classmates),
+        Grade.subject.in_(select(Grade.subject).filter(Grade.student_id == student.id)),
+    ).subquery()
+    subjects = db.query(by_subject).filter(
+        by_subject.c.student_id == student.id
+    ).order_by(by_subject.c.subject).all()
+
+    averages = db.query(
+        Grade.student_id, func.avg(Grade.score).label("average")
+    ).filter(Grade.student_id.in_(classmates)).group_by(Grade.student_id).subquery()
+    ranked = db.query(
+        averages.c.student_id, averages.c.average,
+        func.rank().over(order_by=averages.c.average.desc()).label("class_rank"),
+        func.count().over().label("class_size"),
+    ).subquery()
+    overall = db.query(ranked).filter(ranked.c.student_id == student.id).first()
+
+    return StudentGradeStats(
+        average=round(overall.average, 1) if overall else None,
+        class_rank=overall.class_rank if overall else None,
+        class_size=overall.class_size if overall else 0,
+        subjects=[
+            SubjectScore(
+                subject=row.subject, score=row.score, class_average=round(row.class_average, 1),
+                class_rank=row.class_rank, class_size=row.class_size
+            )
+            for row in subjects
+        ],
+    )
+
+
+@router.get("/{student_id}/profile", response_model=StudentProfile,
+            dependencies=[Depends(conditional("students", "attendances", "grades"))])
+def get_student_profile(
+    student_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """The student with one page of attendance (cursor in X-Next-Cursor), all
+    grades and their aggregates, in a fixed number of queries"""
+    student = db.query(Student).options(selectinload(Student.grades)).filter(
+        Student.id == student_id
+    ).first()
+    if not student:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+
+    attendance = paginate(
+        db.query(Attendance).filter(Attendance.student_id == student_id),
+        response, cursor, skip, limit, Attendance.date, Attendance.id
+    )
+    return StudentProfile(
+        student=student,
+        attendance=attendance,
+        grades=sorted(student.grades, key=lambda grade: grade.subject),
+        attendance_stats=_attendance_stats(db, student_id),
+        grade_stats=_grade_stats(db, student),
+    )
+
+
 @router.post("/", response_model=StudentResponse)
 def create_student(
     student: StudentCreate,
@@ -78,6 +298,7 @@ def create_student(
     db.add(new_student)
     db.commit()
     db.refresh(new_student)
+    student_suggestions.put(new_student)
     return new_student
 
 
@@ -96,11 +317,16 @@ def update_student(
         )
 
     update_data = student.model_dump(exclude_unset=True)
+    new_class_name = update_data.get("class_name")
+    if new_class_name is not None and new_class_name != db_student.class_name:
+        rollups.move_student(db, db_student, new_class_name)
+
     for key, value in update_data.items():
         setattr(db_student, key, value)
 
     db.commit()
     db.refresh(db_student)
+    student_suggestions.put(db_student)
     return db_student
 
 
@@ -121,11 +347,13 @@ def delete_student(
         )
     
     # 관련 데이터 먼저 삭제
+    rollups.remove_student(db, db_student)
     db.query(Attendance).filter(Attendance.student_id == student_id).delete(synchronize_session=False)
     db.query(Grade).filter(Grade.student_id == student_id).delete(synchronize_session=False)
     
     # 학생 삭제
     db.delete(db_student)
     db.commit()
+    student_suggestions.remove(student_id)
     return {"message": "Student deleted successfully"}
 
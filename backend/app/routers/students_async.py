@@ -0,0 +1,163 @@
+"""AsyncSession versions of the student routes, used when ASYNC_DB is set"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+from app.models.attendance import Attendance
+from app.models.grade import Grade
+from app.models.student import Student
+from app.models.user import User
+from app.schemas.student import StudentCreate, StudentUpdate, StudentResponse
+from app.pagination import paginate_async, paginate_offset_async, DEFAULT_PAGE_SIZE
+from app.responses import cache_page, cached_page, list_format, list_response, row_columns
+from app.suggest import student_suggestions
+from app.auth import get_current_user_async, get_current_teacher_or_admin_async
+from app.conditional import conditional
+from app.singleflight import coalesced
+from app.routers import students, replace_routes
+from app import rollups, search
+
+_router = APIRouter(prefix="/api/students", tags=["students"])
+
+
+async def _get_student_or_404(db: AsyncSession, student_id: int) -> Student:
+    student = await db.get(Student, student_id)
+    if not student:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Student not found"
+        )
+    return student
+
+
+@_router.get("/", response_model=List[StudentResponse],
+             dependencies=[Depends(conditional("students", auth=get_current_user_async))])
+@coalesced("students")
+async def get_students(
+    response: Response,
+    skip: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    fmt: str = Depends(list_format),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    key = (cursor, skip, limit)
+    rows = cached_page(students.roster_cache, key, response)
+    if rows is None:
+        versions = students.roster_cache.snapshot()
+        rows = await paginate_async(
+            db, select(*row_columns(Student)), response, cursor, skip, limit, Student.id
+        )
+        cache_page(students.roster_cache, key, response, rows, versions)
+    return list_response(rows, response, fmt)
+
+
+@_router.get("/search", response_model=List[StudentResponse],
+             dependencies=[Depends(conditional("students", auth=get_current_user_async))])
+async def search_students(
+    response: Response,
+    q: Optional[str] = Query(None, description="Search name, student number and class"),
+    name: Optional[str] = Query(None, description="Student name search (초성 allowed)"),
+    student_number: Optional[str] = Query(None, description="Student number search"),
+    class_name: Optional[str] = Query(None, description="Class name search"),
+    skip: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    """Search students by name (or its 초성, e.g. ㄱㅊㅅ), student number, or class,
+    best matches first"""
+    statement = search.search(
+        db, select(Student), {"any": q, "name": name, "student_number": student_number},
+        class_name=class_name
+    )
+    return await paginate_offset_async(db, statement, response, cursor, skip, limit)
+
+
+@_router.get("/{student_id}", response_model=StudentResponse,
+             dependencies=[Depends(conditional("students", auth=get_current_user_async))])
+async def get_student(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
+):
+    return await _get_student_or_404(db, student_id)
+
+
+@_router.post("/", response_model=StudentResponse)
+async def create_student(
+    student: StudentCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_teacher_or_admin_async)
+):
+    existing = await db.scalar(
+        select(Student.id).filter(Student.student_number == student.student_number)
+    )
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Student number already exists"
+        )
+
+    new_student = Student(**student.model_dump())
+    db.add(new_student)
+    await db.commit()
+    await db.refresh(new_student)
+    student_suggestions.put(new_student)
+    return new_student
+
+
+@_router.put("/{student_id}", response_model=StudentResponse)
+async def update_student(
+    student_id: int,
+    student: StudentUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_teacher_or_admin_async)
+):
+    db_student = await _get_student_or_404(db, student_id)
+
+    update_data = student.model_dump(exclude_unset=True)
+    new_class_name = update_data.get("class_name")
+    if new_class_name is not None and new_class_name != db_student.class_name:
+        await db.run_sync(rollups.move_student, db_student, new_class_name)
+
+    for key, value in update_data.items():
+        setattr(db_student, key, value)
+
+    await db.commit()
+    await db.refresh(db_student)
+    student_suggestions.put(db_student)
+    return db_student
+
+
+@_router.delete("/{student_id}")
+async def delete_student(
+    student_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_teacher_or_admin_async)
+):
+    db_student = await _get_student_or_404(db, student_id)
+
+    # 관련 데이터 먼저 삭제
+    await db.run_sync(rollups.remove_student, db_student)
+    await db.execute(
+        delete(Attendance).filter(Attendance.student_id == student_id),
+        execution_options={"synchronize_session": False}
+    )
+    await db.execute(
+        delete(Grade).filter(Grade.student_id == student_id),
+        execution_options={"synchronize_session": False}
+    )
+
+    await db.delete(db_student)
+    await db.commit()
+    student_suggestions.remove(student_id)
+    return {"message": "Student deleted successfully"}
+
+
+router = replace_routes(students.router, _router)
@@ -1,4 +1,14 @@
 from app.schemas.user import UserCreate, UserResponse, Token, TokenData
-from app.schemas.student import StudentCreate, StudentUpdate, StudentResponse
-from app.schemas.attendance import AttendanceCreate, AttendanceResponse
-from app.schemas.grade import GradeCreate, GradeResponse
+from app.schemas.student import (
+    StudentCreate, StudentUpdate, StudentResponse, StudentImportError, StudentImportResponse
+)
+from app.schemas.attendance import (
+    AttendanceCreate, AttendanceResponse, AttendanceSheetEntry, AttendanceBulkCreate,
+    AttendanceBulkRowResult, AttendanceBulkResponse
+)
+from app.schemas.grade import GradeCreate, GradeResponse, GradeBulkRowResult, GradeBulkResponse
+from app.schemas.stats import (
+    AttendanceCounts, ClassCount, DashboardResponse, AttendanceSummary, DailyAttendance,
+    GradeSummary, SubjectGradeStats, GradeDistribution, StudentRanking
+)
+from app.schemas.batch import BatchItem, BatchRequest, BatchItemResponse, BatchResponse
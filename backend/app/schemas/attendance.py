@@ -1,6 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_serializer, model_validator
+import datetime
 from datetime import date
+from typing import List, Optional
 from app.models.attendance import AttendanceStatus
+from app.schemas.student import omit_student_columns
+
+# 한 번의 일괄 등록 요청에서 허용하는 최대 행 수
+BULK_ATTENDANCE_LIMIT = 5000
 
 
 class AttendanceCreate(BaseModel):
@@ -14,6 +20,57 @@ class AttendanceResponse(BaseModel):
     student_id: int
     date: date
     status: AttendanceStatus
+    # include=student 일 때만 채워지고 응답에 포함됨
+    student_name: Optional[str] = None
+    student_number: Optional[str] = None
+    class_name: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler):
+        return omit_student_columns(self, handler(self))
+
+
+class AttendanceSheetEntry(BaseModel):
+    student_id: int
+    status: AttendanceStatus
+
+
+class AttendanceBulkCreate(BaseModel):
+    """Roll-call sheet (date + entries, optionally checked against class_name)
+    and/or a list of individual AttendanceCreate items"""
+    date: Optional[datetime.date] = None
+    class_name: Optional[str] = None
+    entries: List[AttendanceSheetEntry] = Field(default=[], max_length=BULK_ATTENDANCE_LIMIT)
+    items: List[AttendanceCreate] = Field(default=[], max_length=BULK_ATTENDANCE_LIMIT)
+
+    @model_validator(mode="after")
+    def check_sheet(self):
+        if self.entries and self.date is None:
+            raise ValueError("date is required when entries are given")
+        if len(self.entries) + len(self.items) > BULK_ATTENDANCE_LIMIT:
+            raise ValueError(f"at most {BULK_ATTENDANCE_LIMIT} rows per request")
+        return self
+
+    def rows(self) -> List[AttendanceCreate]:
+        sheet = [
+            AttendanceCreate(student_id=entry.student_id, date=self.date, status=entry.status)
+            for entry in self.entries
+        ]
+        return sheet + list(self.items)
+
+
+class AttendanceBulkRowResult(BaseModel):
+    index: int
+    student_id: int
+    date: date
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class AttendanceBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[AttendanceBulkRowResult]
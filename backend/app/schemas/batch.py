@@ -0,0 +1,40 @@
+from urllib.parse import urlsplit
+
+from pydantic import BaseModel, Field, field_validator
+from typing import Any, Dict, List, Optional, Union
+
+from app.config import settings
+
+QueryValue = Union[str, int, float, bool]
+# 응답을 스트리밍하는 경로의 마지막 부분 (묶음 응답에 담을 수 없음)
+STREAMING_SEGMENTS = ("export",)
+
+
+class BatchItem(BaseModel):
+    path: str = Field(..., pattern=r"^/api/", examples=["/api/stats/attendance/daily"])
+    params: Optional[Dict[str, Union[QueryValue, List[QueryValue]]]] = None
+    # 이전 응답의 ETag; 바뀌지 않았으면 항목이 본문 없이 304 로 온다
+    etag: Optional[str] = None
+
+    @field_validator("path")
+    @classmethod
+    def not_streaming(cls, path: str) -> str:
+        if urlsplit(path).path.rstrip("/").rsplit("/", 1)[-1] in STREAMING_SEGMENTS:
+            raise ValueError("Streaming exports cannot be batched")
+        return path
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem] = Field(..., min_length=1, max_length=settings.BATCH_MAX_REQUESTS)
+
+
+class BatchItemResponse(BaseModel):
+    status: int
+    headers: Dict[str, str] = {}
+    body: Any = None
+    # "base64": JSON 이 아닌 본문 (content-type 헤더 참고)
+    encoding: Optional[str] = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchItemResponse]
@@ -1,4 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, model_serializer
+from typing import List, Optional
+
+from app.schemas.student import omit_student_columns
 
 
 class GradeCreate(BaseModel):
@@ -12,6 +15,30 @@ class GradeResponse(BaseModel):
     student_id: int
     subject: str
     score: float
+    # include=student 일 때만 채워지고 응답에 포함됨
+    student_name: Optional[str] = None
+    student_number: Optional[str] = None
+    class_name: Optional[str] = None
 
     class Config:
         from_attributes = True
+
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler):
+        return omit_student_columns(self, handler(self))
+
+
+class GradeBulkRowResult(BaseModel):
+    index: int
+    action: str  # "insert", "update" 또는 "error"
+    id: Optional[int] = None
+    student_id: Optional[int] = None
+    subject: Optional[str] = None
+    error: Optional[str] = None
+
+
+class GradeBulkResponse(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    failed: int = 0
+    results: List[GradeBulkRowResult] = []
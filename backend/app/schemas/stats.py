@@ -0,0 +1,103 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+
+from app.schemas.attendance import AttendanceResponse
+from app.schemas.grade import GradeResponse
+from app.schemas.student import StudentResponse
+
+
+class AttendanceCounts(BaseModel):
+    present: int = 0
+    late: int = 0
+    absent: int = 0
+
+
+class ClassCount(BaseModel):
+    class_name: str
+    count: int
+
+
+class DashboardResponse(BaseModel):
+    student_count: int
+    class_distribution: List[ClassCount]
+    today_attendance: AttendanceCounts
+    average_score: float
+    total_grades: int
+
+
+class AttendanceSummary(AttendanceCounts):
+    total: int = 0
+    attendance_rate: float = 0.0
+
+
+class DailyAttendance(AttendanceCounts):
+    date: date
+    total: int = 0
+
+
+class GradeSummary(BaseModel):
+    total: int
+    average: float
+    highest: Optional[float] = None
+    lowest: Optional[float] = None
+
+
+class SubjectGradeStats(BaseModel):
+    subject: str
+    count: int
+    average: float
+    stddev: float
+    highest: float
+    lowest: float
+
+
+class GradeDistribution(BaseModel):
+    A: int = 0
+    B: int = 0
+    C: int = 0
+    D: int = 0
+    F: int = 0
+
+
+class StudentRanking(BaseModel):
+    rank: int
+    student_id: int
+    name: str
+    student_number: str
+    class_name: str
+    average: float
+    grade_count: int
+
+
+class AttendanceRates(BaseModel):
+    present: float = 0.0
+    late: float = 0.0
+    absent: float = 0.0
+
+
+class StudentAttendanceStats(AttendanceSummary):
+    rates: AttendanceRates = AttendanceRates()
+
+
+class SubjectScore(BaseModel):
+    subject: str
+    score: float
+    class_average: float
+    class_rank: int
+    class_size: int
+
+
+class StudentGradeStats(BaseModel):
+    average: Optional[float] = None
+    class_rank: Optional[int] = None
+    class_size: int = 0
+    subjects: List[SubjectScore] = []
+
+
+class StudentProfile(BaseModel):
+    student: StudentResponse
+    attendance: List[AttendanceResponse]
+    grades: List[GradeResponse]
+    attendance_stats: StudentAttendanceStats
+    grade_stats: StudentGradeStats
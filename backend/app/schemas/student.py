@@ -1,5 +1,16 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+
+# include=student 로 출결/성적 행에 포함되는 학생 컬럼
+STUDENT_COLUMNS = ("student_name", "student_number", "class_name")
+
+
+def omit_student_columns(row: BaseModel, data: dict) -> dict:
+    """Drop the embedded student columns from ``data`` unless they were loaded"""
+    if row.student_name is None:
+        for key in STUDENT_COLUMNS:
+            data.pop(key, None)
+    return data
 
 
 class StudentCreate(BaseModel):
@@ -22,3 +33,16 @@ class StudentResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class StudentImportError(BaseModel):
+    index: int
+    student_number: Optional[str] = None
+    error: str
+
+
+class StudentImportResponse(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: List[StudentImportError] = []
+    errors_truncated: bool = False
@@ -0,0 +1,281 @@
+"""Student search index (SQLite FTS5).
+
+``students_fts`` is a trigram index over name, student_number, class_name
+and the 초성 (initial consonants) of the name, e.g. 김철수 -> ㄱㅊㅅ, so any
+substring of three or more characters is an index lookup. Trigrams cannot
+answer shorter queries (철수, ㅊㅅ, 김, 1반), so ``students_fts_short`` stores
+every 1- and 2-character substring of the name and its 초성, the student
+number and the class name as tokens, one column each.
+
+Queries mixing syllables and 초성 (김ㅊ) are matched on their 초성 and then
+checked position by position with a GLOB on the name (김[ㅊ차-칳]).
+
+Both tables use students.id as rowid. They are created with the students
+table, kept in sync by ORM events on Student (create, update, delete) and
+by ``index_students`` for Core bulk inserts, re-created by migrations when
+their columns change, and rebuilt with
+
+    python -m app.search rebuild
+
+Other databases fall back to ``LIKE '%x%'``.
+"""
+import sys
+from typing import Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import DDL, Select, column, event, inspect, literal_column, or_, select, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Query, Session
+
+from app.models.student import Student
+
+FTS_TABLES = {
+    "students_fts": "CREATE VIRTUAL TABLE students_fts USING fts5("
+                    "name, student_number, class_name, choseong, tokenize='trigram')",
+    "students_fts_short": "CREATE VIRTUAL TABLE students_fts_short USING fts5("
+                          "grams, number_grams, class_grams, tokenize='unicode61')",
+}
+FTS_COLUMNS = {
+    "students_fts": {"name", "student_number", "class_name", "choseong"},
+    "students_fts_short": {"grams", "number_grams", "class_grams"},
+}
+# 짧은 검색어가 찾는 students_fts_short 열
+SHORT_COLUMNS = {
+    "any": "{grams number_grams class_grams}",
+    "name": "grams",
+    "choseong": "grams",
+    "student_number": "number_grams",
+    "class_name": "class_grams",
+}
+# 트라이그램 색인으로 찾을 수 있는 최소 검색어 길이
+TRIGRAM = 3
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+HANGUL_FIRST, HANGUL_LAST = 0xAC00, 0xD7A3
+SYLLABLES_PER_CHOSEONG = 588  # 중성 21 x 종성 28
+
+FIELDS = {
+    "any": (Student.name, Student.student_number, Student.class_name),
+    "name": (Student.name,),
+    "student_number": (Student.student_number,),
+    "class_name": (Student.class_name,),
+}
+
+students_fts = table("students_fts", column("rowid"), column("rank"))
+students_fts_short = table("students_fts_short", column("rowid"))
+
+for _name, _statement in FTS_TABLES.items():
+    event.listen(Student.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+    event.listen(
+        Student.__table__, "after_drop", DDL(f"DROP TABLE IF EXISTS {_name}").execute_if(dialect="sqlite")
+    )
+
+
+def choseong(value: str) -> str:
+    """초성 of every Hangul syllable; other characters are kept (김철수 -> ㄱㅊㅅ)"""
+    return "".join(
+        CHOSEONG[(ord(char) - HANGUL_FIRST) // SYLLABLES_PER_CHOSEONG]
+        if HANGUL_FIRST <= ord(char) <= HANGUL_LAST else char
+        for char in value
+    )
+
+
+def has_choseong(value: str) -> bool:
+    return any(char in CHOSEONG for char in value)
+
+
+def is_mixed(value: str) -> bool:
+    """Whether ``value`` has both 초성 and complete syllables (김ㅊ)"""
+    return has_choseong(value) and any(HANGUL_FIRST <= ord(char) <= HANGUL_LAST for char in value)
+
+
+def _short_grams(*values: str) -> str:
+    grams = set()
+    for value in values:
+        # 공백이 들어간 조각은 unicode61 이 나누므로 단어마다 만든다
+        for word in value.split():
+            for size in range(1, TRIGRAM):
+                grams.update(word[i:i + size] for i in range(len(word) - size + 1))
+    return " ".join(sorted(grams))
+
+
+def _glob_char(char: str) -> str:
+    if char in CHOSEONG:
+        # 초성 자체와 그 초성으로 시작하는 음절 588개
+        first = HANGUL_FIRST + CHOSEONG.index(char) * SYLLABLES_PER_CHOSEONG
+        return f"[{char}{chr(first)}-{chr(first + SYLLABLES_PER_CHOSEONG - 1)}]"
+    if char in "*?[":
+        return f"[{char}]"
+    if char.lower() != char.upper():
+        # FTS 처럼 대소문자를 구분하지 않는다
+        return f"[{char.lower()}{char.upper()}]"
+    return char
+
+
+def mixed_pattern(term: str) -> str:
+    """GLOB pattern matching the syllables of ``term`` literally and each
+    초성 as any syllable starting with it, at the same positions
+    (김ㅁ -> *김[ㅁ마-밓]*)"""
+    return "*" + "".join(_glob_char(char) for char in term) + "*"
+
+
+def _fts_enabled(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def _index(connection: Connection, students: Iterable[Tuple[int, str, str, str]]) -> None:
+    rows = [
+        {"id": student_id, "name": name, "student_number": number, "class_name": class_name,
+         "choseong": choseong(name), "grams": _short_grams(name, choseong(name)),
+         "number_grams": _short_grams(number), "class_grams": _short_grams(class_name)}
+        for student_id, name, number, class_name in students
+    ]
+    if not rows:
+        return
+    connection.execute(text(
+        "INSERT INTO students_fts (rowid, name, student_number, class_name, choseong) "
+        "VALUES (:id, :name, :student_number, :class_name, :choseong)"
+    ), rows)
+    connection.execute(text(
+        "INSERT INTO students_fts_short (rowid, grams, number_grams, class_grams) "
+        "VALUES (:id, :grams, :number_grams, :class_grams)"
+    ), rows)
+
+
+def _unindex(connection: Connection, student_id: int) -> None:
+    for name in FTS_TABLES:
+        connection.execute(text(f"DELETE FROM {name} WHERE rowid = :id"), {"id": student_id})
+
+
+@event.listens_for(Student, "after_insert")
+def _student_inserted(mapper, connection, target: Student) -> None:
+    if _fts_enabled(connection):
+        _index(connection, [(target.id, target.name, target.student_number, target.class_name)])
+
+
+@event.listens_for(Student, "after_update")
+def _student_updated(mapper, connection, target: Student) -> None:
+    if _fts_enabled(connection):
+        _unindex(connection, target.id)
+        _index(connection, [(target.id, target.name, target.student_number, target.class_name)])
+
+
+@event.listens_for(Student, "after_delete")
+def _student_deleted(mapper, connection, target: Student) -> None:
+    if _fts_enabled(connection):
+        _unindex(connection, target.id)
+
+
+def index_students(db: Session, students: Iterable[Tuple[int, str, str, str]]) -> None:
+    """Index students added with a Core insert (no ORM events), given as
+    (id, name, student_number, class_name) rows"""
+    if not _fts_enabled(db.get_bind()):
+        return
+    _index(db.connection(), list(students))
+
+
+def rebuild_search_index(db: Session) -> int:
+    """Re-create both FTS tables from the students table; returns rows indexed"""
+    connection = db.connection()
+    for name, statement in FTS_TABLES.items():
+        connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        connection.execute(text(statement))
+    students = db.execute(
+        select(Student.id, Student.name, Student.student_number, Student.class_name)
+    ).all()
+    _index(connection, students)
+    db.commit()
+    return len(students)
+
+
+def ensure_search_index(engine: Engine) -> List[str]:
+    """Create and fill the FTS tables of a database that predates them or
+    their current columns; returns the tables that were re-created"""
+    if not _fts_enabled(engine):
+        return []
+    inspector = inspect(engine)
+    if not inspector.has_table(Student.__tablename__):
+        return []
+    stale = [
+        name for name in FTS_TABLES
+        if not inspector.has_table(name)
+        or {column["name"] for column in inspector.get_columns(name)} != FTS_COLUMNS[name]
+    ]
+    if stale:
+        with Session(engine) as db:
+            rebuild_search_index(db)
+    return stale
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _term_filter(term: str, field: str):
+    """(FTS table, MATCH expression, ranked) for one term"""
+    if field in ("name", "any") and has_choseong(term):
+        # 초성은 이름에만 있다; 섞여 있는 음절은 search() 가 GLOB 으로 확인
+        term, field = choseong(term), "choseong"
+
+    if len(term) >= TRIGRAM:
+        columns = {"any": "{name student_number class_name}"}.get(field, field)
+        # 초성과 숫자는 bm25 로 구분되지 않으므로 순위 계산 없이 id 순
+        ranked = field != "choseong" and not term.isdigit()
+        return students_fts, f"{columns} : {_quote(term)}", ranked
+    return students_fts_short, f"{SHORT_COLUMNS[field]} : {_quote(term)}", False
+
+
+def search(db: Session, query: Union[Query, Select], terms: dict,
+           class_name: Optional[str] = None) -> Union[Query, Select]:
+    """Filter and order ``query`` (a Query or select() of Student) by search ``terms``.
+
+    ``terms`` maps a field ("any", "name", "student_number" or "class_name")
+    to whitespace-separated words that must all match. Text words of three
+    or more characters are ranked by bm25; 초성, numbers and shorter words
+    only filter, and results are otherwise in id order. Words mixing
+    syllables and 초성 (김ㅊ) must match the name at the same positions.
+    """
+    if class_name:
+        query = query.filter(Student.class_name == class_name)
+
+    words = [(word, field) for field, value in terms.items() if value for word in value.split()]
+    if not _fts_enabled(db.get_bind()):
+        for word, field in words:
+            query = query.filter(or_(*(column.contains(word) for column in FIELDS[field])))
+        return query.order_by(Student.id)
+
+    matches = {students_fts: [], students_fts_short: []}
+    ranked = False
+    for word, field in words:
+        fts, expression, word_ranked = _term_filter(word, field)
+        matches[fts].append(expression)
+        if field in ("name", "any") and is_mixed(word):
+            query = query.filter(Student.name.op("GLOB")(mixed_pattern(word)))
+        ranked = ranked or word_ranked
+
+    order = []
+    for fts, expressions in matches.items():
+        if expressions:
+            query = query.join(fts, fts.c.rowid == Student.id).filter(
+                literal_column(fts.name).match(" AND ".join(expressions))
+            )
+            # FTS 테이블의 rowid 순으로 읽으면 LIMIT 에서 바로 멈출 수 있음
+            order = order or [fts.c.rowid]
+    if ranked:
+        order = [students_fts.c.rank, Student.id]
+    return query.order_by(*(order or [Student.id]))
+
+
+def main(argv: List[str]) -> int:
+    from app.database import Base, SessionLocal, engine
+
+    if argv[1:] != ["rebuild"]:
+        print("usage: python -m app.search rebuild")
+        return 2
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        print(f"Indexed {rebuild_search_index(db)} students")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,295 @@
+"""Cache shared by the worker processes.
+
+render.yaml runs several workers; an in-process cache would be filled and
+go stale once per worker. ``shared_cache`` keeps one LRU + TTL store per
+namespace in a backend every worker sees:
+
+- ``sqlite`` (default with a SQLite file database): a separate cache file
+  next to it (``student_management.db-cache``), values encoded with orjson
+- ``memory``: per process, for tests and non-SQLite databases
+- ``package.module:factory``: any object with ``store(name, maxsize, clock)``
+
+Every entry remembers the app.versions counters of the tables it was built
+from and is ignored once any of them moves, so a commit in any worker
+invalidates it everywhere without touching the cache. TTLs bound entries
+built from anything else (the date, token expiry).
+
+    stats_cache = shared_cache.namespace("stats", 256, ttl=300, tables=("grades",))
+    stats_cache.get_or_set(("summary",), compute)
+
+Hit/miss counters are per worker; sizes are those of the shared store.
+"""
+import functools
+import hashlib
+import importlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.engine import make_url
+
+from app.cache import TTLCache
+from app.config import settings
+from app.database import _is_sqlite_file
+from app.singleflight import route_key
+from app.versions import TableVersions, table_versions
+
+# 적중한 항목의 LRU 사용 시각은 이 간격보다 오래됐을 때만 갱신 (읽기마다 쓰지 않도록)
+LRU_TOUCH_SECONDS = 1.0
+
+
+class MemoryCacheBackend:
+    name = "memory"
+
+    def store(self, name: str, maxsize: int, clock: Callable[[], float]) -> TTLCache:
+        return TTLCache(maxsize, float("inf"), clock=clock)
+
+
+class SQLiteStore:
+    """One namespace of the SQLite backend, with TTLCache's interface"""
+
+    def __init__(self, backend: "SQLiteCacheBackend", name: str, maxsize: int,
+                 clock: Callable[[], float]):
+        self.backend = backend
+        self.name = name
+        self.maxsize = maxsize
+        self.clock = clock
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        now = self.clock()
+        with self.backend.connection() as db:
+            row = db.execute(
+                "SELECT value, expires, used FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.name, key),
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires, used = row
+            if expires <= now:
+                db.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.name, key))
+                return None
+            if now - used > LRU_TOUCH_SECONDS:
+                db.execute(
+                    "UPDATE cache_entries SET used = ? WHERE namespace = ? AND key = ?",
+                    (now, self.name, key),
+                )
+        return orjson.loads(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        now = self.clock()
+        with self.backend.connection() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires, used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.name, key, orjson.dumps(value), now + ttl, now),
+            )
+            db.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND expires <= ?", (self.name, now)
+            )
+            evicted = db.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                "SELECT key FROM cache_entries WHERE namespace = ? ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                (self.name, self.name, self.maxsize),
+            ).rowcount
+        self.evictions += evicted
+
+    def clear(self) -> None:
+        with self.backend.connection() as db:
+            db.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.name,))
+
+    def stats(self) -> dict:
+        with self.backend.connection() as db:
+            (size,) = db.execute(
+                "SELECT count(*) FROM cache_entries WHERE namespace = ?", (self.name,)
+            ).fetchone()
+        return {"size": size, "maxsize": self.maxsize, "evictions": self.evictions}
+
+
+class SQLiteCacheBackend:
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self._pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(
+            self.path, timeout=settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None, check_same_thread=False,
+        )
+        # 캐시는 잃어도 되므로 fsync 없이 쓴다
+        db.execute("PRAGMA journal_mode = WAL")
+        db.execute("PRAGMA synchronous = OFF")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+            "expires REAL NOT NULL, used REAL NOT NULL, PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS ix_cache_entries_used ON cache_entries (namespace, used)")
+        return db
+
+    @contextmanager
+    def connection(self):
+        """The process' connection, held for the duration of a ``with`` block"""
+        with self._lock:
+            # fork 된 워커는 부모의 커넥션을 쓰지 않는다
+            if self._db is None or self._pid != os.getpid():
+                self._db = self._connect()
+                self._pid = os.getpid()
+            yield self._db
+
+    def store(self, name: str, maxsize: int, clock: Callable[[], float]) -> SQLiteStore:
+        return SQLiteStore(self, name, maxsize, clock)
+
+
+def cache_path(url: str) -> Optional[str]:
+    if not _is_sqlite_file(url):
+        return None
+    return os.path.abspath(make_url(url).database) + "-cache"
+
+
+def make_backend(name: str = settings.CACHE_BACKEND, url: str = settings.DATABASE_URL):
+    """Backend named by CACHE_BACKEND: auto, sqlite, memory or module:factory"""
+    if name == "auto":
+        name = "sqlite" if cache_path(url) else "memory"
+    if name == "memory":
+        return MemoryCacheBackend()
+    if name == "sqlite":
+        return SQLiteCacheBackend(cache_path(url) or os.path.abspath("cache.db"))
+    module, _, attribute = name.partition(":")
+    return getattr(importlib.import_module(module), attribute)()
+
+
+def _key(key: Any) -> str:
+    return hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+
+
+class CacheNamespace:
+    def __init__(self, name: str, store, maxsize: int, ttl: float, tables: Tuple[str, ...],
+                 versions: TableVersions):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.tables = tables
+        self.versions = versions
+        self._store = store
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def clock(self) -> Callable[[], float]:
+        return self._store.clock
+
+    @clock.setter
+    def clock(self, clock: Callable[[], float]) -> None:
+        self._store.clock = clock
+
+    def snapshot(self, tables: Optional[Iterable[str]] = None) -> list:
+        """Current versions of the namespace's (or ``tables``') tables. Take it
+        before reading what will be cached, so a write in between makes the
+        entry stale instead of current."""
+        return list(self.versions.get(self.tables if tables is None else tables))
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: Any, tables: Optional[Iterable[str]] = None) -> Optional[Any]:
+        entry = self._store.get(_key(key))
+        if entry is None or list(entry[0]) != self.snapshot(tables):
+            self._count(False)
+            return None
+        self._count(True)
+        return entry[1]
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None,
+            versions: Optional[list] = None, tables: Optional[Iterable[str]] = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if versions is None:
+            versions = self.snapshot(tables)
+        self._store.set(_key(key), (versions, value), ttl)
+
+    def get_or_set(self, key: Any, compute: Callable[[], Any],
+                   tables: Optional[Iterable[str]] = None) -> Any:
+        """Cached value of ``key``, else ``compute()`` stored as JSON-compatible data"""
+        value = self.get(key, tables)
+        if value is None:
+            versions = self.snapshot(tables)
+            value = jsonable_encoder(compute())
+            self.set(key, value, versions=versions, tables=tables)
+        return value
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            **self._store.stats(),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "tables": list(self.tables),
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SharedCache:
+    def __init__(self, backend, versions: TableVersions = table_versions,
+                 clock: Callable[[], float] = time.time):
+        self.backend = backend
+        self.versions = versions
+        self.clock = clock
+        self.namespaces: Dict[str, CacheNamespace] = {}
+
+    def namespace(self, name: str, maxsize: int, ttl: float = settings.CACHE_TTL_SECONDS,
+                  tables: Tuple[str, ...] = ()) -> CacheNamespace:
+        namespace = CacheNamespace(
+            name, self.backend.store(name, maxsize, self.clock), maxsize, ttl, tables, self.versions
+        )
+        self.namespaces[name] = namespace
+        return namespace
+
+    def clear(self) -> None:
+        for namespace in self.namespaces.values():
+            namespace.clear()
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "namespaces": {name: namespace.stats() for name, namespace in self.namespaces.items()},
+        }
+
+
+shared_cache = SharedCache(make_backend())
+
+
+def cached(namespace: CacheNamespace, *tables: str, daily: bool = False) -> Callable:
+    """Cache a sync route's JSON-compatible result in ``namespace``, keyed by
+    the route, its arguments and the caller's role. ``daily`` results also
+    change at midnight."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            key = (route_key(func, kwargs), date.today() if daily else None)
+            return namespace.get_or_set(key, lambda: func(**kwargs), tables or None)
+        return wrapper
+    return decorate
@@ -0,0 +1,193 @@
+"""Single-flight coalescing for expensive read routes.
+
+When a class period ends, many teachers open the same dashboard and lists
+at once. ``@coalesced`` lets the first of several concurrent identical
+calls (same route, arguments, caller role and versions of the tables the
+route reads) run the handler; the others wait for it and each get a copy
+of its result (or its exception) instead of running the same aggregation
+again. A request made after a write committed sees new table versions, so
+it never joins a call that started before the write. Nothing is kept once
+the call returns; reuse across time is app.shared_cache's job.
+
+    @router.get("/grades/summary")
+    @cached(stats_cache, "grades")
+    @coalesced("grades")
+    def get_grades_summary(...):
+
+Sync handlers (threadpool) wait on a threading.Event, async ones on an
+asyncio future. A waiter gives up after the connection pool timeout
+(SQLITE_BUSY_TIMEOUT_MS) and runs the handler itself, so a stuck leader
+cannot hold its followers longer than their own query could take.
+``single_flight.stats()`` counts executions, the calls that were served
+from another's execution and the waits that timed out per route.
+"""
+import asyncio
+import copy
+import functools
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from fastapi import Response
+
+from app.config import settings
+from app.versions import table_versions
+
+# 키에서 제외하는 엔드포인트 인자 (current_user 는 역할만 키에 들어간다)
+IGNORED_ARGUMENTS = ("db", "current_user", "response", "request")
+
+
+def _argument_key(value: Any) -> Hashable:
+    # 필터 의존성 객체(AttendanceFilters 등)는 값으로 비교
+    if hasattr(value, "__dict__") and not isinstance(value, type):
+        return tuple(sorted((name, _argument_key(item)) for name, item in vars(value).items()))
+    return value
+
+
+def route_key(func: Callable, kwargs: dict) -> tuple:
+    """(route, arguments, caller role) of an endpoint call"""
+    user = kwargs.get("current_user")
+    role = getattr(getattr(user, "role", None), "value", None)
+    arguments = tuple(sorted(
+        (name, _argument_key(value)) for name, value in kwargs.items() if name not in IGNORED_ARGUMENTS
+    ))
+    return func.__module__, func.__name__, arguments, role
+
+
+def copy_result(result: Any) -> Any:
+    """An independent copy of a handler result for a waiting caller"""
+    if isinstance(result, Response):
+        return Response(
+            content=result.body, status_code=result.status_code,
+            headers=dict(result.headers), media_type=result.media_type,
+        )
+    return copy.deepcopy(result)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, wait_timeout: Optional[float] = None):
+        # None: 커넥션 풀 대기 시간 (SQLITE_BUSY_TIMEOUT_MS)
+        self.wait_timeout = wait_timeout
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.executions: Dict[str, int] = defaultdict(int)
+        self.coalesced: Dict[str, int] = defaultdict(int)
+        self.in_flight: Dict[str, int] = defaultdict(int)
+        self.timed_out: Dict[str, int] = defaultdict(int)
+
+    def _join(self, route: str, calls: dict, key: Hashable, new: Callable[[], Any]):
+        """(call, leader) for ``key``, registering a new call if none is in flight"""
+        with self._lock:
+            call = calls.get(key)
+            if call is None:
+                call = calls[key] = new()
+                self.executions[route] += 1
+                self.in_flight[route] += 1
+                return call, True
+            self.coalesced[route] += 1
+            return call, False
+
+    def _leave(self, route: str, calls: dict, key: Hashable) -> None:
+        with self._lock:
+            del calls[key]
+            self.in_flight[route] -= 1
+
+    def _timeout(self) -> float:
+        if self.wait_timeout is not None:
+            return self.wait_timeout
+        return settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+
+    def _gave_up(self, route: str) -> None:
+        with self._lock:
+            self.timed_out[route] += 1
+
+    def do(self, route: str, key: Hashable, func: Callable[[], Any]) -> Any:
+        call, leader = self._join(route, self._calls, key, _Call)
+        if not leader:
+            if not call.done.wait(self._timeout()):
+                # 선행 호출이 멈췄으면 직접 실행한다
+                self._gave_up(route)
+                return func()
+            if call.error is not None:
+                raise call.error
+            return copy_result(call.result)
+        try:
+            call.result = func()
+            return call.result
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            self._leave(route, self._calls, key)
+            call.done.set()
+
+    async def do_async(self, route: str, key: Hashable, func: Callable[[], Any]) -> Any:
+        future, leader = self._join(
+            route, self._async_calls, key, lambda: asyncio.get_running_loop().create_future()
+        )
+        if not leader:
+            # 대기 중인 요청이 취소되거나 시간이 지나도 실행 중인 호출은 취소하지 않는다
+            try:
+                result = await asyncio.wait_for(asyncio.shield(future), self._timeout())
+            except asyncio.TimeoutError:
+                self._gave_up(route)
+                return await func()
+            return copy_result(result)
+        try:
+            result = await func()
+            future.set_result(result)
+            return result
+        except Exception as error:
+            future.set_exception(error)
+            # 기다리는 요청이 없으면 "exception was never retrieved" 경고를 막는다
+            future.exception()
+            raise
+        finally:
+            self._leave(route, self._async_calls, key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            routes = sorted(set(self.executions) | set(self.coalesced))
+            return {
+                route: {
+                    "executions": self.executions[route],
+                    "coalesced": self.coalesced[route],
+                    "in_flight": self.in_flight[route],
+                    "timed_out": self.timed_out[route],
+                }
+                for route in routes
+            }
+
+
+single_flight = SingleFlight()
+
+
+def coalesced(*tables: str) -> Callable:
+    """Share one execution of a route among concurrent identical calls made
+    while ``tables`` are unchanged"""
+    def decorate(func: Callable) -> Callable:
+        route = f"{func.__module__}.{func.__name__}"
+
+        def key(kwargs: dict) -> tuple:
+            # 자신의 쓰기 이후 요청은 그 전에 시작한 호출에 합류하지 않는다 (read-your-writes)
+            return route_key(func, kwargs), table_versions.get(tables)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(**kwargs):
+                return await single_flight.do_async(route, key(kwargs), lambda: func(**kwargs))
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(**kwargs):
+            return single_flight.do(route, key(kwargs), lambda: func(**kwargs))
+        return wrapper
+    return decorate
@@ -0,0 +1,204 @@
+"""In-process prefix index for the student picker typeahead.
+
+Every student is indexed under its name, student number and the 초성 of
+its name (김철수 -> ㄱㅊㅅ) in one sorted list of ``(key, id)`` pairs, so a
+prefix lookup is a bisect plus a short scan and never touches the database.
+A query mixing syllables and 초성 (김ㅊ) is looked up by its 초성 and the
+typed syllables are then checked against the name.
+
+The index is loaded from the students table at startup and kept current by
+the student write routes after they commit. Writes made by other worker
+processes are picked up by a background reload every
+SUGGEST_REFRESH_SECONDS.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import ReadSessionLocal
+from app.models.student import Student
+from app.search import HANGUL_FIRST, HANGUL_LAST, choseong, has_choseong
+
+# (id, name, student_number, class_name)
+Record = Tuple[int, str, str, str]
+
+DEFAULT_SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 50
+
+
+def _keys(record: Record) -> set:
+    _, name, number, _ = record
+    return {name.casefold(), number.casefold(), choseong(name).casefold()}
+
+
+def _syllables_match(query: str, name: str) -> bool:
+    """Typed syllables of a mixed query (김ㅊ) must equal the name's"""
+    return all(
+        index < len(name) and name[index] == char
+        for index, char in enumerate(query)
+        if HANGUL_FIRST <= ord(char) <= HANGUL_LAST
+    )
+
+
+class StudentSuggestIndex:
+    def __init__(self, session_factory: sessionmaker = ReadSessionLocal,
+                 refresh_seconds: float = settings.SUGGEST_REFRESH_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.session_factory = session_factory
+        self.refresh_seconds = refresh_seconds
+        self.clock = clock
+        self._keys: List[Tuple[str, int]] = []
+        self._students: Dict[int, Record] = {}
+        self._loaded_at: Optional[float] = None
+        # 재적재 중에 들어온 변경; 새 목록에 다시 적용
+        self._pending: Optional[list] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.reloads = 0
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def load(self, db: Session) -> int:
+        """(Re)build the index from the students table; returns students indexed"""
+        with self._load_lock:
+            return self._load(db)
+
+    def _load(self, db: Session) -> int:
+        with self._lock:
+            self._pending = []
+        try:
+            students = {
+                row[0]: tuple(row) for row in db.execute(
+                    select(Student.id, Student.name, Student.student_number, Student.class_name)
+                )
+            }
+            keys = sorted((key, student_id) for student_id, record in students.items()
+                          for key in _keys(record))
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            self._students, self._keys = students, keys
+            for change, value in self._pending:
+                if change == "put":
+                    self._put(value)
+                else:
+                    self._remove(value)
+            self._pending = None
+            self._loaded_at = self.clock()
+            self.reloads += 1
+        return len(students)
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Load on first use; start a background reload once the index is stale"""
+        if not self.loaded:
+            with self._load_lock:
+                if not self.loaded:
+                    self._load(db)
+        elif self.refresh_seconds > 0 and self.clock() - self._loaded_at >= self.refresh_seconds:
+            with self._lock:
+                if self._pending is not None:
+                    return
+                # 재적재가 끝날 때까지 다시 시작하지 않도록 시각을 미리 갱신
+                self._loaded_at = self.clock()
+            threading.Thread(target=self._reload, name="student-suggest-reload", daemon=True).start()
+
+    def _reload(self) -> None:
+        with self.session_factory() as db:
+            self.load(db)
+
+    def clear(self) -> None:
+        """Forget every student; the next ``ensure_loaded`` reloads"""
+        with self._lock:
+            self._keys = []
+            self._students = {}
+            self._loaded_at = None
+
+    def put(self, student: Student) -> None:
+        """Add or replace a committed student"""
+        self.put_many([(student.id, student.name, student.student_number, student.class_name)])
+
+    def put_many(self, records: Iterable[Record]) -> None:
+        with self._lock:
+            for record in records:
+                record = tuple(record)
+                if self._pending is not None:
+                    self._pending.append(("put", record))
+                if self.loaded:
+                    self._put(record)
+
+    def remove(self, student_id: int) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(("remove", student_id))
+            if self.loaded:
+                self._remove(student_id)
+
+    def _put(self, record: Record) -> None:
+        self._remove(record[0])
+        self._students[record[0]] = record
+        for key in _keys(record):
+            insort(self._keys, (key, record[0]))
+
+    def _remove(self, student_id: int) -> None:
+        record = self._students.pop(student_id, None)
+        if record is None:
+            return
+        for key in _keys(record):
+            index = bisect_left(self._keys, (key, student_id))
+            if index < len(self._keys) and self._keys[index] == (key, student_id):
+                del self._keys[index]
+
+    def suggest(self, query: str, limit: int = DEFAULT_SUGGEST_LIMIT) -> List[dict]:
+        """Students with a name, student number or 초성 starting with ``query``,
+        ordered by the matched key"""
+        query = query.strip().casefold()
+        limit = max(1, min(limit, MAX_SUGGEST_LIMIT))
+        if not query:
+            return []
+        check = None
+        if has_choseong(query):
+            prefix = choseong(query)
+            if prefix != query:
+                check = query
+        else:
+            prefix = query
+
+        results = []
+        seen = set()
+        with self._lock:
+            index = bisect_left(self._keys, (prefix,))
+            while index < len(self._keys) and len(results) < limit:
+                key, student_id = self._keys[index]
+                if not key.startswith(prefix):
+                    break
+                index += 1
+                if student_id in seen:
+                    continue
+                seen.add(student_id)
+                student_id, name, number, class_name = self._students[student_id]
+                if check is None or _syllables_match(check, name):
+                    results.append({
+                        "id": student_id, "name": name,
+                        "student_number": number, "class_name": class_name,
+                    })
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "students": len(self._students),
+                "keys": len(self._keys),
+                "reloads": self.reloads,
+            }
+
+
+student_suggestions = StudentSuggestIndex()
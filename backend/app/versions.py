@@ -0,0 +1,143 @@
+"""Table version counters.
+
+Every committed transaction that inserted, updated or deleted rows of one
+of TABLES bumps that table's counter (Session events below, so bulk
+``insert()`` / ``Query.delete()`` in the write routes, the write queue and
+AsyncSession commits are all covered). The counters live in a small
+memory-mapped file next to the SQLite database (``student_management.db-versions``),
+so every worker process sees the others' writes; other databases keep them
+per process.
+
+Reading a version is a memory read, so app.conditional (ETags) and
+app.shared_cache (entry invalidation) check them on every request.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from itertools import chain
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import _is_sqlite_file
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+
+TABLES = ("students", "attendances", "grades", "users")
+
+# 파일 머리: 생성 시 무작위 epoch, 생성 시각(ns) / 테이블마다: 버전, 마지막 변경 시각(ns)
+_HEADER = struct.Struct("<8sQ")
+_SLOT = struct.Struct("<QQ")
+
+
+def versions_path(url: str) -> Optional[str]:
+    """Counter file of a SQLite file database; None (per process) otherwise"""
+    if not _is_sqlite_file(url):
+        return None
+    return os.path.abspath(make_url(url).database) + "-versions"
+
+
+class TableVersions:
+    def __init__(self, path: Optional[str] = None, tables: Tuple[str, ...] = TABLES):
+        self.path = path
+        self.tables = tables
+        self._slots = {table: _HEADER.size + index * _SLOT.size for index, table in enumerate(tables)}
+        self._lock = threading.Lock()
+        self._fd = None
+        size = _HEADER.size + len(tables) * _SLOT.size
+        if path is None:
+            self._buffer = bytearray(size)
+            _HEADER.pack_into(self._buffer, 0, os.urandom(8), time.time_ns())
+            return
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._locked():
+            if os.fstat(self._fd).st_size < size:
+                # 새 파일이거나 테이블이 늘어남: epoch 를 바꿔 이전 ETag 와 겹치지 않게 한다
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, _HEADER.pack(os.urandom(8), time.time_ns()), 0)
+        self._buffer = mmap.mmap(self._fd, size)
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if self._fd is None or fcntl is None:
+                yield
+                return
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @property
+    def epoch(self) -> str:
+        return _HEADER.unpack_from(self._buffer, 0)[0].hex()
+
+    def bump(self, *tables: str) -> None:
+        """Mark ``tables`` as changed; names not in TABLES are ignored"""
+        offsets = {self._slots[table] for table in tables if table in self._slots}
+        if not offsets:
+            return
+        now = time.time_ns()
+        with self._locked():
+            for offset in offsets:
+                version, _ = _SLOT.unpack_from(self._buffer, offset)
+                _SLOT.pack_into(self._buffer, offset, version + 1, now)
+
+    def get(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(_SLOT.unpack_from(self._buffer, self._slots[table])[0] for table in tables)
+
+    def modified(self, tables: Iterable[str]) -> float:
+        """Time (seconds) of the last change to any of ``tables``"""
+        created = _HEADER.unpack_from(self._buffer, 0)[1]
+        return max(
+            [created] + [_SLOT.unpack_from(self._buffer, self._slots[table])[1] for table in tables]
+        ) / 1e9
+
+    def close(self) -> None:
+        if self._fd is not None:
+            self._buffer.close()
+            os.close(self._fd)
+            self._fd = None
+
+
+table_versions = TableVersions(versions_path(settings.DATABASE_URL))
+
+
+# 트랜잭션이 쓴 테이블을 모아 두었다가 커밋 후에 버전을 올린다
+def _touched(session: Session) -> set:
+    return session.info.setdefault("touched_tables", set())
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    _touched(session).update(
+        instance.__table__.name for instance in chain(session.new, session.dirty, session.deleted)
+    )
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_execute(state) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        _touched(state.session).add(state.statement.table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    touched = session.info.pop("touched_tables", None)
+    if touched:
+        table_versions.bump(*touched)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop("touched_tables", None)
@@ -0,0 +1,166 @@
+"""Group commit for single-row attendance and grade writes.
+
+With WRITE_COALESCE on, create_attendance / create_grade hand their write
+to one background writer thread instead of committing themselves. The
+writer waits up to WRITE_BATCH_WINDOW_MS for more writes (at most
+WRITE_BATCH_SIZE), runs each one in its own SAVEPOINT and commits the whole
+batch once, so N roll-call submissions cost one fsync instead of N. A write
+that fails (missing student, duplicate date, ...) only rolls back its own
+savepoint; its exception is re-raised in the request that submitted it.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import SessionLocal
+
+# 요청 스레드가 결과를 기다리는 최대 시간
+WRITE_RESULT_TIMEOUT_SECONDS = 30
+# commits_per_second 계산에 쓰는 최근 구간
+STATS_WINDOW_SECONDS = 60
+
+
+class WriteCoalescer:
+    def __init__(self, session_factory: sessionmaker = SessionLocal):
+        self.session_factory = session_factory
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._recent: deque = deque()  # (commit time, rows)
+        self.commits = 0
+        self.rows = 0
+        self.rejected = 0
+        self.failed_commits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.WRITE_COALESCE
+
+    def submit(self, func: Callable[..., Any], *args) -> Future:
+        """Queue ``func(db, *args)``. It must flush, not commit, and return plain data"""
+        future = Future()
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="write-coalescer", daemon=True)
+                self._thread.start()
+        self._queue.put((future, func, args))
+        return future
+
+    def run(self, func: Callable[..., Any], *args) -> Any:
+        """Submit and wait for the result in the calling (request) thread.
+        Close the request's own writer session first: the writer thread needs
+        the connection, and the production profile has only one. A write
+        still queued after WRITE_RESULT_TIMEOUT_SECONDS is cancelled (503);
+        one already running is waited for, since it may still commit."""
+        future = self.submit(func, *args)
+        try:
+            return future.result(timeout=WRITE_RESULT_TIMEOUT_SECONDS)
+        except TimeoutError:
+            if not future.cancel():
+                # 이미 배치에 들어갔다: 503 뒤 재시도가 중복 행을 만들지 않도록 결과를 기다린다
+                return future.result()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Write queue is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+    def _collect(self, first: tuple) -> list:
+        batch = [first]
+        deadline = time.monotonic() + settings.WRITE_BATCH_WINDOW_MS / 1000
+        while len(batch) < settings.WRITE_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # 종료 신호는 현재 배치를 처리한 뒤에
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            self._commit_batch(self._collect(first))
+
+    def _commit_batch(self, batch: list) -> None:
+        results = []
+        db: Optional[Session] = None
+        try:
+            db = self.session_factory()
+            for future, func, args in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with db.begin_nested():
+                        results.append((future, func(db, *args)))
+                except Exception as exc:
+                    self.rejected += 1
+                    future.set_exception(exc)
+            db.commit()
+        except Exception as exc:
+            # 세션을 열지 못했거나 커밋이 실패했다: 배치의 남은 요청에 오류를 전하고 스레드는 계속 돈다
+            if db is not None:
+                db.rollback()
+            self.failed_commits += 1
+            for future, _, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            if db is not None:
+                db.close()
+
+        self._record_commit(len(results))
+        for future, result in results:
+            future.set_result(result)
+
+    def _record_commit(self, rows: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self.commits += 1
+            self.rows += rows
+            self._recent.append((now, rows))
+            while self._recent and self._recent[0][0] < now - STATS_WINDOW_SECONDS:
+                self._recent.popleft()
+
+    def stats(self) -> dict:
+        with self._lock:
+            recent_commits = len(self._recent)
+            recent_rows = sum(rows for _, rows in self._recent)
+            return {
+                "enabled": self.enabled,
+                "batch_size": settings.WRITE_BATCH_SIZE,
+                "batch_window_ms": settings.WRITE_BATCH_WINDOW_MS,
+                "pending": self._queue.qsize(),
+                "commits": self.commits,
+                "rows": self.rows,
+                "rejected": self.rejected,
+                "failed_commits": self.failed_commits,
+                "commits_per_second": round(recent_commits / STATS_WINDOW_SECONDS, 3),
+                "rows_per_commit": round(recent_rows / recent_commits, 2) if recent_commits else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """Finish queued writes and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+
+
+write_queue = WriteCoalescer()
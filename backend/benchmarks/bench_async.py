@@ -0,0 +1,127 @@
+"""스레드풀(동기 Session) 모델과 AsyncSession 모델의 워커당 처리량 비교 부하 테스트
+
+같은 요청 묶음(학생 조회, 학생별 출결/성적 조회, 목록 페이지)을 ASYNC_DB=0/1 로
+각각 새 프로세스에서 실행하고 초당 처리 요청 수와 p99 지연을 출력한다.
+
+    cd backend
+    python -m benchmarks.bench_async --requests 3000 --concurrency 15
+
+동기 모드는 동시 요청이 커넥션 풀(기본 5 + overflow 10)보다 훨씬 많으면 스레드가 모두
+커넥션을 기다리며 멈출 수 있다 (풀 타임아웃 30초 후 TimeoutError).
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+
+def seed(students: int, days: int):
+    from app.database import SessionLocal
+    from app.models.attendance import Attendance, AttendanceStatus
+    from app.models.grade import Grade
+    from app.models.student import Student
+    from app.rollups import rebuild_rollups
+
+    with SessionLocal() as db:
+        db.add_all(
+            Student(name=f"Student {number}", student_number=str(number), class_name=f"{number % 10}반")
+            for number in range(students)
+        )
+        db.flush()
+        ids = [student_id for (student_id,) in db.query(Student.id)]
+        start = date.today() - timedelta(days=days)
+        db.add_all(
+            Attendance(student_id=student_id, date=start + timedelta(days=day),
+                       status=random.choice(list(AttendanceStatus)))
+            for student_id in ids for day in range(days)
+        )
+        db.add_all(
+            Grade(student_id=student_id, subject=subject, score=random.uniform(40, 100))
+            for student_id in ids for subject in ("국어", "영어", "수학")
+        )
+        db.commit()
+        rebuild_rollups(db)
+    return ids
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+
+    ids = seed(args.students, args.days)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post(
+            "/api/auth/register", json={"username": "bench", "password": "password", "role": "teacher"}
+        )
+        response = await client.post("/api/auth/login", data={"username": "bench", "password": "password"})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        paths = ["/api/students/{id}", "/api/attendance/student/{id}",
+                 "/api/grades/student/{id}", "/api/students/?limit=50"]
+        gate = asyncio.Semaphore(args.concurrency)
+        latencies, errors = [], 0
+
+        async def one(number):
+            nonlocal errors
+            path = paths[number % len(paths)].format(id=random.choice(ids))
+            async with gate:
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                errors += response.status_code != 200
+
+        await asyncio.gather(*(one(number) for number in range(min(200, args.requests))))  # warm-up
+        latencies.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(one(number) for number in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    print(
+        f"  {args.requests / elapsed:8.0f} req/s  p50={percentile(latencies, 50):7.1f}ms "
+        f"p99={percentile(latencies, 99):7.1f}ms  errors={errors}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=15)
+    parser.add_argument("--students", type=int, default=300)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--mode", choices=["sync", "async"])
+    args = parser.parse_args()
+
+    if args.mode:
+        asyncio.run(run(args))
+        return
+
+    # ASYNC_DB 는 import 시점에 읽히므로 모드마다 새 프로세스에서 실행
+    for mode in ("sync", "async"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                DATABASE_URL=f"sqlite:///{tmp}/bench.db",
+                ASYNC_DB=str(mode == "async"),
+                BCRYPT_ROUNDS="4",
+            )
+            print(f"{mode} (ASYNC_DB={mode == 'async'}, concurrency={args.concurrency})")
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_async", "--mode", mode,
+                 *(f"--{name}={value}" for name, value in vars(args).items() if name != "mode")],
+                env=env, check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
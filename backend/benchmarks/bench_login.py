@@ -0,0 +1,112 @@
+"""로그인 폭주 상황에서 로그인 / 일반 조회 p99 비교 벤치마크
+
+bcrypt 를 요청 스레드에서 실행하는 기존 방식(PASSWORD_HASH_WORKERS=0)과
+전용 프로세스 풀을 사용하는 방식을 같은 부하로 비교한다.
+
+    cd backend
+    python -m benchmarks.bench_login --logins 200 --reads 400 --concurrency 15
+
+동시 요청 수는 DB 커넥션 풀 크기(기본 5 + overflow 10) 이하로 둔다.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for number in range(args.users):
+            await client.post(
+                "/api/auth/register",
+                json={"username": f"user{number}", "password": "password", "role": "teacher"},
+            )
+        response = await client.post("/api/auth/login", data={"username": "user0", "password": "password"})
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        gate = asyncio.Semaphore(args.concurrency)
+        latencies = {"login": [], "read": []}
+        rejected = 0
+
+        async def timed(kind, call):
+            nonlocal rejected
+            async with gate:
+                started = time.perf_counter()
+                response = await call()
+                latencies[kind].append(time.perf_counter() - started)
+                if response.status_code == 503:
+                    rejected += 1
+
+        def login(number):
+            data = {"username": f"user{number % args.users}", "password": "password"}
+            return lambda: client.post("/api/auth/login", data=data)
+
+        def read():
+            return client.get("/api/students/?limit=20", headers=headers)
+
+        tasks = [timed("login", login(number)) for number in range(args.logins)]
+        tasks += [timed("read", read) for _ in range(args.reads)]
+        # 로그인과 조회가 섞여서 도착하도록 인터리브
+        tasks = tasks[::2] + tasks[1::2]
+        started = time.perf_counter()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    for kind, samples in latencies.items():
+        print(
+            f"  {kind:<5} n={len(samples):<5} p50={percentile(samples, 50):8.1f}ms "
+            f"p99={percentile(samples, 99):8.1f}ms mean={statistics.mean(samples) * 1000:8.1f}ms"
+        )
+    print(f"  total {elapsed:.2f}s, rejected with 503: {rejected}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--reads", type=int, default=400)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=15)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=32)
+    parser.add_argument("--mode", choices=["inline", "pool"])
+    args = parser.parse_args()
+
+    if args.mode:
+        asyncio.run(run(args))
+        return
+
+    # 설정은 import 시점에 읽히므로 모드마다 새 프로세스에서 실행
+    for mode, workers in (("inline", 0), ("pool", args.workers)):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(
+                os.environ,
+                DATABASE_URL=f"sqlite:///{tmp}/bench.db",
+                BCRYPT_ROUNDS=str(args.rounds),
+                PASSWORD_HASH_WORKERS=str(workers),
+                PASSWORD_HASH_MAX_PENDING=str(args.max_pending),
+            )
+            print(f"{mode} (PASSWORD_HASH_WORKERS={workers})")
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_login", "--mode", mode,
+                 *(f"--{name.replace('_', '-')}={value}" for name, value in vars(args).items()
+                   if name != "mode")],
+                env=env, check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
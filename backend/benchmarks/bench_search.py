@@ -0,0 +1,74 @@
+"""학생 검색(FTS5) 지연 시간 벤치마크
+
+임시 DB 에 학생을 채우고 여러 종류의 검색어로 app.search.search 를 실행해
+첫 페이지(limit 100)를 가져오는 시간을 측정한다.
+
+    cd backend
+    python -m benchmarks.bench_search --students 500000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+LAST_NAMES = "김이박최정강조윤장임한오서신권황안송류전홍"
+FIRST_NAMES = "민서준지현우수영예하도윤은채시아주원건유진태"
+QUERIES = [
+    ("full name", lambda row: {"name": row["name"]}),
+    ("2 chars", lambda row: {"name": row["name"][1:]}),
+    ("1 char", lambda row: {"name": row["name"][0]}),
+    ("초성 3", lambda row: {"name": row["choseong"]}),
+    ("초성 2", lambda row: {"name": row["choseong"][:2]}),
+    ("student no.", lambda row: {"student_number": row["student_number"]}),
+    ("q + class", lambda row: {"any": row["name"][1:], "class_name": row["class_name"]}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=500000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+    from sqlalchemy import insert
+    from app.database import Base, SessionLocal, engine
+    from app.models.student import Student
+    from app.search import choseong, rebuild_search_index, search
+
+    Base.metadata.create_all(bind=engine)
+    random.seed(1)
+    rows = [
+        {"name": random.choice(LAST_NAMES) + "".join(random.choices(FIRST_NAMES, k=2)),
+         "student_number": f"{2015 + number % 10}{number:07d}", "class_name": f"{number % 12 + 1}반"}
+        for number in range(args.students)
+    ]
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        db.execute(insert(Student.__table__), rows)
+        db.commit()
+        rebuild_search_index(db)
+    print(f"indexed {args.students} students in {time.perf_counter() - started:.1f}s")
+
+    with SessionLocal() as db:
+        for label, terms in QUERIES:
+            samples = []
+            for _ in range(args.repeat):
+                row = random.choice(rows)
+                values = terms(dict(row, choseong=choseong(row["name"])))
+                class_name = values.pop("class_name", None)
+                started = time.perf_counter()
+                results = search(db, db.query(Student), values, class_name=class_name).limit(100).all()
+                samples.append((time.perf_counter() - started) * 1000)
+                assert results, (label, values)
+            samples.sort()
+            print(f"  {label:<12} p50={statistics.median(samples):6.2f}ms "
+                  f"p95={samples[int(len(samples) * 0.95)]:6.2f}ms max={samples[-1]:6.2f}ms")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
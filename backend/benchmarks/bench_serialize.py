@@ -0,0 +1,125 @@
+"""출결 목록 직렬화 경로 비교 벤치마크
+
+기존 경로(ORM 객체 -> response_model 검증 -> 표준 json)와 app.responses 의
+빠른 경로(컬럼 튜플 -> orjson), 컬럼 형식(format=columns), MessagePack 으로
+같은 출결 행을 응답 본문까지 만드는 데 걸리는 시간(초당 행 수), 최대 메모리
+(tracemalloc), 본문 크기를 행 수별로 출력한다.
+
+    cd backend
+    python -m benchmarks.bench_serialize --rows 10000 100000
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from functools import partial
+from typing import List
+
+
+def seed(rows: int):
+    from sqlalchemy import insert
+    from app.database import SessionLocal
+    from app.models.attendance import Attendance, AttendanceStatus
+    from app.models.student import Student
+
+    students = 1000
+    days = -(-rows // students)
+    start = date(2024, 3, 1)
+    with SessionLocal() as db:
+        db.execute(insert(Student), [
+            {"name": f"Student {number}", "student_number": str(number), "class_name": f"{number % 10}반"}
+            for number in range(students)
+        ])
+        db.execute(insert(Attendance), [
+            {"student_id": student_id, "date": start + timedelta(days=day),
+             "status": random.choice(list(AttendanceStatus))}
+            for student_id in range(1, students + 1) for day in range(days)
+        ])
+        db.commit()
+
+
+def response_model_path(db, rows: int) -> bytes:
+    """What FastAPI does for response_model=List[AttendanceResponse]"""
+    from pydantic import TypeAdapter
+    from app.models.attendance import Attendance
+    from app.schemas.attendance import AttendanceResponse
+
+    adapter = TypeAdapter(List[AttendanceResponse])
+    entities = db.query(Attendance).order_by(Attendance.date, Attendance.id).limit(rows).all()
+    validated = adapter.validate_python(entities, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def fast_path(db, rows: int, fmt: str = "json") -> bytes:
+    from fastapi import Response
+    from app.models.attendance import Attendance
+    from app.responses import list_response, row_columns
+
+    result = db.query(*row_columns(Attendance)).order_by(Attendance.date, Attendance.id).limit(rows).all()
+    return list_response(result, Response(), fmt).body
+
+
+PATHS = (
+    ("response_model", response_model_path),
+    ("fast path", fast_path),
+    ("columns", partial(fast_path, fmt="columns")),
+    ("msgpack", partial(fast_path, fmt="msgpack")),
+)
+
+
+def measure(path, rows: int, repeat: int):
+    from app.database import SessionLocal
+
+    timings = []
+    for _ in range(repeat):
+        with SessionLocal() as db:
+            gc.collect()
+            started = time.perf_counter()
+            body = path(db, rows)
+            timings.append(time.perf_counter() - started)
+    with SessionLocal() as db:
+        gc.collect()
+        tracemalloc.start()
+        path(db, rows)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return min(timings), peak, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+    from app.database import Base, engine
+    import app.models  # noqa: F401  (테이블 등록)
+
+    Base.metadata.create_all(bind=engine)
+    random.seed(1)
+    seed(max(args.rows))
+
+    for rows in args.rows:
+        print(f"{rows} rows")
+        results = {}
+        for label, path in PATHS:
+            seconds, peak, body = measure(path, rows, args.repeat)
+            results[label] = (seconds, peak, body)
+            base = results["response_model"]
+            print(f"  {label:<15} {rows / seconds:>10,.0f} rows/s  "
+                  f"peak={peak / 1024 / 1024:6.1f}MB  body={len(body) / 1024:7,.0f}KB  "
+                  f"(time x{seconds / base[0]:.2f}, body x{len(body) / len(base[2]):.2f})")
+        assert json.loads(results["response_model"][2]) == json.loads(results["fast path"][2])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
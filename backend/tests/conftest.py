@@ -1,12 +1,22 @@
 """pytest configuration and fixtures"""
+import os
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+# Cheap bcrypt cost for the test suite; must be set before app.config is imported
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Per-process cache; the SQLite backend is covered in test_shared_cache.py
+os.environ.setdefault("CACHE_BACKEND", "memory")
+
 from app.main import app
-from app.database import Base, get_db
+from app.metrics import instrument_engine
+from app.shared_cache import shared_cache
+from app.suggest import student_suggestions
+from app.database import Base, batch_session, get_db, get_read_db, get_session_factory
 
 
 # Test database setup
@@ -17,10 +27,16 @@ engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+# Same per-request DB metrics as the app's engines
+instrument_engine(engine)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
 def override_get_db():
+    shared = batch_session.get()
+    if shared is not None:
+        yield shared
+        return
     db = TestingSessionLocal()
     try:
         yield db
@@ -33,6 +49,10 @@ def client():
     """Create a test client with a fresh database for each test"""
     Base.metadata.create_all(bind=engine)
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: TestingSessionLocal
+    shared_cache.clear()
+    student_suggestions.clear()
 
     with TestClient(app) as test_client:
         yield test_client
@@ -73,3 +93,16 @@ def sample_student(client, auth_headers):
         json={"name": "Test Student", "student_number": "2024001", "class_name": "Class 1"}
     )
     return response.json()
+
+
+@pytest.fixture
+def query_counter():
+    """Count SQL statements executed on the test engine"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
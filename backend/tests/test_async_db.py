@@ -0,0 +1,161 @@
+"""AsyncSession (ASYNC_DB) router tests"""
+import inspect
+from datetime import date
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.auth import user_cache
+from app.database import (
+    Base, async_database_url, get_async_db, get_db, get_read_db, get_session_factory
+)
+from app.rollups import check_rollups
+from app.routers import auth, students, students_async, attendance_async, grades_async
+
+
+@pytest.fixture
+def async_app(tmp_path):
+    """App with the async routers on a file database shared with a sync engine"""
+    url = f"sqlite:///{tmp_path / 'async.db'}"
+    sync_engine = create_engine(url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=sync_engine)
+    SyncSession = sessionmaker(autoflush=False, bind=sync_engine)
+    # 테스트마다 이벤트 루프가 바뀌므로 커넥션을 재사용하지 않음
+    async_engine = create_async_engine(async_database_url(url), poolclass=NullPool)
+    AsyncSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        with SyncSession() as db:
+            yield db
+
+    async def override_get_async_db():
+        async with AsyncSession() as db:
+            yield db
+
+    app = FastAPI()
+    for module in (auth, students_async, attendance_async, grades_async):
+        app.include_router(module.router)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: SyncSession
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    user_cache.clear()
+
+    yield app, SyncSession
+    sync_engine.dispose()
+
+
+@pytest.fixture
+def async_client(async_app):
+    app, _ = async_app
+    with TestClient(app) as test_client:
+        test_client.post(
+            "/api/auth/register",
+            json={"username": "admin", "password": "admin123", "role": "admin"}
+        )
+        token = test_client.post(
+            "/api/auth/login", data={"username": "admin", "password": "admin123"}
+        ).json()["access_token"]
+        test_client.headers["Authorization"] = f"Bearer {token}"
+        yield test_client
+
+
+class TestAsyncRouters:
+    """Tests for the ASYNC_DB student, attendance and grade routes"""
+
+    def test_async_routes_replace_sync_ones(self):
+        """Test CRUD routes are coroutines and sync-only endpoints are kept in order"""
+        paths = [(route.path, route.methods) for route in students_async.router.routes]
+        assert paths == [(route.path, route.methods) for route in students.router.routes]
+
+        endpoints = {route.name: route.endpoint for route in students_async.router.routes}
+        assert inspect.iscoroutinefunction(endpoints["get_students"])
+        assert inspect.iscoroutinefunction(endpoints["delete_student"])
+        assert endpoints["import_students"] is students.import_students
+
+    def test_crud_round_trip(self, async_client, async_app):
+        """Test create, list, update and delete keep rollups consistent"""
+        _, SyncSession = async_app
+        student_ids = []
+        for number in range(3):
+            response = async_client.post(
+                "/api/students/",
+                json={"name": f"Student {number}", "student_number": str(number), "class_name": "A"}
+            )
+            assert response.status_code == 200
+            student_ids.append(response.json()["id"])
+
+        duplicate = async_client.post(
+            "/api/students/", json={"name": "Dup", "student_number": "0", "class_name": "A"}
+        )
+        assert duplicate.status_code == 400
+
+        page = async_client.get("/api/students/?limit=2")
+        assert [row["id"] for row in page.json()] == student_ids[:2]
+        rest = async_client.get(f"/api/students/?cursor={page.headers['X-Next-Cursor']}")
+        assert [row["id"] for row in rest.json()] == student_ids[2:]
+
+        attendance = async_client.post(
+            "/api/attendance/",
+            json={"student_id": student_ids[0], "date": str(date.today()), "status": "출석"}
+        )
+        assert attendance.status_code == 200
+        again = async_client.post(
+            "/api/attendance/",
+            json={"student_id": student_ids[0], "date": str(date.today()), "status": "지각"}
+        )
+        assert again.status_code == 400
+
+        grade = async_client.post(
+            "/api/grades/", json={"student_id": student_ids[0], "subject": "Math", "score": 70.0}
+        )
+        assert grade.status_code == 200
+        moved = async_client.put(
+            f"/api/grades/{grade.json()['id']}",
+            json={"student_id": student_ids[1], "subject": "Math", "score": 95.0}
+        )
+        assert moved.json()["student_id"] == student_ids[1]
+        async_client.put(f"/api/students/{student_ids[1]}", json={"class_name": "B"})
+
+        assert len(async_client.get(f"/api/grades/student/{student_ids[1]}").json()) == 1
+        assert len(async_client.get("/api/grades/?class_name=B&min_score=90").json()) == 1
+        assert async_client.get("/api/grades/?include=student").json()[0]["class_name"] == "B"
+        assert async_client.get(
+            f"/api/grades/student/{student_ids[1]}?include=student"
+        ).json()[0]["student_name"] == "Student 1"
+        assert len(async_client.get("/api/attendance/?student_name=Student 0&status=출석").json()) == 1
+        assert async_client.delete(f"/api/attendance/{attendance.json()['id']}").status_code == 200
+        assert async_client.delete(f"/api/students/{student_ids[1]}").status_code == 200
+        assert async_client.get(f"/api/students/{student_ids[1]}").status_code == 404
+        assert async_client.get("/api/grades/").json() == []
+
+        with SyncSession() as db:
+            assert check_rollups(db) == []
+
+    def test_sync_only_endpoint_still_served(self, async_client):
+        """Test endpoints without an async version use the sync implementation"""
+        response = async_client.post(
+            "/api/students/import",
+            content="name,student_number,class_name\nKim,1,A\n",
+            headers={"Content-Type": "text/csv"}
+        )
+        assert response.json()["imported"] == 1
+        assert len(async_client.get("/api/students/search?class_name=A").json()) == 1
+
+
+class TestAsyncDatabaseUrl:
+    """Tests for app.database.async_database_url"""
+
+    @pytest.mark.parametrize("url, expected", [
+        ("sqlite:///./app.db", "sqlite+aiosqlite:///./app.db"),
+        ("postgresql://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+        ("postgresql+psycopg://u:p@db/app", "postgresql+psycopg://u:p@db/app"),
+    ])
+    def test_driver_mapping(self, url, expected):
+        """Test a default driver is swapped for its async counterpart"""
+        assert async_database_url(url) == expected
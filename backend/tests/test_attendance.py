@@ -1,6 +1,8 @@
 """Attendance API tests"""
+import json
+import msgpack
 import pytest
-from datetime import date
+from datetime import date, timedelta
 
 
 class TestAttendanceCreate:
@@ -91,3 +93,380 @@ class TestAttendanceDelete:
             headers=auth_headers
         )
         assert response.status_code == 200
+
+
+class TestAttendanceBulk:
+    """Tests for POST /api/attendance/bulk endpoint"""
+
+    def create_students(self, client, auth_headers, count, class_name="Class 1"):
+        ids = []
+        for i in range(count):
+            response = client.post(
+                "/api/students/",
+                headers=auth_headers,
+                json={"name": f"Student {i}", "student_number": f"B{i:04d}", "class_name": class_name}
+            )
+            ids.append(response.json()["id"])
+        return ids
+
+    def test_bulk_sheet_success(self, client, auth_headers):
+        """Test a class roll call sheet is inserted in one request"""
+        ids = self.create_students(client, auth_headers, 3)
+        response = client.post(
+            "/api/attendance/bulk",
+            headers=auth_headers,
+            json={
+                "date": str(date.today()),
+                "class_name": "Class 1",
+                "entries": [{"student_id": i, "status": "출석"} for i in ids]
+            }
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 3
+        assert data["failed"] == 0
+        assert all(row["id"] is not None for row in data["results"])
+
+        response = client.get("/api/attendance/", headers=auth_headers)
+        assert len(response.json()) == 3
+
+    def test_bulk_reports_row_errors(self, client, auth_headers, sample_student):
+        """Test invalid rows are reported while valid rows are inserted"""
+        today = str(date.today())
+        client.post(
+            "/api/attendance/",
+            headers=auth_headers,
+            json={"student_id": sample_student["id"], "date": today, "status": "출석"}
+        )
+        other_class = self.create_students(client, auth_headers, 1, class_name="Class 2")[0]
+        yesterday = str(date.today() - timedelta(days=1))
+
+        response = client.post(
+            "/api/attendance/bulk",
+            headers=auth_headers,
+            json={
+                "items": [
+                    {"student_id": sample_student["id"], "date": today, "status": "지각"},
+                    {"student_id": 999, "date": today, "status": "출석"},
+                    {"student_id": sample_student["id"], "date": yesterday, "status": "결석"},
+                    {"student_id": sample_student["id"], "date": yesterday, "status": "출석"},
+                    {"student_id": other_class, "date": today, "status": "출석"},
+                ]
+            }
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 2
+        assert data["failed"] == 3
+        assert [row["error"] for row in data["results"]] == [
+            "Attendance already recorded for this date",
+            "Student not found",
+            None,
+            "Duplicate row in request",
+            None,
+        ]
+
+    def test_bulk_concurrent_insert_is_reported(self, client, auth_headers, sample_student, monkeypatch):
+        """Test a row recorded between the check and the insert is reported, not a 500"""
+        from app.routers import attendance
+
+        today = str(date.today())
+        client.post(
+            "/api/attendance/",
+            headers=auth_headers,
+            json={"student_id": sample_student["id"], "date": today, "status": "출석"}
+        )
+        checks = []
+        recorded = attendance._recorded_attendance
+
+        def stale_first_check(*args):
+            # 첫 확인은 아직 저장되지 않은 것처럼 본다 (동시 요청이 그 사이에 저장)
+            checks.append(1)
+            return set() if len(checks) == 1 else recorded(*args)
+
+        monkeypatch.setattr(attendance, "_recorded_attendance", stale_first_check)
+        other = self.create_students(client, auth_headers, 1)[0]
+        response = client.post(
+            "/api/attendance/bulk",
+            headers=auth_headers,
+            json={
+                "date": today,
+                "entries": [{"student_id": sample_student["id"], "status": "지각"},
+                            {"student_id": other, "status": "출석"}]
+            }
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["created"], data["failed"], len(checks)) == (1, 1, 2)
+        assert data["results"][0]["error"] == "Attendance already recorded for this date"
+        assert len(client.get("/api/attendance/", headers=auth_headers).json()) == 2
+
+        summary = client.get("/api/stats/attendance/summary", headers=auth_headers).json()
+        assert summary["total"] == 2
+
+    def test_bulk_sheet_requires_date(self, client, auth_headers):
+        """Test sheet entries without a date are rejected"""
+        response = client.post(
+            "/api/attendance/bulk",
+            headers=auth_headers,
+            json={"entries": [{"student_id": 1, "status": "출석"}]}
+        )
+        assert response.status_code == 422
+
+    def test_bulk_query_count_is_constant(self, client, auth_headers, query_counter):
+        """Test validation and insert do not issue per-row queries"""
+        ids = self.create_students(client, auth_headers, 40)
+
+        def roll_call(day, student_ids):
+            query_counter.clear()
+            response = client.post(
+                "/api/attendance/bulk",
+                headers=auth_headers,
+                json={
+                    "date": str(day),
+                    "entries": [{"student_id": i, "status": "출석"} for i in student_ids]
+                }
+            )
+            assert response.json()["created"] == len(student_ids)
+            return len(query_counter)
+
+        assert roll_call(date.today(), ids[:2]) == roll_call(date.today() - timedelta(days=1), ids)
+
+
+class TestAttendancePagination:
+    """Tests for cursor pagination on GET /api/attendance/"""
+
+    def test_cursor_pages_in_date_order(self, client, auth_headers, sample_student):
+        """Test walking all pages with X-Next-Cursor"""
+        days = [date(2024, 3, day) for day in (5, 1, 4, 2, 3)]
+        client.post(
+            "/api/attendance/bulk",
+            headers=auth_headers,
+            json={"items": [
+                {"student_id": sample_student["id"], "date": str(day), "status": "출석"}
+                for day in days
+            ]}
+        )
+
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = client.get("/api/attendance/", headers=auth_headers, params=params)
+            assert response.status_code == 200
+            assert len(response.json()) <= 2
+            seen += [row["date"] for row in response.json()]
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert seen == [str(day) for day in sorted(days)]
+
+    def test_skip_still_supported(self, client, auth_headers, sample_student):
+        """Test legacy skip/limit paging"""
+        client.post(
+            "/api/attendance/bulk",
+            headers=auth_headers,
+            json={"date": "2024-03-01", "entries": [{"student_id": sample_student["id"], "status": "지각"}]}
+        )
+        client.post(
+            "/api/attendance/bulk",
+            headers=auth_headers,
+            json={"date": "2024-03-02", "entries": [{"student_id": sample_student["id"], "status": "결석"}]}
+        )
+        response = client.get("/api/attendance/?skip=1&limit=1", headers=auth_headers)
+        assert [row["status"] for row in response.json()] == ["결석"]
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_rows_match_response_model(self, client, auth_headers, sample_student):
+        """Test the orjson fast path returns exactly the AttendanceResponse fields"""
+        client.post(
+            "/api/attendance/",
+            headers=auth_headers,
+            json={"student_id": sample_student["id"], "date": "2024-03-04", "status": "결석"}
+        )
+        response = client.get("/api/attendance/", headers=auth_headers)
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == [
+            {"id": response.json()[0]["id"], "student_id": sample_student["id"],
+             "date": "2024-03-04", "status": "결석"}
+        ]
+
+    def test_columns_format(self, client, auth_headers, sample_student):
+        """Test format=columns returns column arrays with dictionary-encoded status"""
+        client.post(
+            "/api/attendance/bulk",
+            headers=auth_headers,
+            json={"items": [
+                {"student_id": sample_student["id"], "date": f"2024-03-0{day}", "status": status}
+                for day, status in ((1, "지각"), (2, "출석"), (3, "지각"))
+            ]}
+        )
+        response = client.get("/api/attendance/?format=columns&limit=2", headers=auth_headers)
+        assert response.headers["content-type"] == "application/vnd.columns+json"
+        assert "X-Next-Cursor" in response.headers
+        body = response.json()
+        assert body["length"] == 2
+        assert body["columns"]["date"] == ["2024-03-01", "2024-03-02"]
+        assert body["columns"]["status"] == [0, 1]
+        assert body["dictionaries"] == {"status": ["지각", "출석"]}
+
+    def test_msgpack_by_accept_header(self, client, auth_headers, sample_student):
+        """Test Accept: application/msgpack returns the columnar document as MessagePack"""
+        client.post(
+            "/api/attendance/",
+            headers=auth_headers,
+            json={"student_id": sample_student["id"], "date": "2024-03-04", "status": "결석"}
+        )
+        response = client.get(
+            "/api/attendance/?include=student",
+            headers={**auth_headers, "Accept": "application/msgpack"}
+        )
+        assert response.headers["content-type"] == "application/msgpack"
+        body = msgpack.unpackb(response.content)
+        assert body["columns"]["date"] == ["2024-03-04"]
+        assert body["dictionaries"] == {"status": ["결석"], "class_name": ["Class 1"]}
+
+    def test_invalid_cursor(self, client, auth_headers):
+        """Test a garbled cursor is rejected"""
+        response = client.get("/api/attendance/?cursor=not-a-cursor", headers=auth_headers)
+        assert response.status_code == 400
+
+
+class TestAttendanceFilters:
+    """Tests for the filter parameters of GET /api/attendance/"""
+
+    @pytest.fixture
+    def sheet(self, client, auth_headers):
+        ids = [
+            client.post(
+                "/api/students/",
+                headers=auth_headers,
+                json={"name": name, "student_number": number, "class_name": class_name}
+            ).json()["id"]
+            for name, number, class_name in (("김철수", "1", "1반"), ("이영희", "2", "2반"))
+        ]
+        client.post(
+            "/api/attendance/bulk",
+            headers=auth_headers,
+            json={"items": [
+                {"student_id": student_id, "date": f"2024-03-0{day}", "status": status}
+                for student_id in ids
+                for day, status in ((1, "출석"), (2, "지각"), (3, "결석"))
+            ]}
+        )
+        return ids
+
+    def fetch(self, client, auth_headers, **params):
+        response = client.get("/api/attendance/", headers=auth_headers, params=params)
+        assert response.status_code == 200
+        return [(row["student_id"], row["date"]) for row in response.json()]
+
+    def test_date_and_status(self, client, auth_headers, sheet):
+        """Test exact date, date range and status filters"""
+        kim, lee = sheet
+        assert self.fetch(client, auth_headers, date="2024-03-02") == [
+            (kim, "2024-03-02"), (lee, "2024-03-02")
+        ]
+        assert self.fetch(client, auth_headers, start_date="2024-03-02", status="결석") == [
+            (kim, "2024-03-03"), (lee, "2024-03-03")
+        ]
+        assert self.fetch(client, auth_headers, end_date="2024-03-01", student_id=lee) == [
+            (lee, "2024-03-01")
+        ]
+
+    def test_student_filters(self, client, auth_headers, sheet):
+        """Test class and student name (including 초성) filters"""
+        kim, lee = sheet
+        assert {row[0] for row in self.fetch(client, auth_headers, class_name="2반")} == {lee}
+        assert {row[0] for row in self.fetch(client, auth_headers, student_name="철수")} == {kim}
+        assert {row[0] for row in self.fetch(client, auth_headers, student_name="ㅇㅇㅎ")} == {lee}
+        assert self.fetch(client, auth_headers, student_name="철수", class_name="2반") == []
+
+    def test_filters_with_cursor(self, client, auth_headers, sheet):
+        """Test the next-page cursor keeps the filter"""
+        kim, _ = sheet
+        first = client.get("/api/attendance/?class_name=1반&limit=2", headers=auth_headers)
+        second = client.get(
+            f"/api/attendance/?class_name=1반&limit=2&cursor={first.headers['X-Next-Cursor']}",
+            headers=auth_headers
+        )
+        assert [row["date"] for row in first.json() + second.json()] == [
+            "2024-03-01", "2024-03-02", "2024-03-03"
+        ]
+        assert {row["student_id"] for row in second.json()} == {kim}
+
+    def test_include_student_is_one_query(self, client, auth_headers, sheet, query_counter):
+        """Test include=student embeds student columns with a single JOIN"""
+        kim, _ = sheet
+        client.get("/api/attendance/?limit=1", headers=auth_headers)
+        query_counter.clear()
+        response = client.get(
+            "/api/attendance/?include=student&status=출석", headers=auth_headers
+        )
+        assert len(query_counter) == 1
+        assert response.json()[0] == {
+            "id": response.json()[0]["id"], "student_id": kim, "date": "2024-03-01", "status": "출석",
+            "student_name": "김철수", "student_number": "1", "class_name": "1반",
+        }
+
+        rows = client.get(f"/api/attendance/student/{kim}?include=student", headers=auth_headers).json()
+        assert {row["student_name"] for row in rows} == {"김철수"}
+        assert "student_name" not in client.get("/api/attendance/", headers=auth_headers).json()[0]
+
+    def test_invalid_status(self, client, auth_headers):
+        """Test an unknown status is rejected"""
+        response = client.get("/api/attendance/?status=present", headers=auth_headers)
+        assert response.status_code == 422
+
+
+class TestAttendanceExport:
+    """Tests for GET /api/attendance/export endpoint"""
+
+    def test_export_csv_with_filters(self, client, auth_headers, sample_student):
+        """Test CSV export honours the date range"""
+        client.post(
+            "/api/attendance/bulk",
+            headers=auth_headers,
+            json={"items": [
+                {"student_id": sample_student["id"], "date": f"2024-03-0{day}", "status": "출석"}
+                for day in (1, 2, 3)
+            ]}
+        )
+        response = client.get(
+            "/api/attendance/export?start_date=2024-03-02&end_date=2024-03-03",
+            headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        lines = response.content.decode("utf-8-sig").splitlines()
+        assert lines[0] == "id,student_id,student_number,name,class_name,date,status"
+        assert [line.split(",")[5:] for line in lines[1:]] == [
+            ["2024-03-02", "출석"], ["2024-03-03", "출석"]
+        ]
+
+    def test_export_ndjson_by_class(self, client, auth_headers, sample_student):
+        """Test NDJSON export filtered by class streams every matching row"""
+        client.post(
+            "/api/attendance/bulk",
+            headers=auth_headers,
+            json={"items": [
+                {"student_id": sample_student["id"], "date": str(date(2024, 1, 1) + timedelta(days=i)),
+                 "status": "지각"}
+                for i in range(2500)
+            ]}
+        )
+        response = client.get(
+            "/api/attendance/export?format=ndjson&class_name=Class 1", headers=auth_headers
+        )
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        assert len(rows) == 2500
+        assert rows[0]["class_name"] == "Class 1"
+        assert rows[0]["status"] == "지각"
+
+        response = client.get(
+            "/api/attendance/export?format=ndjson&class_name=Other", headers=auth_headers
+        )
+        assert response.text == ""
@@ -78,3 +78,120 @@ class TestAuthLogin:
             data={"username": "nouser", "password": "testpass"}
         )
         assert response.status_code == 401
+
+
+class TestAuthUserCache:
+    """Tests for the verified-token cache in get_current_user"""
+
+    def test_cache_hit_runs_no_user_query(self, client, auth_headers, query_counter):
+        """Test a repeated token skips the user lookup"""
+        client.get("/api/grades/", headers=auth_headers)
+        query_counter.clear()
+        client.get("/api/grades/", headers=auth_headers)
+        assert not any("FROM users" in statement for statement in query_counter)
+
+        stats = client.get("/api/auth/cache-stats", headers=auth_headers).json()
+        assert stats["hits"] >= 2
+        assert stats["misses"] >= 1
+
+    def test_cache_invalidated_on_user_change(self, client, auth_headers):
+        """Test a role change takes effect immediately"""
+        from app.models.user import User, UserRole
+        from tests.conftest import TestingSessionLocal
+
+        assert client.get("/api/auth/cache-stats", headers=auth_headers).status_code == 200
+
+        db = TestingSessionLocal()
+        try:
+            db.query(User).filter(User.username == "admin").one().role = UserRole.student
+            db.commit()
+        finally:
+            db.close()
+
+        assert client.get("/api/auth/cache-stats", headers=auth_headers).status_code == 403
+
+    def test_cache_respects_token_expiry(self, client):
+        """Test an entry is not kept past the token's exp claim"""
+        import time
+        from datetime import timedelta
+        from app.auth import create_access_token, user_cache
+
+        client.post(
+            "/api/auth/register",
+            json={"username": "shortlived", "password": "testpass"}
+        )
+        token = create_access_token({"sub": "shortlived"}, expires_delta=timedelta(seconds=2))
+        response = client.get("/api/grades/", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        assert user_cache.get(token) is not None
+
+        user_cache.clock = lambda: time.time() + 3
+        try:
+            assert user_cache.get(token) is None
+        finally:
+            user_cache.clock = time.time
+
+
+class TestAuthPasswordHasher:
+    """Tests for the bcrypt process pool behind register and login"""
+
+    def test_login_rehashes_on_cost_change(self, client, monkeypatch):
+        """Test a login upgrades a hash made with the old cost factor"""
+        from app.config import settings
+        from app.models.user import User
+        from tests.conftest import TestingSessionLocal
+
+        client.post("/api/auth/register", json={"username": "testuser", "password": "testpass"})
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+
+        response = client.post(
+            "/api/auth/login", data={"username": "testuser", "password": "testpass"}
+        )
+        assert response.status_code == 200
+
+        db = TestingSessionLocal()
+        try:
+            password_hash = db.query(User).filter(User.username == "testuser").one().password_hash
+            assert password_hash.startswith("$2b$05$")
+        finally:
+            db.close()
+
+        response = client.post(
+            "/api/auth/login", data={"username": "testuser", "password": "testpass"}
+        )
+        assert response.status_code == 200
+
+    def test_saturated_pool_rejects_fast(self, client, monkeypatch):
+        """Test a full hashing queue answers 503 with Retry-After"""
+        from app.config import settings
+
+        client.post("/api/auth/register", json={"username": "testuser", "password": "testpass"})
+        monkeypatch.setattr(settings, "PASSWORD_HASH_MAX_PENDING", 0)
+
+        response = client.post(
+            "/api/auth/login", data={"username": "testuser", "password": "testpass"}
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+    def test_dead_worker_is_replaced(self, client, monkeypatch):
+        """Test a login after a hashing worker was killed still succeeds"""
+        from app.auth import password_hasher
+        from app.config import settings
+
+        monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 1)
+        password_hasher.shutdown()
+        try:
+            client.post("/api/auth/register", json={"username": "testuser", "password": "testpass"})
+            broken = password_hasher._pool()
+            for process in list(broken._processes.values()):
+                process.kill()
+                process.join()
+
+            response = client.post(
+                "/api/auth/login", data={"username": "testuser", "password": "testpass"}
+            )
+            assert response.status_code == 200
+            assert password_hasher._pool() is not broken
+        finally:
+            password_hasher.shutdown()
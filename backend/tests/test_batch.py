@@ -0,0 +1,112 @@
+"""Batch API tests"""
+import asyncio
+import base64
+
+import msgpack
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+from app.database import get_db
+from app.main import app
+from app.routers.batch import _dispatch
+from app.schemas.batch import BatchItem
+from tests.conftest import override_get_db
+from tests.test_stats import STATS_ENDPOINTS, seed
+
+
+def batch(client, headers, *items):
+    return client.post("/api/batch", headers=headers, json={"requests": list(items)})
+
+
+class TestBatch:
+    """Tests for POST /api/batch endpoint"""
+
+    def test_batch_matches_individual_requests(self, client, auth_headers):
+        """Each item returns what the same GET would"""
+        seed(6, 3)
+        response = batch(client, auth_headers, *({"path": path} for path in STATS_ENDPOINTS))
+        assert response.status_code == 200
+        results = response.json()["responses"]
+        assert len(results) == len(STATS_ENDPOINTS)
+        for path, result in zip(STATS_ENDPOINTS, results):
+            assert result["status"] == 200
+            assert result["body"] == client.get(path, headers=auth_headers).json()
+
+    def test_batch_params(self, client, auth_headers):
+        """params are sent as the query string, alongside one already in the path"""
+        seed(2, 5)
+        results = batch(
+            client, auth_headers,
+            {"path": "/api/stats/attendance/daily", "params": {"days": 3}},
+            {"path": "/api/students/?limit=1", "params": {"class_name": ["1-A", "2-A"]}},
+        ).json()["responses"]
+        assert len(results[0]["body"]) == 3
+        assert len(results[1]["body"]) == 1
+        assert results[1]["headers"]["x-next-cursor"]
+
+    def test_batch_item_errors(self, client, auth_headers):
+        """Failed items keep their own status without failing the batch"""
+        results = batch(
+            client, auth_headers,
+            {"path": "/api/students/9999"},
+            {"path": "/api/stats/attendance/daily", "params": {"days": 0}},
+            {"path": "/api/stats/dashboard"},
+            {"path": "/api/batch"},
+        ).json()["responses"]
+        assert [result["status"] for result in results] == [404, 422, 200, 400]
+        assert results[0]["body"] == {"detail": "Student not found"}
+
+    def test_batch_one_session_and_user(self, client, auth_headers, query_counter):
+        """Sub-requests reuse the batch's session and user: one user lookup in total"""
+        sessions = []
+
+        def counting_get_db():
+            for db in override_get_db():
+                sessions.append(db)
+                yield db
+
+        app.dependency_overrides[get_db] = counting_get_db
+        batch(client, auth_headers, *({"path": path} for path in STATS_ENDPOINTS))
+        assert len({id(db) for db in sessions}) == 1
+        assert sum("FROM users" in statement for statement in query_counter) == 1
+
+    def test_batch_requires_auth(self, client):
+        """Test batch without token"""
+        response = client.post("/api/batch", json={"requests": [{"path": "/api/stats/dashboard"}]})
+        assert response.status_code == 401
+
+    def test_batch_validation(self, client, auth_headers):
+        """Only /api/ paths, and at most BATCH_MAX_REQUESTS items"""
+        assert batch(client, auth_headers, {"path": "/docs"}).status_code == 422
+        assert client.post("/api/batch", headers=auth_headers, json={"requests": []}).status_code == 422
+        items = [{"path": "/api/stats/dashboard"}] * 21
+        assert batch(client, auth_headers, *items).status_code == 422
+        assert batch(client, auth_headers, {"path": "/api/attendance/export"}).status_code == 422
+        assert batch(client, auth_headers, {"path": "/api/grades/export/?format=csv"}).status_code == 422
+
+    def test_batch_binary_bodies(self, client, auth_headers, sample_student):
+        """Non-JSON bodies come back base64-encoded with their content type"""
+        result = batch(
+            client, auth_headers, {"path": "/api/students/", "params": {"format": "msgpack"}}
+        ).json()["responses"][0]
+        assert result["encoding"] == "base64"
+        assert result["headers"]["content-type"].startswith("application/msgpack")
+        body = msgpack.unpackb(base64.b64decode(result["body"]))
+        assert body["columns"]["name"] == [sample_student["name"]]
+
+    def test_streaming_sub_response_finishes(self):
+        """A streamed sub-response on ASGI spec 2.3 (disconnect listener) completes"""
+        async def chunks():
+            yield b"a,"
+            yield b"b"
+
+        async def streaming_app(scope, receive, send):
+            await StreamingResponse(chunks(), media_type="text/csv")(scope, receive, send)
+
+        request = Request({
+            "type": "http", "app": streaming_app, "headers": [],
+            "asgi": {"version": "3.0", "spec_version": "2.3"},
+        })
+        result = asyncio.run(asyncio.wait_for(_dispatch(request, BatchItem(path="/api/stream")), 5))
+        assert result.status == 200
+        assert base64.b64decode(result.body) == b"a,b"
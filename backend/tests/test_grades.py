@@ -121,3 +121,267 @@ class TestGradeDelete:
             headers=auth_headers
         )
         assert response.status_code == 200
+
+
+class TestGradeDuplicates:
+    """One grade per (student, subject)"""
+
+    def test_create_duplicate_subject(self, client, auth_headers, sample_student):
+        """Test a second grade for the same subject is rejected"""
+        payload = {"student_id": sample_student["id"], "subject": "Math", "score": 95.0}
+        client.post("/api/grades/", headers=auth_headers, json=payload)
+        response = client.post("/api/grades/", headers=auth_headers, json=payload)
+        assert response.status_code == 400
+
+    def test_update_into_existing_subject(self, client, auth_headers, sample_student):
+        """Test renaming a grade onto an existing subject is rejected"""
+        for subject in ("Math", "English"):
+            response = client.post(
+                "/api/grades/",
+                headers=auth_headers,
+                json={"student_id": sample_student["id"], "subject": subject, "score": 80.0}
+            )
+        response = client.put(
+            f"/api/grades/{response.json()['id']}",
+            headers=auth_headers,
+            json={"student_id": sample_student["id"], "subject": "Math", "score": 80.0}
+        )
+        assert response.status_code == 400
+
+    def test_update_race_is_rejected(self, client, auth_headers, sample_student, monkeypatch):
+        """Test a duplicate that slips past the check (concurrent update) is a 400, not a 500"""
+        from app.routers import grades
+
+        for subject in ("Math", "English"):
+            response = client.post(
+                "/api/grades/",
+                headers=auth_headers,
+                json={"student_id": sample_student["id"], "subject": subject, "score": 80.0}
+            )
+        monkeypatch.setattr(grades, "_duplicate_grade", lambda *args, **kwargs: False)
+        response = client.put(
+            f"/api/grades/{response.json()['id']}",
+            headers=auth_headers,
+            json={"student_id": sample_student["id"], "subject": "Math", "score": 80.0}
+        )
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Grade already recorded for this subject"
+
+
+class TestGradeBulk:
+    """Tests for POST /api/grades/bulk endpoint"""
+
+    def test_bulk_json_upsert(self, client, auth_headers, sample_student):
+        """Test JSON array rows are inserted, updated or reported"""
+        client.post(
+            "/api/grades/",
+            headers=auth_headers,
+            json={"student_id": sample_student["id"], "subject": "Math", "score": 50.0}
+        )
+        response = client.post(
+            "/api/grades/bulk",
+            headers=auth_headers,
+            json=[
+                {"student_id": sample_student["id"], "subject": "Math", "score": 90.0},
+                {"student_id": sample_student["id"], "subject": "English", "score": 70.0},
+                {"student_id": 999, "subject": "Math", "score": 90.0},
+                {"student_id": sample_student["id"], "subject": "Science"},
+                {"student_id": sample_student["id"], "subject": "English", "score": 75.0},
+            ]
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["inserted"], data["updated"], data["failed"]) == (1, 2, 2)
+        results = data["results"]
+        assert [row["action"] for row in results] == ["update", "insert", "error", "error", "update"]
+        assert results[0]["id"] is not None
+        assert results[1]["id"] == results[4]["id"]
+        assert results[2]["error"] == "Student not found"
+        assert results[3]["error"].startswith("score")
+
+        grades = client.get(
+            f"/api/grades/student/{sample_student['id']}", headers=auth_headers
+        ).json()
+        assert sorted((g["subject"], g["score"]) for g in grades) == [("English", 75.0), ("Math", 90.0)]
+
+    def test_bulk_csv_stream(self, client, auth_headers, sample_student):
+        """Test a CSV upload larger than one batch"""
+        lines = ["student_id,subject,score"]
+        lines += [f"{sample_student['id']},Subject {i},{i % 100}" for i in range(2500)]
+        lines.append("not-a-number,Math,10")
+
+        def body():
+            for start in range(0, len(lines), 300):
+                yield ("\n".join(lines[start:start + 300]) + "\n").encode("utf-8")
+
+        response = client.post(
+            "/api/grades/bulk",
+            headers={**auth_headers, "Content-Type": "text/csv"},
+            content=body()
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["inserted"], data["updated"], data["failed"]) == (2500, 0, 1)
+        assert len(data["results"]) == 2501
+        assert len({row["id"] for row in data["results"][:2500]}) == 2500
+        assert [row["index"] for row in data["results"] if row["action"] == "error"] == [2500]
+
+        summary = client.get("/api/stats/grades/summary", headers=auth_headers).json()
+        assert summary["total"] == 2500
+
+    def test_bulk_without_on_conflict(self, client, auth_headers, sample_student, monkeypatch):
+        """Test databases without ON CONFLICT take the insert/update path"""
+        from app.routers import grades
+
+        monkeypatch.setattr(grades, "UPSERT_DIALECTS", {})
+        student_id = sample_student["id"]
+        client.post(
+            "/api/grades/", headers=auth_headers,
+            json={"student_id": student_id, "subject": "Math", "score": 50.0}
+        )
+        data = client.post("/api/grades/bulk", headers=auth_headers, json=[
+            {"student_id": student_id, "subject": "Math", "score": 90.0},
+            {"student_id": student_id, "subject": "English", "score": 70.0},
+            {"student_id": student_id, "subject": "English", "score": 75.0},
+        ]).json()
+        assert (data["inserted"], data["updated"], data["failed"]) == (1, 2, 0)
+
+        stored = client.get(f"/api/grades/student/{student_id}", headers=auth_headers).json()
+        assert sorted((g["subject"], g["score"]) for g in stored) == [("English", 75.0), ("Math", 90.0)]
+        summary = client.get("/api/stats/grades/summary", headers=auth_headers).json()
+        assert (summary["total"], summary["average"]) == (2, 82.5)
+
+    def test_bulk_results_are_spooled(self, client, auth_headers, sample_student, monkeypatch):
+        """Test every row is reported when the results spill to a temporary file"""
+        from app.routers import grades
+
+        monkeypatch.setattr(grades, "GRADE_RESULT_SPOOL_BYTES", 256)
+        monkeypatch.setattr(grades, "GRADE_RESULT_CHUNK_SIZE", 100)
+        rows = [{"student_id": 999, "subject": f"Subject {i}", "score": 1.0} for i in range(150)]
+        rows.append({"student_id": sample_student["id"], "subject": "Math", "score": 1.0})
+        data = client.post("/api/grades/bulk", headers=auth_headers, json=rows).json()
+        assert (data["inserted"], data["failed"]) == (1, 150)
+        assert [row["index"] for row in data["results"]] == list(range(151))
+        assert data["results"][-1]["action"] == "insert"
+
+    def test_repeated_keys_are_written_once(self, client, auth_headers, sample_student, monkeypatch):
+        """Test a key repeated in one batch reaches the upsert once, last row winning"""
+        from app.routers import grades
+
+        written = []
+        write_grades = grades._write_grades
+
+        def recording(db, rows):
+            written.append(rows)
+            write_grades(db, rows)
+
+        monkeypatch.setattr(grades, "_write_grades", recording)
+        student_id = sample_student["id"]
+        data = client.post("/api/grades/bulk", headers=auth_headers, json=[
+            {"student_id": student_id, "subject": "Math", "score": 60.0},
+            {"student_id": student_id, "subject": "Math", "score": 70.0},
+            {"student_id": student_id, "subject": "Math", "score": 80.0},
+        ]).json()
+        assert [row["action"] for row in data["results"]] == ["insert", "update", "update"]
+        assert [[(action, row["score"]) for action, row in rows] for rows in written] == [[("insert", 80.0)]]
+
+        stored = client.get(f"/api/grades/student/{student_id}", headers=auth_headers).json()
+        assert [(g["subject"], g["score"]) for g in stored] == [("Math", 80.0)]
+        summary = client.get("/api/stats/grades/summary", headers=auth_headers).json()
+        assert (summary["total"], summary["average"]) == (1, 80.0)
+
+    def test_failed_batch_ends_its_transaction(self, client):
+        """Test a batch with no valid rows does not leave a transaction open"""
+        from app.routers.grades import _upsert_grade_batch
+        from tests.conftest import TestingSessionLocal
+
+        with TestingSessionLocal() as db:
+            results = _upsert_grade_batch(db, [(0, {"student_id": 999, "subject": "Math", "score": 1.0})])
+            assert [result.error for result in results] == ["Student not found"]
+            assert not db.in_transaction()
+
+    def test_bulk_unsupported_type(self, client, auth_headers):
+        """Test uploads other than CSV/NDJSON/JSON are rejected"""
+        response = client.post(
+            "/api/grades/bulk",
+            headers={**auth_headers, "Content-Type": "text/plain"},
+            content=b"hello"
+        )
+        assert response.status_code == 415
+
+
+class TestGradeFilters:
+    """Tests for the filter parameters of GET /api/grades/"""
+
+    def test_subject_score_and_student(self, client, auth_headers, sample_student):
+        """Test subject, score range and student name filters"""
+        other = client.post(
+            "/api/students/",
+            headers=auth_headers,
+            json={"name": "김철수", "student_number": "2024002", "class_name": "Class 2"}
+        ).json()["id"]
+        client.post("/api/grades/bulk", headers=auth_headers, json=[
+            {"student_id": sample_student["id"], "subject": "Math", "score": 95.0},
+            {"student_id": sample_student["id"], "subject": "English", "score": 60.0},
+            {"student_id": other, "subject": "Math", "score": 70.0},
+        ])
+
+        def fetch(**params):
+            response = client.get("/api/grades/", headers=auth_headers, params=params)
+            assert response.status_code == 200
+            return [(row["student_id"], row["subject"]) for row in response.json()]
+
+        assert fetch(subject="Math") == [(sample_student["id"], "Math"), (other, "Math")]
+        assert fetch(subject="Math", min_score=80) == [(sample_student["id"], "Math")]
+        # 과목은 대소문자 구분 없는 부분 일치 (화면의 과목 검색)
+        assert fetch(subject="mat") == [(sample_student["id"], "Math"), (other, "Math")]
+        assert fetch(subject="LIS") == [(sample_student["id"], "English")]
+        assert fetch(subject="%") == []
+        assert fetch(max_score=70) == [(sample_student["id"], "English"), (other, "Math")]
+        assert fetch(student_name="ㄱㅊㅅ") == [(other, "Math")]
+        assert fetch(class_name="Class 1", min_score=90) == [(sample_student["id"], "Math")]
+        assert fetch(student_id=other, subject="English") == []
+
+    def test_include_student_is_one_query(self, client, auth_headers, sample_student, query_counter):
+        """Test include=student embeds student columns with a single JOIN"""
+        client.post(
+            "/api/grades/",
+            headers=auth_headers,
+            json={"student_id": sample_student["id"], "subject": "Math", "score": 88.5}
+        )
+        query_counter.clear()
+        rows = client.get("/api/grades/?include=student", headers=auth_headers).json()
+        assert len(query_counter) == 1
+        assert rows[0]["student_name"] == "Test Student"
+        assert rows[0]["class_name"] == "Class 1"
+
+        rows = client.get(
+            f"/api/grades/student/{sample_student['id']}?include=student", headers=auth_headers
+        ).json()
+        assert rows[0]["student_number"] == "2024001"
+        assert "student_name" not in client.get("/api/grades/", headers=auth_headers).json()[0]
+        assert client.get("/api/grades/?include=teacher", headers=auth_headers).status_code == 422
+
+
+class TestGradeExport:
+    """Tests for GET /api/grades/export endpoint"""
+
+    def test_export_by_subject(self, client, auth_headers, sample_student):
+        """Test CSV export filtered by subject"""
+        for subject in ("Math", "English"):
+            client.post(
+                "/api/grades/",
+                headers=auth_headers,
+                json={"student_id": sample_student["id"], "subject": subject, "score": 88.5}
+            )
+        response = client.get("/api/grades/export?subject=Math", headers=auth_headers)
+        assert response.status_code == 200
+        assert 'filename="grades.csv"' in response.headers["content-disposition"]
+        lines = response.content.decode("utf-8-sig").splitlines()
+        assert lines[1].split(",")[-2:] == ["Math", "88.5"]
+        assert len(lines) == 2
+
+    def test_export_invalid_format(self, client, auth_headers):
+        """Test unknown export formats are rejected"""
+        response = client.get("/api/grades/export?format=xml", headers=auth_headers)
+        assert response.status_code == 422
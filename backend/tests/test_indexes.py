@@ -0,0 +1,182 @@
+"""Index usage tests for the hot query paths"""
+import io
+import json
+
+import pytest
+from datetime import date
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.migrations import DuplicateRowsError, dedupe, upgrade
+from tests.conftest import engine
+
+
+@pytest.fixture
+def captured(client):
+    """Record (statement, parameters) of every SELECT on the test engine"""
+    queries = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            queries.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield queries
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+# 의도한 스캔: 조건 없는 목록 첫 페이지는 인덱스를 날짜 순으로 읽다가 LIMIT 에서 멈춘다
+ALLOWED_SCANS = {"SCAN attendances USING INDEX ix_attendances_date_status"}
+
+
+def full_scans(queries, tables=("attendances", "grades")):
+    """Return plan lines that scan one of ``tables`` (with or without an
+    index) unless listed in ALLOWED_SCANS"""
+    scans = []
+    with engine.connect() as conn:
+        for statement, parameters in queries:
+            plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            for row in plan:
+                detail = row[-1]
+                if detail in ALLOWED_SCANS:
+                    continue
+                if any(detail.startswith(f"SCAN {table}") for table in tables):
+                    scans.append((statement, detail))
+    return scans
+
+
+class TestHotQueryPlans:
+    """Hot queries in app/routers must SEARCH an index, not SCAN the table"""
+
+    def test_attendance_paths(self, client, auth_headers, sample_student, captured):
+        """Test duplicate check, per-student, date range and keyset queries"""
+        student_id = sample_student["id"]
+        captured.clear()
+        client.post(
+            "/api/attendance/",
+            headers=auth_headers,
+            json={"student_id": student_id, "date": str(date.today()), "status": "출석"}
+        )
+        client.post(
+            "/api/attendance/bulk",
+            headers=auth_headers,
+            json={"items": [{"student_id": student_id, "date": "2024-03-04", "status": "지각"}]}
+        )
+        client.get(f"/api/attendance/student/{student_id}", headers=auth_headers)
+        page = client.get("/api/attendance/?limit=1", headers=auth_headers)
+        client.get(
+            f"/api/attendance/?limit=1&cursor={page.headers['X-Next-Cursor']}", headers=auth_headers
+        )
+        client.get(
+            "/api/attendance/export?start_date=2024-03-01&end_date=2024-03-31", headers=auth_headers
+        )
+        client.get("/api/stats/attendance/daily?days=7", headers=auth_headers)
+        client.get("/api/attendance/?date=2024-03-04&status=지각", headers=auth_headers)
+        client.get(f"/api/attendance/?student_id={student_id}", headers=auth_headers)
+        client.get("/api/attendance/?class_name=Class 1&student_name=Student", headers=auth_headers)
+
+        assert len(captured) > 0
+        assert full_scans(captured) == []
+
+    def test_grade_paths(self, client, auth_headers, sample_student, captured):
+        """Test duplicate check, per-student and bulk upsert lookups"""
+        student_id = sample_student["id"]
+        captured.clear()
+        response = client.post(
+            "/api/grades/",
+            headers=auth_headers,
+            json={"student_id": student_id, "subject": "Math", "score": 80.0}
+        )
+        client.put(
+            f"/api/grades/{response.json()['id']}",
+            headers=auth_headers,
+            json={"student_id": student_id, "subject": "Math", "score": 90.0}
+        )
+        client.get(f"/api/grades/student/{student_id}", headers=auth_headers)
+        client.post(
+            "/api/grades/bulk",
+            headers=auth_headers,
+            json=[{"student_id": student_id, "subject": "English", "score": 70.0}]
+        )
+        client.get("/api/grades/?subject=Math&min_score=80", headers=auth_headers)
+        client.get(f"/api/grades/?student_id={student_id}", headers=auth_headers)
+
+        assert len(captured) > 0
+        assert full_scans(captured) == []
+
+
+class TestIndexMigration:
+    """Tests for app.migrations.upgrade on a pre-index database"""
+
+    def test_upgrade_refuses_duplicates_until_deduped(self, tmp_path):
+        """Test duplicates block the unique index until the dedupe command backs them up and removes them"""
+        old = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        with old.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE students (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, "
+                "student_number VARCHAR(20) NOT NULL, class_name VARCHAR(50) NOT NULL)"
+            ))
+            conn.execute(text(
+                "CREATE TABLE attendances (id INTEGER PRIMARY KEY, student_id INTEGER NOT NULL, "
+                "date DATE NOT NULL, status VARCHAR(7) NOT NULL)"
+            ))
+            conn.execute(text("CREATE INDEX ix_attendances_date ON attendances (date)"))
+            conn.execute(text("INSERT INTO students VALUES (1, 'Kim', '1', 'A')"))
+            conn.execute(text(
+                "INSERT INTO attendances VALUES (1, 1, '2024-03-04', 'present'), "
+                "(2, 1, '2024-03-04', 'late'), (3, 1, '2024-03-05', 'absent')"
+            ))
+
+        Base.metadata.create_all(bind=old)
+        with pytest.raises(DuplicateRowsError, match="1 duplicate rows in attendances"):
+            upgrade(old)
+
+        report = io.StringIO()
+        with Session(old) as db:
+            assert dedupe(db, report, dry_run=True) == {"grades": 0, "attendances": 1}
+        with pytest.raises(DuplicateRowsError):
+            upgrade(old)
+
+        backup = io.StringIO()
+        with Session(old) as db:
+            assert dedupe(db, backup) == {"grades": 0, "attendances": 1}
+        assert report.getvalue() == backup.getvalue()
+        assert [json.loads(line) for line in backup.getvalue().splitlines()] == [{
+            "table": "attendances",
+            "row": {"id": 1, "student_id": 1, "date": "2024-03-04", "status": "출석"},
+        }]
+        created = upgrade(old)
+
+        assert {"uq_attendances_student_date", "students_fts"} <= set(created)
+        names = {index["name"] for index in inspect(old).get_indexes("attendances")}
+        assert {"uq_attendances_student_date", "ix_attendances_date_status"} <= names
+        assert "ix_attendances_date" not in names
+        with old.connect() as conn:
+            rows = conn.execute(text("SELECT id, status FROM attendances ORDER BY id")).fetchall()
+            assert rows == [(2, "late"), (3, "absent")]
+            rollup = conn.execute(text(
+                "SELECT date, status, count FROM attendance_daily_rollups ORDER BY date"
+            )).fetchall()
+            assert rollup == [("2024-03-04", "late", 1), ("2024-03-05", "absent", 1)]
+
+        assert upgrade(old) == []
+        old.dispose()
+
+    def test_upgrade_rebuilds_outdated_search_tables(self, tmp_path):
+        """Test a short-gram table without the student number and class columns is rebuilt"""
+        old = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+        Base.metadata.create_all(bind=old)
+        with old.begin() as conn:
+            conn.execute(text("INSERT INTO students VALUES (1, 'Kim', '2024001', '1반')"))
+            conn.execute(text("DROP TABLE students_fts_short"))
+            conn.execute(text("CREATE VIRTUAL TABLE students_fts_short USING fts5(grams)"))
+
+        assert "students_fts_short" in upgrade(old)
+        with old.connect() as conn:
+            rows = conn.execute(text(
+                "SELECT rowid FROM students_fts_short WHERE students_fts_short MATCH 'class_grams : \"1반\"'"
+            )).fetchall()
+            assert rows == [(1,)]
+        assert upgrade(old) == []
+        old.dispose()
@@ -0,0 +1,127 @@
+"""Request metrics tests"""
+import re
+
+import pytest
+
+from app.config import settings
+from app.metrics import LATENCY_BUCKETS, UNMATCHED_ROUTE, Histogram, metrics
+
+SCRAPE_TOKEN = "scrape-token"
+SAMPLE_LINE = re.compile(r'^[a-z_]+(\{[a-z_]+="[^"]*"(,[a-z_]+="[^"]*")*\})? [0-9.e+-]+$')
+
+
+def scrape(client, headers=None) -> dict:
+    """Samples of GET /metrics by metric name and label string, scraped with
+    the METRICS_TOKEN bearer token unless ``headers`` are given"""
+    response = client.get("/metrics", headers=headers or {"Authorization": f"Bearer {SCRAPE_TOKEN}"})
+    assert response.status_code == 200
+    samples = {}
+    for line in response.text.splitlines():
+        if line.startswith("#"):
+            continue
+        name, _, value = line.rpartition(" ")
+        samples[name] = float(value)
+    return samples
+
+
+def labels(route: str, status: int = 200, method: str = "GET") -> str:
+    return f'method="{method}",route="{route}",status="{status}"'
+
+
+@pytest.fixture
+def fresh_metrics(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", SCRAPE_TOKEN)
+    metrics.clear()
+    yield metrics
+    metrics.clear()
+
+
+class TestHistogram:
+    """Tests for bucket counting"""
+
+    def test_observations_land_in_cumulative_buckets(self):
+        """Buckets are cumulative in the output and include their upper bound"""
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        lines = histogram.lines("latency", 'route="/"')
+        assert lines == [
+            'latency_bucket{route="/",le="0.1"} 2',
+            'latency_bucket{route="/",le="1.0"} 3',
+            'latency_bucket{route="/",le="+Inf"} 4',
+            'latency_sum{route="/"} 3.65',
+            'latency_count{route="/"} 4',
+        ]
+
+
+class TestMetricsEndpoint:
+    """Tests for GET /metrics"""
+
+    def test_requests_are_labelled_by_route_template(self, client, auth_headers, sample_student, fresh_metrics):
+        """Different ids of one route are one series"""
+        client.get(f"/api/students/{sample_student['id']}", headers=auth_headers)
+        client.get("/api/students/99999", headers=auth_headers)
+        samples = scrape(client)
+
+        route = "/api/students/{student_id}"
+        assert samples[f"http_requests_total{{{labels(route)}}}"] == 1
+        assert samples[f"http_requests_total{{{labels(route, 404)}}}"] == 1
+        assert samples[f'http_request_duration_seconds_bucket{{{labels(route)},le="+Inf"}}'] == 1
+        assert not any("/api/students/99999" in name for name in samples)
+
+    def test_unmatched_paths_share_one_label(self, client, fresh_metrics):
+        """Unknown paths do not create a series each"""
+        client.get("/no/such/path")
+        client.get("/another/missing/path")
+        samples = scrape(client)
+        assert samples[f"http_requests_total{{{labels(UNMATCHED_ROUTE, 404)}}}"] == 2
+
+    def test_response_size_and_query_count(self, client, auth_headers, sample_student, fresh_metrics,
+                                           query_counter):
+        """Body bytes and SQL statements of the request are recorded"""
+        query_counter.clear()
+        response = client.get(f"/api/students/{sample_student['id']}", headers=auth_headers)
+        queries = len(query_counter)
+        samples = scrape(client)
+
+        route = labels("/api/students/{student_id}")
+        assert queries > 0
+        assert samples[f"http_response_size_bytes_sum{{{route}}}"] == len(response.content)
+        assert samples[f"http_request_db_queries_total{{{route}}}"] == queries
+        assert samples[f"http_request_db_seconds_count{{{route}}}"] == 1
+        assert 0 < samples[f"http_request_db_seconds_sum{{{route}}}"] <= \
+            samples[f"http_request_duration_seconds_sum{{{route}}}"]
+
+    def test_in_flight_gauge(self, client, fresh_metrics):
+        """Only the scrape itself is in flight while it renders"""
+        client.get("/")
+        assert scrape(client)['http_requests_in_flight{method="GET"}'] == 1
+
+    def test_exposition_format(self, client, auth_headers, sample_student, fresh_metrics):
+        """Every line is a comment or a valid sample, with HELP and TYPE per metric"""
+        client.get("/api/students/", headers=auth_headers)
+        response = client.get("/metrics", headers={"Authorization": f"Bearer {SCRAPE_TOKEN}"})
+
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        lines = response.text.splitlines()
+        assert all(line.startswith("# ") or SAMPLE_LINE.match(line) for line in lines)
+        types = [line.split()[2] for line in lines if line.startswith("# TYPE")]
+        assert "http_request_duration_seconds" in types
+        buckets = [line for line in lines if line.startswith("http_request_duration_seconds_bucket")
+                   and labels("/api/students/") in line]
+        assert len(buckets) == len(LATENCY_BUCKETS) + 1
+
+    def test_scrapes_require_a_token(self, client, auth_headers, fresh_metrics, monkeypatch):
+        """Test /metrics takes the METRICS_TOKEN or an admin token, nothing else"""
+        assert client.get("/metrics").status_code == 401
+        assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+        assert scrape(client, auth_headers)
+
+        client.post("/api/auth/register", json={"username": "viewer", "password": "viewerpass"})
+        token = client.post(
+            "/api/auth/login", data={"username": "viewer", "password": "viewerpass"}
+        ).json()["access_token"]
+        assert client.get("/metrics", headers={"Authorization": f"Bearer {token}"}).status_code == 403
+
+        monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+        assert client.get("/metrics", headers={"Authorization": f"Bearer {SCRAPE_TOKEN}"}).status_code == 401
@@ -0,0 +1,176 @@
+"""Statistics rollup maintenance tests"""
+import pytest
+from datetime import date, timedelta
+
+from app.models.rollup import AttendanceDailyRollup, GradeSubjectRollup
+from app.rollups import check_rollups, rebuild_rollups
+from tests.conftest import TestingSessionLocal
+
+
+def rollup_problems():
+    db = TestingSessionLocal()
+    try:
+        return check_rollups(db)
+    finally:
+        db.close()
+
+
+def create_student(client, auth_headers, number, class_name):
+    response = client.post(
+        "/api/students/",
+        headers=auth_headers,
+        json={"name": f"Student {number}", "student_number": number, "class_name": class_name}
+    )
+    return response.json()["id"]
+
+
+def create_grade(client, auth_headers, student_id, subject, score):
+    response = client.post(
+        "/api/grades/",
+        headers=auth_headers,
+        json={"student_id": student_id, "subject": subject, "score": score}
+    )
+    return response.json()["id"]
+
+
+def create_attendance(client, auth_headers, student_id, day, status):
+    response = client.post(
+        "/api/attendance/",
+        headers=auth_headers,
+        json={"student_id": student_id, "date": str(day), "status": status}
+    )
+    return response.json()["id"]
+
+
+class TestRollupMaintenance:
+    """Rollups follow every write route"""
+
+    def test_attendance_create_and_delete(self, client, auth_headers):
+        """Test attendance rollups track inserts and deletes"""
+        first = create_student(client, auth_headers, "1", "A")
+        second = create_student(client, auth_headers, "2", "A")
+        today = date.today()
+        create_attendance(client, auth_headers, first, today, "출석")
+        attendance_id = create_attendance(client, auth_headers, second, today, "출석")
+        assert rollup_problems() == []
+
+        client.delete(f"/api/attendance/{attendance_id}", headers=auth_headers)
+        assert rollup_problems() == []
+
+        db = TestingSessionLocal()
+        try:
+            rows = db.query(AttendanceDailyRollup).all()
+            assert [(row.class_name, row.count) for row in rows] == [("A", 1)]
+        finally:
+            db.close()
+
+    def test_grade_create_update_delete(self, client, auth_headers):
+        """Test grade rollups keep count, sums and min/max in step"""
+        first = create_student(client, auth_headers, "1", "A")
+        second = create_student(client, auth_headers, "2", "B")
+        third = create_student(client, auth_headers, "3", "A")
+        low = create_grade(client, auth_headers, third, "Math", 40.0)
+        create_grade(client, auth_headers, first, "Math", 80.0)
+        create_grade(client, auth_headers, second, "Math", 100.0)
+        assert rollup_problems() == []
+
+        # Move a grade to another student, class and subject
+        client.put(
+            f"/api/grades/{low}",
+            headers=auth_headers,
+            json={"student_id": second, "subject": "English", "score": 70.0}
+        )
+        assert rollup_problems() == []
+
+        client.delete(f"/api/grades/{low}", headers=auth_headers)
+        assert rollup_problems() == []
+
+        db = TestingSessionLocal()
+        try:
+            math_a = db.query(GradeSubjectRollup).filter_by(subject="Math", class_name="A").one()
+            assert (math_a.count, math_a.min_score, math_a.max_score) == (1, 80.0, 80.0)
+            assert db.query(GradeSubjectRollup).filter_by(subject="English").count() == 0
+        finally:
+            db.close()
+
+    def test_grade_bulk_upsert(self, client, auth_headers):
+        """Test bulk upserts keep rollups consistent, including score changes"""
+        first = create_student(client, auth_headers, "1", "A")
+        second = create_student(client, auth_headers, "2", "B")
+        create_grade(client, auth_headers, first, "Math", 30.0)
+        client.post(
+            "/api/grades/bulk",
+            headers=auth_headers,
+            json=[
+                {"student_id": first, "subject": "Math", "score": 90.0},
+                {"student_id": second, "subject": "Math", "score": 60.0},
+                {"student_id": second, "subject": "Math", "score": 65.0},
+            ]
+        )
+        assert rollup_problems() == []
+
+    def test_update_grade_unknown_student(self, client, auth_headers):
+        """Test moving a grade to a missing student is rejected"""
+        student_id = create_student(client, auth_headers, "1", "A")
+        grade_id = create_grade(client, auth_headers, student_id, "Math", 90.0)
+        response = client.put(
+            f"/api/grades/{grade_id}",
+            headers=auth_headers,
+            json={"student_id": 999, "subject": "Math", "score": 90.0}
+        )
+        assert response.status_code == 404
+        assert rollup_problems() == []
+
+    def test_student_class_change_and_delete(self, client, auth_headers):
+        """Test rollups move with a student's class and vanish with the student"""
+        moving = create_student(client, auth_headers, "1", "A")
+        staying = create_student(client, auth_headers, "2", "A")
+        for offset in range(3):
+            create_attendance(client, auth_headers, moving, date.today() - timedelta(days=offset), "지각")
+        create_attendance(client, auth_headers, staying, date.today(), "출석")
+        create_grade(client, auth_headers, moving, "Math", 95.0)
+        create_grade(client, auth_headers, staying, "Math", 60.0)
+
+        client.put(f"/api/students/{moving}", headers=auth_headers, json={"class_name": "B"})
+        assert rollup_problems() == []
+
+        client.delete(f"/api/students/{moving}", headers=auth_headers)
+        assert rollup_problems() == []
+
+
+class TestRollupRebuild:
+    """Tests for rebuild_rollups and check_rollups"""
+
+    def test_check_detects_drift_and_rebuild_fixes(self, client, auth_headers):
+        """Test the checker reports tampered rows and rebuild repairs them"""
+        student_id = create_student(client, auth_headers, "1", "A")
+        create_grade(client, auth_headers, student_id, "Math", 90.0)
+        create_attendance(client, auth_headers, student_id, date.today(), "결석")
+
+        db = TestingSessionLocal()
+        try:
+            db.query(GradeSubjectRollup).update({"count": 5})
+            db.query(AttendanceDailyRollup).delete()
+            db.commit()
+            assert len(check_rollups(db)) == 2
+
+            rebuild_rollups(db)
+            assert check_rollups(db) == []
+        finally:
+            db.close()
+
+    def test_rebuild_invalidates_cached_stats(self, client, auth_headers):
+        """Test a rebuild changes the ETag of stats served from the rollups"""
+        student_id = create_student(client, auth_headers, "1", "A")
+        create_grade(client, auth_headers, student_id, "Math", 90.0)
+        etag = client.get("/api/stats/grades/summary", headers=auth_headers).headers["ETag"]
+
+        db = TestingSessionLocal()
+        try:
+            rebuild_rollups(db)
+        finally:
+            db.close()
+
+        response = client.get("/api/stats/grades/summary", headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
@@ -0,0 +1,139 @@
+"""Shared cache tests"""
+import pytest
+
+from app.shared_cache import (
+    MemoryCacheBackend, SharedCache, SQLiteCacheBackend, make_backend
+)
+from app.versions import TableVersions
+from tests.test_stats import seed
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def versions(tmp_path):
+    versions = TableVersions(str(tmp_path / "app.db-versions"))
+    yield versions
+    versions.close()
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCacheBackend()
+    return SQLiteCacheBackend(str(tmp_path / "app.db-cache"))
+
+
+class TestSharedCache:
+    """Tests for cache namespaces on each backend"""
+
+    def test_ttl_and_lru(self, backend, versions):
+        """Entries expire after their TTL and the least recently used is evicted"""
+        clock = Clock()
+        cache = SharedCache(backend, versions, clock).namespace("ns", maxsize=2, ttl=60)
+        cache.set("a", 1)
+        clock.now += 2
+        cache.set("b", 2)
+        clock.now += 2
+        assert cache.get("a") == 1  # a 가 최근 사용으로 바뀜
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        cache.set("short", 4, ttl=5)
+        clock.now += 10
+        assert cache.get("short") is None
+        clock.now += 60
+        assert cache.get("a") is None
+        stats = cache.stats()
+        assert stats["evictions"] >= 1
+        assert stats["hits"] == 2
+
+    def test_table_write_invalidates(self, backend, versions):
+        """A version bump of a namespace table hides the entry"""
+        cache = SharedCache(backend, versions).namespace("ns", maxsize=10, tables=("grades",))
+        cache.set("summary", {"total": 1})
+        versions.bump("students")
+        assert cache.get("summary") == {"total": 1}
+        versions.bump("grades")
+        assert cache.get("summary") is None
+
+    def test_stale_snapshot_is_not_served(self, backend, versions):
+        """A value read before a write is stored already stale"""
+        cache = SharedCache(backend, versions).namespace("ns", maxsize=10, tables=("grades",))
+        before = cache.snapshot()
+        versions.bump("grades")
+        cache.set("summary", {"total": 1}, versions=before)
+        assert cache.get("summary") is None
+
+    def test_sqlite_shared_between_processes(self, tmp_path, versions):
+        """Two workers' caches on one file see each other's entries and invalidations"""
+        path = str(tmp_path / "app.db-cache")
+        first = SharedCache(SQLiteCacheBackend(path), versions).namespace("ns", 10, tables=("users",))
+        second = SharedCache(SQLiteCacheBackend(path), versions).namespace("ns", 10, tables=("users",))
+        first.set(("token",), [1, "admin", "admin"])
+        assert second.get(("token",)) == [1, "admin", "admin"]
+        assert second.stats()["size"] == 1
+        TableVersions(versions.path).bump("users")
+        assert first.get(("token",)) is None
+
+    def test_make_backend(self):
+        """auto picks SQLite for a file database and memory otherwise"""
+        assert make_backend("auto", "sqlite:///./app.db").name == "sqlite"
+        assert make_backend("auto", "sqlite://").name == "memory"
+        assert make_backend("auto", "postgresql://db/app").name == "memory"
+        assert isinstance(make_backend("app.shared_cache:MemoryCacheBackend"), MemoryCacheBackend)
+
+
+class TestCachedRoutes:
+    """Tests for stats and roster responses served from the shared cache"""
+
+    def test_stats_served_from_cache_until_write(self, client, auth_headers, query_counter, sample_student):
+        """A second client reuses the result; a grade write recomputes it"""
+        first = client.get("/api/stats/grades/summary", headers=auth_headers).json()
+        query_counter.clear()
+        assert client.get("/api/stats/grades/summary", headers=auth_headers).json() == first
+        assert query_counter == []
+        client.post("/api/grades/", headers=auth_headers, json={
+            "student_id": sample_student["id"], "subject": "Math", "score": 90
+        })
+        assert client.get("/api/stats/grades/summary", headers=auth_headers).json()["total"] == 1
+
+    def test_roster_page_cached_with_cursor(self, client, auth_headers, query_counter):
+        """Roster pages come back with their next cursor, in every format"""
+        seed(3, 0)
+        first = client.get("/api/students/?limit=2", headers=auth_headers)
+        query_counter.clear()
+        again = client.get("/api/students/?limit=2", headers=auth_headers)
+        columns = client.get("/api/students/?limit=2&format=columns", headers=auth_headers)
+        assert query_counter == []
+        assert again.json() == first.json()
+        assert again.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+        assert columns.json()["columns"]["id"] == [row["id"] for row in first.json()]
+
+        client.post("/api/students/", headers=auth_headers, json={
+            "name": "New", "student_number": "N1", "class_name": "1-A"
+        })
+        assert len(client.get("/api/students/?limit=10", headers=auth_headers).json()) == 4
+
+    def test_cache_stats_endpoint(self, client, auth_headers):
+        """Admins see size and hit rate per namespace"""
+        client.get("/api/stats/grades/summary", headers=auth_headers)
+        client.get("/api/stats/grades/summary", headers=auth_headers)
+        stats = client.get("/api/stats/cache", headers=auth_headers).json()
+        assert stats["backend"] == "memory"
+        assert {"users", "stats", "roster"} <= set(stats["namespaces"])
+        assert stats["namespaces"]["stats"]["hits"] >= 1
+        assert stats["namespaces"]["stats"]["size"] >= 1
+
+    def test_cache_stats_requires_admin(self, client):
+        """Test cache stats as a teacher"""
+        client.post("/api/auth/register", json={"username": "t", "password": "pw", "role": "teacher"})
+        token = client.post("/api/auth/login", data={"username": "t", "password": "pw"}).json()["access_token"]
+        response = client.get("/api/stats/cache", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 403
@@ -0,0 +1,219 @@
+"""Single-flight coalescing tests"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException, Response
+
+from app.filters import GradeFilters
+from app.models.user import User, UserRole
+from app.routers import stats
+from app.singleflight import SingleFlight, coalesced, route_key
+from app.versions import table_versions
+from tests.test_stats import seed
+
+
+def run_concurrently(count, call):
+    with ThreadPoolExecutor(count) as pool:
+        return list(pool.map(lambda _: call(), range(count)))
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight itself"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Waiting callers get copies of the leader's result"""
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"rows": [1, 2]}
+
+        threading.Timer(0.3, release.set).start()
+        results = run_concurrently(5, lambda: flight.do("route", "key", compute))
+        assert len(calls) == 1
+        assert all(result == {"rows": [1, 2]} for result in results)
+        assert len({id(result) for result in results}) == 5
+        assert flight.stats()["route"] == {
+            "executions": 1, "coalesced": 4, "in_flight": 0, "timed_out": 0
+        }
+
+    def test_leader_error_reaches_waiters(self):
+        """An exception is raised in every coalesced caller"""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def compute():
+            release.wait(5)
+            raise HTTPException(status_code=404, detail="Student not found")
+
+        def call():
+            try:
+                flight.do("route", "key", compute)
+            except HTTPException as error:
+                return error.status_code
+
+        threading.Timer(0.3, release.set).start()
+        assert run_concurrently(3, call) == [404, 404, 404]
+        assert flight.do("route", "key", lambda: "again") == "again"
+
+    def test_response_copies(self):
+        """Coalesced Responses are separate objects with the same body and headers"""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def compute():
+            release.wait(5)
+            return Response(b"[]", media_type="application/json", headers={"X-Next-Cursor": "abc"})
+
+        threading.Timer(0.3, release.set).start()
+        results = run_concurrently(3, lambda: flight.do("route", "key", compute))
+        assert len({id(result) for result in results}) == 3
+        assert {result.body for result in results} == {b"[]"}
+        assert {result.headers["x-next-cursor"] for result in results} == {"abc"}
+
+    def test_async_calls_share_one_execution(self):
+        """The asyncio path coalesces concurrent coroutines"""
+        flight = SingleFlight()
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return [1, 2]
+
+        async def main():
+            return await asyncio.gather(*(flight.do_async("route", "key", compute) for _ in range(4)))
+
+        assert asyncio.run(main()) == [[1, 2]] * 4
+        assert len(calls) == 1
+        assert flight.stats()["route"]["coalesced"] == 3
+
+    def test_waiters_give_up_on_a_stuck_leader(self):
+        """After the wait timeout a waiter runs the call itself"""
+        flight = SingleFlight(wait_timeout=0.1)
+        release = threading.Event()
+        leader_started = threading.Event()
+
+        def stuck():
+            leader_started.set()
+            release.wait(5)
+            return "leader"
+
+        with ThreadPoolExecutor(1) as pool:
+            leader = pool.submit(flight.do, "route", "key", stuck)
+            leader_started.wait(5)
+            started = time.monotonic()
+            assert flight.do("route", "key", lambda: "waiter") == "waiter"
+            assert time.monotonic() - started < 2
+            release.set()
+            assert leader.result() == "leader"
+        assert flight.stats()["route"] == {
+            "executions": 1, "coalesced": 1, "in_flight": 0, "timed_out": 1
+        }
+
+    def test_async_waiters_give_up_on_a_stuck_leader(self):
+        """The asyncio path also stops waiting after the timeout"""
+        flight = SingleFlight(wait_timeout=0.05)
+        release = asyncio.Event()
+
+        async def stuck():
+            await release.wait()
+            return "leader"
+
+        async def waiter():
+            return "waiter"
+
+        async def main():
+            leader = asyncio.ensure_future(flight.do_async("route", "key", stuck))
+            await asyncio.sleep(0)
+            result = await flight.do_async("route", "key", waiter)
+            release.set()
+            return result, await leader
+
+        assert asyncio.run(main()) == ("waiter", "leader")
+        assert flight.stats()["route"]["timed_out"] == 1
+
+    def test_calls_after_a_write_do_not_join(self):
+        """A call made after its tables changed runs on its own (read-your-writes)"""
+        release = threading.Event()
+        leader_started = threading.Event()
+        seen = []
+
+        @coalesced("grades")
+        def endpoint(limit):
+            seen.append(len(seen))
+            if len(seen) == 1:
+                leader_started.set()
+                release.wait(5)
+            return len(seen)
+
+        with ThreadPoolExecutor(1) as pool:
+            leader = pool.submit(endpoint, limit=10)
+            leader_started.wait(5)
+            table_versions.bump("grades")
+            assert endpoint(limit=10) == 2
+            release.set()
+            assert leader.result() == 2
+        assert seen == [0, 1]
+
+    def test_route_key(self):
+        """Filters compare by value; the caller's role is part of the key"""
+        def endpoint():
+            pass
+
+        admin = User(id=1, username="a", role=UserRole.admin)
+        other_admin = User(id=2, username="b", role=UserRole.admin)
+        teacher = User(id=3, username="c", role=UserRole.teacher)
+
+        def key(user, subject):
+            filters = GradeFilters(subject=subject, min_score=None, max_score=None, student_id=None,
+                                   class_name=None, student_name=None)
+            return route_key(endpoint, {"filters": filters, "limit": 10, "current_user": user, "db": object()})
+
+        assert key(admin, "Math") == key(other_admin, "Math")
+        assert key(admin, "Math") != key(teacher, "Math")
+        assert key(admin, "Math") != key(admin, "English")
+
+
+class TestCoalescedRoutes:
+    """Tests for concurrent identical requests through the app"""
+
+    @pytest.fixture
+    def slow_round(self, monkeypatch):
+        original = stats._round
+
+        def slow(value):
+            time.sleep(0.3)
+            return original(value)
+
+        monkeypatch.setattr(stats, "_round", slow)
+
+    def test_concurrent_stats_run_once(self, client, auth_headers, slow_round):
+        """Concurrent dashboard-style requests run the aggregation once"""
+        seed(3, 2)
+        before = client.get("/api/stats/single-flight", headers=auth_headers).json()
+        route = "app.routers.stats.get_grades_summary"
+        executed = before.get(route, {}).get("executions", 0)
+
+        results = run_concurrently(
+            4, lambda: client.get("/api/stats/grades/summary", headers=auth_headers)
+        )
+        assert {response.status_code for response in results} == {200}
+        assert len({response.text for response in results}) == 1
+
+        after = client.get("/api/stats/single-flight", headers=auth_headers).json()[route]
+        assert after["executions"] - executed == 1
+        assert after["coalesced"] >= 3
+
+    def test_single_flight_stats_requires_admin(self, client):
+        """Test single-flight stats as a teacher"""
+        client.post("/api/auth/register", json={"username": "t", "password": "pw", "role": "teacher"})
+        token = client.post("/api/auth/login", data={"username": "t", "password": "pw"}).json()["access_token"]
+        response = client.get("/api/stats/single-flight", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 403
@@ -0,0 +1,178 @@
+"""SQLite production profile tests (WAL, read pool, single writer)"""
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[1]
+PROCESSES = 4
+THREADS = 8
+DAYS = 30
+STUDENTS_PER_PROCESS = 3
+
+
+def seed(student_count: int) -> None:
+    """Run in a child process: create the schema, an admin and the students"""
+    from app.auth import get_password_hash
+    from app.database import SessionLocal
+    from app.models.student import Student
+    from app.models.user import User, UserRole
+    import app.main  # noqa: F401  테이블과 인덱스 생성
+
+    with SessionLocal() as db:
+        db.add(User(username="admin", password_hash=get_password_hash("admin"), role=UserRole.admin))
+        db.add_all(
+            Student(name=f"Student {number}", student_number=str(number), class_name=f"{number % 3}반")
+            for number in range(student_count)
+        )
+        db.commit()
+
+
+def hammer(worker: int) -> None:
+    """Run in a child process: create attendance through the API from several threads"""
+    from fastapi.testclient import TestClient
+    from app.auth import create_access_token
+    from app.main import app
+
+    client = TestClient(app, raise_server_exceptions=False)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'admin'})}"}
+    student_ids = range(worker * STUDENTS_PER_PROCESS + 1, (worker + 1) * STUDENTS_PER_PROCESS + 1)
+    jobs = [(student_id, day) for student_id in student_ids for day in range(DAYS)]
+
+    def post(job):
+        student_id, day = job
+        response = client.post("/api/attendance/", headers=headers, json={
+            "student_id": student_id,
+            "date": str(date(2024, 3, 1) + timedelta(days=day)),
+            "status": "출석" if day % 3 else "지각",
+        })
+        client.get(f"/api/attendance/student/{student_id}", headers=headers)
+        return None if response.status_code == 200 else f"{response.status_code} {response.text}"
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        errors = [error for error in pool.map(post, jobs) if error]
+    print(json.dumps({"created": len(jobs) - len(errors), "errors": errors[:5]}))
+
+
+def slow_import() -> None:
+    """Run in a child process: a roster upload that stalls mid-body while
+    another request creates a student"""
+    import asyncio
+    from app.auth import create_access_token
+    from app.main import app
+
+    async def call(path, content_type, parts):
+        parts = list(parts)
+        started = {}
+        # 요청마다 다른 토큰: 인증 캐시를 거치지 않고 DB 에서 사용자를 조회한다
+        token = create_access_token({"sub": "admin", "path": path})
+
+        async def receive():
+            delay, body = parts.pop(0)
+            await asyncio.sleep(delay)
+            return {"type": "http.request", "body": body, "more_body": bool(parts)}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                started["status"] = message["status"]
+
+        try:
+            await app({
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+                "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+                "root_path": "", "client": ("test", 1), "server": ("test", 80),
+                "headers": [(b"authorization", f"Bearer {token}".encode()),
+                            (b"content-type", content_type.encode())],
+            }, receive, send)
+        except Exception:
+            pass  # 500 응답을 보낸 뒤 다시 던져진 예외
+        return started["status"]
+
+    rows = "".join(f"Imported {number},{1000 + number},A\n" for number in range(2000))
+    upload = [(0, b"name,student_number,class_name\n" + rows.encode()), (3, b"Last,9999,A\n")]
+    single = [(0.5, json.dumps({"name": "Single", "student_number": "5000", "class_name": "B"}).encode())]
+
+    async def main():
+        return await asyncio.gather(
+            call("/api/students/import", "text/csv", upload),
+            call("/api/students/", "application/json", single),
+        )
+
+    print(json.dumps(asyncio.run(main())))
+
+
+def run_child(code: str, database: Path, **settings):
+    env = dict(
+        os.environ, DATABASE_URL=f"sqlite:///{database}", SQLITE_PROFILE="production",
+        BCRYPT_ROUNDS="4", **settings,
+    )
+    return subprocess.Popen(
+        [sys.executable, "-c", code], cwd=BACKEND, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+    )
+
+
+class TestSqliteProductionProfile:
+    """Tests for SQLITE_PROFILE=production"""
+
+    def test_pragmas_applied(self, tmp_path):
+        """Test writer and reader connections get their pragmas"""
+        code = (
+            "from app.database import engine, read_engine\n"
+            "with engine.connect() as c: print(c.exec_driver_sql('PRAGMA journal_mode').scalar(),"
+            " c.exec_driver_sql('PRAGMA synchronous').scalar(),"
+            " c.exec_driver_sql('PRAGMA busy_timeout').scalar())\n"
+            "with read_engine.connect() as c: print(c.exec_driver_sql('PRAGMA query_only').scalar())\n"
+        )
+        out, err = run_child(code, tmp_path / "app.db").communicate(timeout=60)
+        assert out.split() == ["wal", "1", "5000", "1"], err
+
+    def test_streaming_import_does_not_block_writes(self, tmp_path):
+        """Test a stalled upload holds no writer connection while it waits for the body"""
+        database = tmp_path / "import.db"
+        seeding = run_child("from tests.test_sqlite_profile import seed; seed(0)", database)
+        _, err = seeding.communicate(timeout=60)
+        assert seeding.returncode == 0, err
+
+        importing = run_child(
+            "from tests.test_sqlite_profile import slow_import; slow_import()", database,
+            SQLITE_BUSY_TIMEOUT_MS="1000", CACHE_BACKEND="memory",
+        )
+        out, err = importing.communicate(timeout=60)
+        assert importing.returncode == 0, err
+        assert json.loads(out.strip().splitlines()[-1]) == [200, 200]
+        with sqlite3.connect(database) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM students").fetchone()[0] == 2002
+
+    def test_concurrent_writers_never_lock(self, tmp_path):
+        """Test several processes creating attendance at once see no lock errors"""
+        database = tmp_path / "stress.db"
+        seeding = run_child(
+            f"from tests.test_sqlite_profile import seed; seed({PROCESSES * STUDENTS_PER_PROCESS})",
+            database,
+        )
+        _, err = seeding.communicate(timeout=60)
+        assert seeding.returncode == 0, err
+
+        workers = [
+            run_child(f"from tests.test_sqlite_profile import hammer; hammer({worker})", database)
+            for worker in range(PROCESSES)
+        ]
+        results = []
+        for worker in workers:
+            out, err = worker.communicate(timeout=120)
+            assert worker.returncode == 0, err
+            assert "database is locked" not in err
+            results.append(json.loads(out.strip().splitlines()[-1]))
+
+        assert [result["errors"] for result in results] == [[]] * PROCESSES
+        expected = PROCESSES * STUDENTS_PER_PROCESS * DAYS
+        with sqlite3.connect(database) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM attendances").fetchone()[0] == expected
+            assert conn.execute(
+                "SELECT SUM(count) FROM attendance_daily_rollups"
+            ).fetchone()[0] == expected
@@ -0,0 +1,199 @@
+"""Statistics API tests"""
+import pytest
+from datetime import date, timedelta
+
+from app.models.attendance import Attendance, AttendanceStatus
+from app.models.grade import Grade
+from app.models.student import Student
+from app.rollups import rebuild_rollups
+from app.routers.stats import stats_cache
+from tests.conftest import TestingSessionLocal
+
+
+STATS_ENDPOINTS = [
+    "/api/stats/dashboard",
+    "/api/stats/attendance/summary",
+    "/api/stats/attendance/daily?days=14",
+    "/api/stats/grades/summary",
+    "/api/stats/grades/by-subject",
+    "/api/stats/grades/distribution",
+    "/api/stats/grades/ranking?limit=5",
+]
+
+
+def seed(student_count, days, start=0):
+    """Insert students with attendance and grades directly through the ORM"""
+    statuses = list(AttendanceStatus)
+    subjects = ["국어", "수학", "영어"]
+    db = TestingSessionLocal()
+    try:
+        students = [
+            Student(name=f"학생{i}", student_number=f"S{i:05d}", class_name=f"{i % 3 + 1}-A")
+            for i in range(start, start + student_count)
+        ]
+        db.add_all(students)
+        db.flush()
+        for i, student in enumerate(students, start):
+            for offset in range(days):
+                db.add(Attendance(
+                    student_id=student.id,
+                    date=date.today() - timedelta(days=offset),
+                    status=statuses[(i + offset) % len(statuses)]
+                ))
+            for j, subject in enumerate(subjects):
+                db.add(Grade(student_id=student.id, subject=subject, score=(i * 7 + j * 13) % 101))
+        db.commit()
+        rebuild_rollups(db)
+    finally:
+        db.close()
+
+
+class TestStatsDashboard:
+    """Tests for GET /api/stats/dashboard endpoint"""
+
+    def test_dashboard_empty(self, client, auth_headers):
+        """Test dashboard with no data"""
+        response = client.get("/api/stats/dashboard", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["student_count"] == 0
+        assert data["class_distribution"] == []
+        assert data["today_attendance"] == {"present": 0, "late": 0, "absent": 0}
+        assert data["average_score"] == 0
+        assert data["total_grades"] == 0
+
+    def test_dashboard_counts(self, client, auth_headers, sample_student):
+        """Test dashboard aggregates"""
+        client.post(
+            "/api/attendance/",
+            headers=auth_headers,
+            json={"student_id": sample_student["id"], "date": str(date.today()), "status": "지각"}
+        )
+        for subject, score in (("Math", 80.0), ("English", 90.0)):
+            client.post(
+                "/api/grades/",
+                headers=auth_headers,
+                json={"student_id": sample_student["id"], "subject": subject, "score": score}
+            )
+
+        data = client.get("/api/stats/dashboard", headers=auth_headers).json()
+        assert data["student_count"] == 1
+        assert data["class_distribution"] == [{"class_name": "Class 1", "count": 1}]
+        assert data["today_attendance"] == {"present": 0, "late": 1, "absent": 0}
+        assert data["average_score"] == 85.0
+        assert data["total_grades"] == 2
+
+    def test_dashboard_unauthorized(self, client):
+        """Test dashboard without authentication"""
+        response = client.get("/api/stats/dashboard")
+        assert response.status_code == 401
+
+
+class TestStatsAttendance:
+    """Tests for GET /api/stats/attendance/* endpoints"""
+
+    def test_attendance_summary(self, client, auth_headers):
+        """Test attendance summary with date range"""
+        seed(student_count=3, days=3)
+        response = client.get("/api/stats/attendance/summary", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 9
+        assert data["present"] + data["late"] + data["absent"] == 9
+        assert data["attendance_rate"] == round(data["present"] / 9 * 100, 1)
+
+        today = str(date.today())
+        data = client.get(
+            f"/api/stats/attendance/summary?start_date={today}&end_date={today}",
+            headers=auth_headers
+        ).json()
+        assert data["total"] == 3
+
+    def test_attendance_daily_fills_missing_days(self, client, auth_headers):
+        """Test daily attendance returns one row per day"""
+        seed(student_count=2, days=2)
+        response = client.get("/api/stats/attendance/daily?days=5", headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        assert [row["date"] for row in data] == [
+            str(date.today() - timedelta(days=offset)) for offset in range(4, -1, -1)
+        ]
+        assert [row["total"] for row in data] == [0, 0, 0, 2, 2]
+
+
+class TestStatsGrades:
+    """Tests for GET /api/stats/grades/* endpoints"""
+
+    def test_grades_by_subject_and_distribution(self, client, auth_headers, sample_student):
+        """Test per-subject averages and letter buckets"""
+        other = client.post(
+            "/api/students/",
+            headers=auth_headers,
+            json={"name": "Other Student", "student_number": "2024002", "class_name": "Class 2"}
+        ).json()
+        for student_id, subject, score in [
+            (sample_student["id"], "Math", 95.0),
+            (other["id"], "Math", 85.0),
+            (sample_student["id"], "English", 55.0),
+        ]:
+            client.post(
+                "/api/grades/",
+                headers=auth_headers,
+                json={"student_id": student_id, "subject": subject, "score": score}
+            )
+
+        subjects = client.get("/api/stats/grades/by-subject", headers=auth_headers).json()
+        assert subjects == [
+            {"subject": "English", "count": 1, "average": 55.0, "stddev": 0.0,
+             "highest": 55.0, "lowest": 55.0},
+            {"subject": "Math", "count": 2, "average": 90.0, "stddev": 5.0,
+             "highest": 95.0, "lowest": 85.0},
+        ]
+
+        distribution = client.get("/api/stats/grades/distribution", headers=auth_headers).json()
+        assert distribution == {"A": 1, "B": 1, "C": 0, "D": 0, "F": 1}
+
+        summary = client.get("/api/stats/grades/summary", headers=auth_headers).json()
+        assert summary == {"total": 3, "average": 78.3, "highest": 95.0, "lowest": 55.0}
+
+    def test_grades_ranking_ties(self, client, auth_headers):
+        """Test ranking uses shared rank for equal averages"""
+        ids = []
+        for number in ("1", "2", "3"):
+            response = client.post(
+                "/api/students/",
+                headers=auth_headers,
+                json={"name": f"Student {number}", "student_number": number, "class_name": "A"}
+            )
+            ids.append(response.json()["id"])
+        for student_id, score in zip(ids, (90.0, 90.0, 70.0)):
+            client.post(
+                "/api/grades/",
+                headers=auth_headers,
+                json={"student_id": student_id, "subject": "Math", "score": score}
+            )
+
+        data = client.get("/api/stats/grades/ranking?limit=10", headers=auth_headers).json()
+        assert [row["rank"] for row in data] == [1, 1, 3]
+        assert [row["student_id"] for row in data] == ids
+
+
+class TestStatsQueryCount:
+    """Stats endpoints must aggregate in SQL, not per row"""
+
+    @pytest.mark.parametrize("endpoint", STATS_ENDPOINTS)
+    def test_query_count_independent_of_rows(self, client, auth_headers, query_counter, endpoint):
+        """Test each endpoint issues the same number of queries for small and large data"""
+        seed(student_count=2, days=2)
+        client.get(endpoint, headers=auth_headers)  # warm the token cache
+        stats_cache.clear()
+        query_counter.clear()
+        assert client.get(endpoint, headers=auth_headers).status_code == 200
+        small = len(query_counter)
+
+        seed(student_count=60, days=10, start=100)
+        stats_cache.clear()
+        query_counter.clear()
+        assert client.get(endpoint, headers=auth_headers).status_code == 200
+        assert len(query_counter) == small
+        assert small <= 5
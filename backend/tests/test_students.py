@@ -1,6 +1,10 @@
 """Student API tests"""
+import time
+
 import pytest
 
+from app.models.student import Student
+
 
 class TestStudentCreate:
     """Tests for POST /api/students/ endpoint"""
@@ -118,3 +122,353 @@ class TestStudentDelete:
         """Test deleting non-existent student"""
         response = client.delete("/api/students/999", headers=auth_headers)
         assert response.status_code == 404
+
+
+class TestStudentImport:
+    """Tests for POST /api/students/import endpoint"""
+
+    def test_import_csv(self, client, auth_headers, sample_student):
+        """Test a streamed CSV roster with duplicate and invalid rows"""
+        body = (
+            "name,student_number,class_name\n"
+            "김민준,2024101,1-A\n"
+            "이서연,2024001,1-B\n"
+            "박도윤,2024101,1-C\n"
+            "최하준,2024102\n"
+            "\"정, 지우\",2024103,2-A\n"
+        ).encode("utf-8")
+        response = client.post(
+            "/api/students/import",
+            headers={**auth_headers, "Content-Type": "text/csv"},
+            content=body
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["imported"], data["failed"]) == (2, 3)
+        assert [(e["index"], e["error"]) for e in sorted(data["errors"], key=lambda e: e["index"])] == [
+            (1, "Student number already exists"),
+            (2, "Student number already exists"),
+            (3, "Expected 3 columns, found 2"),
+        ]
+
+        names = {s["name"] for s in client.get("/api/students/", headers=auth_headers).json()}
+        assert names == {"Test Student", "김민준", "정, 지우"}
+
+    def test_import_ndjson_batches(self, client, auth_headers):
+        """Test an NDJSON roster spanning several batches"""
+        def body():
+            for i in range(4500):
+                yield (
+                    f'{{"name": "Student {i}", "student_number": "N{i:05d}", "class_name": "A"}}\n'
+                ).encode("utf-8")
+            yield b'{"name": "No number", "class_name": "A"}\n'
+
+        response = client.post(
+            "/api/students/import",
+            headers={**auth_headers, "Content-Type": "application/x-ndjson"},
+            content=body()
+        )
+        data = response.json()
+        assert (data["imported"], data["failed"]) == (4500, 1)
+        assert data["errors"][0]["error"].startswith("student_number")
+
+        dashboard = client.get("/api/stats/dashboard", headers=auth_headers).json()
+        assert dashboard["student_count"] == 4500
+
+    def test_import_error_report_is_capped(self, client, auth_headers):
+        """Test only a bounded number of row errors is returned"""
+        body = "name,student_number,class_name\n" + "bad row\n" * 250
+        response = client.post(
+            "/api/students/import",
+            headers={**auth_headers, "Content-Type": "text/csv"},
+            content=body.encode("utf-8")
+        )
+        data = response.json()
+        assert data["failed"] == 250
+        assert len(data["errors"]) == 100
+        assert data["errors_truncated"] is True
+
+
+class TestStudentPagination:
+    """Tests for cursor pagination on GET /api/students/"""
+
+    def test_page_size_is_capped(self, client, auth_headers):
+        """Test limit is clamped to the maximum page size and a cursor continues"""
+        body = "name,student_number,class_name\n" + "".join(
+            f"Student {i},P{i:05d},A\n" for i in range(1205)
+        )
+        client.post(
+            "/api/students/import",
+            headers={**auth_headers, "Content-Type": "text/csv"},
+            content=body.encode("utf-8")
+        )
+
+        first = client.get("/api/students/?limit=5000", headers=auth_headers)
+        assert len(first.json()) == 1000
+        cursor = first.headers["X-Next-Cursor"]
+
+        second = client.get(f"/api/students/?limit=5000&cursor={cursor}", headers=auth_headers)
+        assert len(second.json()) == 205
+        assert second.json()[0]["id"] == first.json()[-1]["id"] + 1
+        assert "X-Next-Cursor" not in second.headers
+
+
+class TestStudentSearch:
+    """Tests for GET /api/students/search on the FTS5 index"""
+
+    @pytest.fixture
+    def roster(self, client, auth_headers):
+        students = [
+            ("김철수", "2024001", "1반"), ("김철민", "2024002", "1반"),
+            ("이영희", "2024003", "2반"), ("박철수", "2023004", "2반"),
+        ]
+        return {
+            name: client.post(
+                "/api/students/",
+                headers=auth_headers,
+                json={"name": name, "student_number": number, "class_name": class_name}
+            ).json()["id"]
+            for name, number, class_name in students
+        }
+
+    def search(self, client, auth_headers, **params):
+        response = client.get("/api/students/search", headers=auth_headers, params=params)
+        assert response.status_code == 200
+        return [student["name"] for student in response.json()]
+
+    def test_substring_and_short_queries(self, client, auth_headers, roster):
+        """Test trigram, 2-character and 1-character name searches"""
+        assert self.search(client, auth_headers, name="김철수") == ["김철수"]
+        assert self.search(client, auth_headers, name="철수") == ["김철수", "박철수"]
+        assert self.search(client, auth_headers, name="희") == ["이영희"]
+        assert self.search(client, auth_headers, student_number="2023") == ["박철수"]
+
+    def test_choseong_search(self, client, auth_headers, roster):
+        """Test 초성 queries of any length"""
+        assert self.search(client, auth_headers, name="ㄱㅊ") == ["김철수", "김철민"]
+        assert self.search(client, auth_headers, name="ㅇㅇㅎ") == ["이영희"]
+        assert self.search(client, auth_headers, q="ㅊㅅ") == ["김철수", "박철수"]
+
+    def test_mixed_syllable_and_choseong(self, client, auth_headers, roster):
+        """Test a query mixing syllables and 초성 keeps the syllables at their positions"""
+        for name, number in (("권민", "2024010"), ("고명", "2024011"), ("이김가마", "2024012")):
+            client.post(
+                "/api/students/", headers=auth_headers,
+                json={"name": name, "student_number": number, "class_name": "3반"}
+            )
+        assert self.search(client, auth_headers, name="김ㅊ") == ["김철수", "김철민"]
+        assert self.search(client, auth_headers, q="김ㅊㅁ") == ["김철민"]
+        assert self.search(client, auth_headers, q="ㄱ철ㅅ") == ["김철수"]
+        # 초성은 어디서든 맞지만 같은 자리의 음절이 달라 제외 (김가, 가마)
+        assert self.search(client, auth_headers, name="김ㅁ") == []
+        assert self.search(client, auth_headers, name="ㄱ명") == ["고명"]
+
+    def test_short_queries_match_every_column(self, client, auth_headers, roster):
+        """Test 1- and 2-character q words also match student numbers and classes"""
+        assert self.search(client, auth_headers, q="2반") == ["이영희", "박철수"]
+        assert self.search(client, auth_headers, q="04") == ["박철수"]
+        assert self.search(client, auth_headers, class_name="1반", q="1") == ["김철수", "김철민"]
+        assert self.search(client, auth_headers, student_number="3") == ["이영희", "박철수"]
+
+    def test_combined_filters(self, client, auth_headers, roster):
+        """Test q, class filter and multiple words combine with AND"""
+        assert self.search(client, auth_headers, q="철수", class_name="2반") == ["박철수"]
+        assert self.search(client, auth_headers, q="김 2024002") == ["김철민"]
+        # FTS5 문법 문자는 검색어로 취급
+        assert self.search(client, auth_headers, q='"철수 OR') == []
+        assert self.search(client, auth_headers, q='철수*') == []
+
+    def test_index_follows_writes(self, client, auth_headers, roster):
+        """Test update, delete and import keep the index in sync"""
+        client.put(f"/api/students/{roster['김철수']}", headers=auth_headers, json={"name": "최민수"})
+        client.delete(f"/api/students/{roster['박철수']}", headers=auth_headers)
+        client.post(
+            "/api/students/import",
+            headers={**auth_headers, "Content-Type": "text/csv"},
+            content="name,student_number,class_name\n정철수,2024100,3반\n".encode("utf-8")
+        )
+
+        assert self.search(client, auth_headers, name="철수") == ["정철수"]
+        assert self.search(client, auth_headers, name="ㅊㅁㅅ") == ["최민수"]
+
+    def test_pagination(self, client, auth_headers, roster):
+        """Test limit and the next-page cursor"""
+        first = client.get("/api/students/search?q=ㄱ&limit=1", headers=auth_headers)
+        assert [student["name"] for student in first.json()] == ["김철수"]
+
+        second = client.get(
+            f"/api/students/search?q=ㄱ&limit=1&cursor={first.headers['X-Next-Cursor']}",
+            headers=auth_headers
+        )
+        assert [student["name"] for student in second.json()] == ["김철민"]
+        assert "X-Next-Cursor" not in second.headers
+
+
+class TestStudentSuggest:
+    """Tests for GET /api/students/suggest and the in-memory prefix index"""
+
+    @pytest.fixture
+    def roster(self, client, auth_headers):
+        students = [
+            ("김철수", "2024001", "1반"), ("김철민", "2024002", "1반"),
+            ("고천석", "2024003", "2반"), ("Alice Kim", "2023004", "2반"),
+        ]
+        return {
+            name: client.post(
+                "/api/students/",
+                headers=auth_headers,
+                json={"name": name, "student_number": number, "class_name": class_name}
+            ).json()["id"]
+            for name, number, class_name in students
+        }
+
+    def suggest(self, client, auth_headers, q, **params):
+        response = client.get("/api/students/suggest", headers=auth_headers, params={"q": q, **params})
+        assert response.status_code == 200
+        return [student["name"] for student in response.json()]
+
+    def test_prefixes(self, client, auth_headers, roster):
+        """Test name, student number, 초성 and mixed prefixes"""
+        assert self.suggest(client, auth_headers, "김철") == ["김철민", "김철수"]
+        assert self.suggest(client, auth_headers, "2023") == ["Alice Kim"]
+        assert self.suggest(client, auth_headers, "alice") == ["Alice Kim"]
+        assert self.suggest(client, auth_headers, "ㄱㅊ") == ["김철민", "김철수", "고천석"]
+        assert self.suggest(client, auth_headers, "김ㅊ") == ["김철민", "김철수"]
+        assert self.suggest(client, auth_headers, "ㄱㅊ", limit=1) == ["김철민"]
+        assert self.suggest(client, auth_headers, "철수") == []
+
+    def test_follows_writes(self, client, auth_headers, roster):
+        """Test create, update, delete and import update the index"""
+        client.put(f"/api/students/{roster['김철수']}", headers=auth_headers, json={"name": "박철수"})
+        client.delete(f"/api/students/{roster['김철민']}", headers=auth_headers)
+        client.post(
+            "/api/students/import",
+            headers={**auth_headers, "Content-Type": "text/csv"},
+            content="name,student_number,class_name\n김영희,2024100,3반\n".encode("utf-8")
+        )
+
+        assert self.suggest(client, auth_headers, "김") == ["김영희"]
+        assert self.suggest(client, auth_headers, "ㅂ") == ["박철수"]
+
+    def test_import_indexes_inserted_rows(self, client, auth_headers, roster, query_counter):
+        """Test imported students reach the index from the insert, not a query after commit"""
+        query_counter.clear()
+        client.post(
+            "/api/students/import",
+            headers={**auth_headers, "Content-Type": "text/csv"},
+            content="name,student_number,class_name\n이영희,2024100,3반\n이영수,2024101,3반\n".encode("utf-8")
+        )
+        # 학번 중복 확인 한 번뿐
+        assert sum("FROM students" in statement for statement in query_counter) == 1
+        assert self.suggest(client, auth_headers, "이영") == ["이영수", "이영희"]
+        assert len(client.get("/api/students/search?q=이영", headers=auth_headers).json()) == 2
+
+    def test_reload_uses_read_sessions(self):
+        """Test the background reload does not take the writer connection"""
+        from app.database import ReadSessionLocal
+        from app.suggest import StudentSuggestIndex
+
+        assert StudentSuggestIndex().session_factory is ReadSessionLocal
+
+    def test_no_queries(self, client, auth_headers, roster, query_counter):
+        """Test a loaded index answers without touching the database"""
+        self.suggest(client, auth_headers, "김")
+        query_counter.clear()
+        self.suggest(client, auth_headers, "ㄱ")
+        # 인증 사용자 캐시도 적중하므로 쿼리 없음
+        assert query_counter == []
+
+    def test_background_reload(self, client, auth_headers, roster):
+        """Test a stale index reloads writes made by another process"""
+        from app.suggest import StudentSuggestIndex
+        from tests.conftest import TestingSessionLocal
+
+        now = [0.0]
+        index = StudentSuggestIndex(TestingSessionLocal, refresh_seconds=60, clock=lambda: now[0])
+        with TestingSessionLocal() as db:
+            index.ensure_loaded(db)
+            db.execute(Student.__table__.insert().values(
+                name="이영희", student_number="2024200", class_name="3반"
+            ))
+            db.commit()
+            assert index.suggest("이") == []
+
+            now[0] = 61
+            index.ensure_loaded(db)
+        for _ in range(100):
+            if index.reloads == 2:
+                break
+            time.sleep(0.01)
+        assert [student["name"] for student in index.suggest("ㅇㅇ")] == ["이영희"]
+
+
+class TestStudentProfile:
+    """Tests for GET /api/students/{id}/profile"""
+
+    @pytest.fixture
+    def classroom(self, client, auth_headers):
+        ids = [
+            client.post(
+                "/api/students/",
+                headers=auth_headers,
+                json={"name": name, "student_number": str(number), "class_name": class_name}
+            ).json()["id"]
+            for number, (name, class_name) in enumerate(
+                (("Kim", "A"), ("Lee", "A"), ("Park", "A"), ("Choi", "B"))
+            )
+        ]
+        client.post("/api/grades/bulk", headers=auth_headers, json=[
+            {"student_id": student_id, "subject": subject, "score": score}
+            for student_id, scores in zip(ids, ((80, 90), (95, 70), (60, 70), (100, 100)))
+            for subject, score in zip(("Math", "English"), scores)
+        ])
+        client.post("/api/attendance/bulk", headers=auth_headers, json={"items": [
+            {"student_id": ids[0], "date": f"2024-03-0{day}", "status": status}
+            for day, status in ((1, "출석"), (2, "출석"), (3, "지각"), (4, "결석"))
+        ]})
+        return ids
+
+    def test_profile(self, client, auth_headers, classroom):
+        """Test the student, attendance page, grades and aggregates"""
+        response = client.get(f"/api/students/{classroom[0]}/profile?limit=3", headers=auth_headers)
+        assert response.status_code == 200
+        profile = response.json()
+
+        assert profile["student"]["name"] == "Kim"
+        assert [row["date"] for row in profile["attendance"]] == ["2024-03-01", "2024-03-02", "2024-03-03"]
+        assert "X-Next-Cursor" in response.headers
+        assert [grade["subject"] for grade in profile["grades"]] == ["English", "Math"]
+
+        stats = profile["attendance_stats"]
+        assert (stats["total"], stats["present"], stats["late"], stats["absent"]) == (4, 2, 1, 1)
+        assert stats["rates"] == {"present": 50.0, "late": 25.0, "absent": 25.0}
+
+        # 반 A 평균: Kim 85, Lee 82.5, Park 65 (반 B 의 Choi 는 제외)
+        grades = profile["grade_stats"]
+        assert (grades["average"], grades["class_rank"], grades["class_size"]) == (85.0, 1, 3)
+        assert grades["subjects"] == [
+            {"subject": "English", "score": 90.0, "class_average": 76.7, "class_rank": 1, "class_size": 3},
+            {"subject": "Math", "score": 80.0, "class_average": 78.3, "class_rank": 2, "class_size": 3},
+        ]
+
+    def test_empty_profile(self, client, auth_headers, sample_student):
+        """Test a student without records"""
+        profile = client.get(f"/api/students/{sample_student['id']}/profile", headers=auth_headers).json()
+        assert profile["attendance"] == [] and profile["grades"] == []
+        assert profile["attendance_stats"]["attendance_rate"] == 0.0
+        assert profile["grade_stats"] == {"average": None, "class_rank": None, "class_size": 0, "subjects": []}
+
+    def test_not_found(self, client, auth_headers):
+        """Test an unknown student id"""
+        response = client.get("/api/students/999/profile", headers=auth_headers)
+        assert response.status_code == 404
+
+    def test_query_count_is_constant(self, client, auth_headers, classroom, query_counter):
+        """Test the profile costs the same number of queries however many rows it has"""
+        def profile_queries(student_id):
+            query_counter.clear()
+            client.get(f"/api/students/{student_id}/profile", headers=auth_headers)
+            return len(query_counter)
+
+        client.get(f"/api/students/{classroom[3]}/profile", headers=auth_headers)
+        assert profile_queries(classroom[0]) == profile_queries(classroom[3]) <= 6
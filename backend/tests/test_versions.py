@@ -0,0 +1,113 @@
+"""Table version and conditional GET tests"""
+from app.models.student import Student
+from app.versions import TableVersions, table_versions
+from tests.conftest import TestingSessionLocal
+from tests.test_stats import STATS_ENDPOINTS, seed
+
+
+def get(client, path, headers, etag=None):
+    if etag is not None:
+        headers = {**headers, "If-None-Match": etag}
+    return client.get(path, headers=headers)
+
+
+class TestTableVersions:
+    """Tests for the shared version counters"""
+
+    def test_versions_shared_through_file(self, tmp_path):
+        """A bump in one process' instance is seen by another on the same file"""
+        path = str(tmp_path / "app.db-versions")
+        first, second = TableVersions(path), TableVersions(path)
+        before = second.get(["students", "grades"])
+        first.bump("students", "students", "rollups")
+        assert second.get(["students", "grades"]) == (before[0] + 1, before[1])
+        assert first.epoch == second.epoch
+        assert second.modified(["students"]) >= second.modified(["grades"])
+        first.close()
+        second.close()
+
+    def test_new_file_new_epoch(self, tmp_path):
+        """Recreated counters never reproduce an old ETag"""
+        assert TableVersions(str(tmp_path / "a")).epoch != TableVersions(str(tmp_path / "b")).epoch
+
+    def test_commit_bumps_written_tables(self, client):
+        """Only committed writes bump, and only the tables they touched"""
+        before = table_versions.get(["students", "grades"])
+        db = TestingSessionLocal()
+        db.add(Student(name="Kim", student_number="S1", class_name="1-A"))
+        db.rollback()
+        assert table_versions.get(["students", "grades"]) == before
+        db.add(Student(name="Kim", student_number="S1", class_name="1-A"))
+        db.commit()
+        db.query(Student).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+        assert table_versions.get(["students", "grades"]) == (before[0] + 2, before[1])
+
+
+class TestConditionalGet:
+    """Tests for ETag / If-None-Match on read routes"""
+
+    def test_repeated_dashboard_loads_run_no_queries(self, client, auth_headers, query_counter):
+        """A dashboard reload with nothing written in between is 304 without SQL"""
+        seed(4, 3)
+        etags = {path: get(client, path, auth_headers).headers["ETag"] for path in STATS_ENDPOINTS}
+        query_counter.clear()
+        for _ in range(3):
+            for path in STATS_ENDPOINTS:
+                response = get(client, path, auth_headers, etags[path])
+                assert response.status_code == 304
+                assert response.headers["ETag"] == etags[path]
+                assert response.content == b""
+        assert query_counter == []
+
+    def test_write_changes_etag(self, client, auth_headers, sample_student):
+        """A write to a table the response depends on gives a fresh 200"""
+        first = get(client, "/api/stats/grades/summary", auth_headers)
+        assert first.headers["Last-Modified"]
+        client.post("/api/attendance/", headers=auth_headers, json={
+            "student_id": sample_student["id"], "date": "2024-03-04", "status": "출석"
+        })
+        assert get(client, "/api/stats/grades/summary", auth_headers, first.headers["ETag"]).status_code == 304
+        client.post("/api/grades/", headers=auth_headers, json={
+            "student_id": sample_student["id"], "subject": "Math", "score": 90
+        })
+        second = get(client, "/api/stats/grades/summary", auth_headers, first.headers["ETag"])
+        assert second.status_code == 200
+        assert second.json()["total"] == 1
+        assert second.headers["ETag"] != first.headers["ETag"]
+
+    def test_list_etag_per_representation(self, client, auth_headers, sample_student):
+        """Query string and Accept each get their own ETag; list headers are kept"""
+        plain = get(client, "/api/students/", auth_headers)
+        paged = get(client, "/api/students/?limit=1", auth_headers)
+        packed = get(client, "/api/students/", {**auth_headers, "Accept": "application/msgpack"})
+        assert len({plain.headers["ETag"], paged.headers["ETag"], packed.headers["ETag"]}) == 3
+        assert get(client, "/api/students/?limit=1", auth_headers, paged.headers["ETag"]).status_code == 304
+        assert get(client, "/api/students/", auth_headers, packed.headers["ETag"]).status_code == 200
+
+    def test_student_delete_changes_dependent_lists(self, client, auth_headers, sample_student):
+        """Deleting a student (bulk delete of its grades) refreshes the grade list"""
+        etag = get(client, "/api/grades/", auth_headers).headers["ETag"]
+        client.delete(f"/api/students/{sample_student['id']}", headers=auth_headers)
+        assert get(client, "/api/grades/", auth_headers, etag).status_code == 200
+
+    def test_conditional_requires_auth(self, client, auth_headers):
+        """A matching ETag is not honoured without a valid token"""
+        etag = get(client, "/api/stats/dashboard", auth_headers).headers["ETag"]
+        assert client.get("/api/stats/dashboard", headers={"If-None-Match": etag}).status_code == 401
+        assert get(client, "/api/stats/dashboard", auth_headers, "*").status_code == 304
+
+    def test_batch_item_etag(self, client, auth_headers):
+        """Batch items revalidate with the etag of an earlier batch result"""
+        first = client.post("/api/batch", headers=auth_headers, json={"requests": [
+            {"path": "/api/stats/grades/summary"},
+        ]}).json()["responses"][0]
+        etag = first["headers"]["etag"]
+        results = client.post("/api/batch", headers=auth_headers, json={"requests": [
+            {"path": "/api/stats/grades/summary", "etag": etag},
+            {"path": "/api/stats/grades/summary", "etag": '"stale"'},
+        ]}).json()["responses"]
+        assert [result["status"] for result in results] == [304, 200]
+        assert results[0]["body"] is None
+        assert results[1]["headers"]["etag"] == etag
@@ -0,0 +1,227 @@
+"""Write coalescer (WRITE_COALESCE) tests"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app.config import settings
+from app.rollups import check_rollups
+from app import write_queue as write_queue_module
+from app.write_queue import WriteCoalescer, write_queue
+from tests.conftest import TestingSessionLocal
+from tests.test_sqlite_profile import run_child
+
+PRODUCTION_WRITES = 12
+
+
+@pytest.fixture
+def coalescing(client, auth_headers, monkeypatch):
+    """Turn the coalescer on against the test database"""
+    monkeypatch.setattr(settings, "WRITE_COALESCE", True)
+    monkeypatch.setattr(settings, "WRITE_BATCH_WINDOW_MS", 50.0)
+    monkeypatch.setattr(settings, "WRITE_BATCH_SIZE", 100)
+    monkeypatch.setattr(write_queue, "session_factory", TestingSessionLocal)
+    client.get("/api/students/", headers=auth_headers)  # warm the token cache
+    yield
+    write_queue.shutdown()
+
+
+@pytest.fixture
+def held_writer(coalescing, monkeypatch):
+    """Stop the writer thread after it takes the first queued write, until
+    ``release`` is set; ``holding`` is set once it waits"""
+    holding, release = threading.Event(), threading.Event()
+    collect = write_queue._collect
+
+    def gated(first):
+        holding.set()
+        release.wait(30)
+        return collect(first)
+
+    monkeypatch.setattr(write_queue, "_collect", gated)
+    yield holding, release
+    release.set()
+
+
+def coalesced_writes() -> None:
+    """Run in a child process: cold-cache attendance writes through the queue
+    on the production pools (one writer connection)"""
+    from fastapi.testclient import TestClient
+    from app.auth import create_access_token
+    from app.main import app
+
+    client = TestClient(app, raise_server_exceptions=False)
+
+    def post(day):
+        # 요청마다 다른 토큰: 인증 캐시를 거치지 않고 DB 에서 사용자를 조회한다
+        token = create_access_token({"sub": "admin", "n": day})
+        response = client.post(
+            "/api/attendance/", headers={"Authorization": f"Bearer {token}"},
+            json={"student_id": 1, "date": str(date(2024, 3, 1) + timedelta(days=day)), "status": "출석"},
+        )
+        return response.status_code
+
+    with ThreadPoolExecutor(4) as pool:
+        print(json.dumps(list(pool.map(post, range(PRODUCTION_WRITES)))))
+
+
+def create_students(client, auth_headers, count):
+    return [
+        client.post(
+            "/api/students/",
+            headers=auth_headers,
+            json={"name": f"Student {number}", "student_number": str(number), "class_name": "A"}
+        ).json()["id"]
+        for number in range(count)
+    ]
+
+
+class TestWriteCoalescer:
+    """Tests for group-committed attendance and grade writes"""
+
+    def test_concurrent_writes_share_commits(self, client, auth_headers, held_writer):
+        """Test a burst is committed in one transaction and duplicates are still rejected"""
+        student_ids = create_students(client, auth_headers, 3)
+        before = write_queue.stats()
+        payloads = [
+            {"student_id": student_id, "date": str(date(2024, 3, 4) + timedelta(days=day)), "status": "출석"}
+            for student_id in student_ids for day in range(10)
+        ]
+        payloads += payloads[:5]  # 같은 배치 안의 중복 날짜
+
+        def post(payload):
+            return client.post("/api/attendance/", headers=auth_headers, json=payload)
+
+        holding, release = held_writer
+        with ThreadPoolExecutor(len(payloads)) as pool:
+            futures = [pool.submit(post, payload) for payload in payloads]
+            # 쓰기 스레드는 첫 요청을 든 채 멈춰 있다: 나머지가 모두 큐에 들어갈 때까지 기다린다
+            assert holding.wait(30)
+            deadline = time.monotonic() + 30
+            while write_queue.stats()["pending"] < len(payloads) - 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert write_queue.stats()["pending"] == len(payloads) - 1
+            release.set()
+            responses = [future.result() for future in futures]
+
+        codes = [response.status_code for response in responses]
+        assert codes.count(200) == 30
+        assert codes.count(400) == 5
+        assert len({response.json()["id"] for response in responses if response.status_code == 200}) == 30
+
+        after = write_queue.stats()
+        assert after["rows"] - before["rows"] == 30
+        assert after["commits"] - before["commits"] == 1
+        assert after["rejected"] - before["rejected"] == 5
+
+        db = TestingSessionLocal()
+        try:
+            assert check_rollups(db) == []
+        finally:
+            db.close()
+
+    def test_errors_reach_their_request(self, client, auth_headers, coalescing):
+        """Test a failed write only fails its own request"""
+        student_id = create_students(client, auth_headers, 1)[0]
+        missing = client.post(
+            "/api/grades/", headers=auth_headers,
+            json={"student_id": 999, "subject": "Math", "score": 90.0}
+        )
+        assert missing.status_code == 404
+
+        first = client.post(
+            "/api/grades/", headers=auth_headers,
+            json={"student_id": student_id, "subject": "Math", "score": 90.0}
+        )
+        assert first.status_code == 200
+        assert first.json()["score"] == 90.0
+
+        duplicate = client.post(
+            "/api/grades/", headers=auth_headers,
+            json={"student_id": student_id, "subject": "Math", "score": 80.0}
+        )
+        assert duplicate.status_code == 400
+        assert len(client.get(f"/api/grades/student/{student_id}", headers=auth_headers).json()) == 1
+
+    def test_session_failure_fails_the_batch(self, client, auth_headers, coalescing, monkeypatch):
+        """Test a writer that cannot open a session fails its batch and keeps running"""
+        student_id = create_students(client, auth_headers, 1)[0]
+
+        def broken():
+            raise RuntimeError("database is unavailable")
+
+        monkeypatch.setattr(write_queue, "session_factory", broken)
+        with pytest.raises(RuntimeError):
+            write_queue.run(lambda db: None)
+
+        monkeypatch.setattr(write_queue, "session_factory", TestingSessionLocal)
+        response = client.post(
+            "/api/attendance/", headers=auth_headers,
+            json={"student_id": student_id, "date": "2024-03-04", "status": "출석"}
+        )
+        assert response.status_code == 200
+        assert write_queue.stats()["failed_commits"] >= 1
+
+    def test_timed_out_writes_are_cancelled(self, monkeypatch):
+        """Test a 503 is only returned for a write that was still queued and is now cancelled"""
+        queue = WriteCoalescer(TestingSessionLocal)
+        monkeypatch.setattr(write_queue_module, "WRITE_RESULT_TIMEOUT_SECONDS", 0.2)
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow(db):
+            started.set()
+            release.wait(5)
+            calls.append("slow")
+            return "slow"
+
+        def queued(db):
+            calls.append("queued")
+            return "queued"
+
+        try:
+            with ThreadPoolExecutor(1) as pool:
+                first = pool.submit(queue.run, slow)
+                assert started.wait(5)
+                # 앞 배치가 끝나지 않아 대기열에 남은 쓰기는 취소되고 실행되지 않는다
+                with pytest.raises(HTTPException) as error:
+                    queue.run(queued)
+                assert error.value.status_code == 503
+                release.set()
+                # 시간이 지났어도 이미 실행 중인 쓰기는 결과를 기다린다
+                assert first.result() == "slow"
+        finally:
+            release.set()
+            queue.shutdown()
+        assert calls == ["slow"]
+
+    def test_production_pool(self, tmp_path):
+        """Test queued writes do not wait on the writer connection held by their own request"""
+        database = tmp_path / "queue.db"
+        seeding = run_child("from tests.test_sqlite_profile import seed; seed(1)", database)
+        _, err = seeding.communicate(timeout=60)
+        assert seeding.returncode == 0, err
+
+        writes = run_child(
+            "from tests.test_write_queue import coalesced_writes; coalesced_writes()", database,
+            WRITE_COALESCE="true", SQLITE_BUSY_TIMEOUT_MS="2000", CACHE_BACKEND="memory",
+        )
+        out, err = writes.communicate(timeout=120)
+        assert writes.returncode == 0, err
+        assert json.loads(out.strip().splitlines()[-1]) == [200] * PRODUCTION_WRITES
+
+    def test_stats_endpoint(self, client, auth_headers, coalescing):
+        """Test the admin stats report commits and rows per commit"""
+        student_id = create_students(client, auth_headers, 1)[0]
+        client.post(
+            "/api/attendance/", headers=auth_headers,
+            json={"student_id": student_id, "date": "2024-03-04", "status": "지각"}
+        )
+        stats = client.get("/api/stats/write-queue", headers=auth_headers).json()
+        assert stats["enabled"] is True
+        assert stats["commits"] >= 1
+        assert stats["rows_per_commit"] >= 1
@@ -30,6 +30,18 @@ api.interceptors.response.use(
   }
 );
 
+// Follow X-Next-Cursor until the last page (list endpoints are paginated)
+const fetchAllPages = async (url, params = {}) => {
+  const items = [];
+  let cursor;
+  do {
+    const response = await api.get(url, { params: { ...params, limit: 1000, cursor } });
+    items.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return { data: items };
+};
+
 // Auth API
 export const authAPI = {
   login: (username, password) => {
@@ -45,27 +57,37 @@ export const authAPI = {
 
 // Students API
 export const studentsAPI = {
-  getAll: () => api.get('/students'),
+  getAll: () => fetchAllPages('/students'),
+  getPage: (params) => api.get('/students', { params }),
   getById: (id) => api.get(`/students/${id}`),
+  getProfile: (id, params) => api.get(`/students/${id}/profile`, { params }),
   search: (params) => api.get('/students/search', { params }),
+  suggest: (q, limit = 10) => api.get('/students/suggest', { params: { q, limit } }),
   create: (data) => api.post('/students', data),
+  importRoster: (file) => api.post('/students/import', file, {
+    headers: { 'Content-Type': file.name?.endsWith('.csv') ? 'text/csv' : 'application/x-ndjson' },
+  }),
   update: (id, data) => api.put(`/students/${id}`, data),
   delete: (id) => api.delete(`/students/${id}`),
 };
 
 // Attendance API
 export const attendanceAPI = {
-  getAll: () => api.get('/attendance'),
+  getAll: (params) => fetchAllPages('/attendance', params),
+  getPage: (params) => api.get('/attendance', { params }),
   getByStudent: (studentId) => api.get(`/attendance/student/${studentId}`),
   create: (data) => api.post('/attendance', data),
+  bulkCreate: (data) => api.post('/attendance/bulk', data),
   delete: (id) => api.delete(`/attendance/${id}`),
 };
 
 // Grades API
 export const gradesAPI = {
-  getAll: () => api.get('/grades'),
+  getAll: (params) => fetchAllPages('/grades', params),
+  getPage: (params) => api.get('/grades', { params }),
   getByStudent: (studentId) => api.get(`/grades/student/${studentId}`),
   create: (data) => api.post('/grades', data),
+  bulkUpsert: (rows) => api.post('/grades/bulk', rows),
   update: (id, data) => api.put(`/grades/${id}`, data),
   delete: (id) => api.delete(`/grades/${id}`),
 };
@@ -86,4 +108,25 @@ export const statsAPI = {
   getGradesRanking: (limit = 10) => api.get(`/stats/grades/ranking?limit=${limit}`),
 };
 
+// Batch API - several GETs in one request; resolves to [{ status, headers, body }, ...]
+// Items are sent with the ETag of their last result and a 304 reuses that body.
+const batchCache = new Map();
+
+export const batchAPI = {
+  get: async (requests) => {
+    const keys = requests.map((item) => JSON.stringify([item.path, item.params || {}]));
+    const response = await api.post('/batch', {
+      requests: requests.map((item, index) => ({ ...item, etag: batchCache.get(keys[index])?.etag })),
+    });
+    return response.data.responses.map((res, index) => {
+      const cached = batchCache.get(keys[index]);
+      if (res.status === 304 && cached) return { ...res, status: 200, body: cached.body };
+      if (res.status === 200 && res.headers.etag) {
+        batchCache.set(keys[index], { etag: res.headers.etag, body: res.body });
+      }
+      return res;
+    });
+  },
+};
+
 export default api;
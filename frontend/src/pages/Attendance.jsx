@@ -1,6 +1,9 @@
 import { useState, useEffect } from 'react';
 import { attendanceAPI, studentsAPI } from '../api';
 
+// 이름 검색은 입력이 멈춘 뒤 한 번만 조회한다
+const FILTER_DEBOUNCE_MS = 300;
+
 const Attendance = () => {
   const [attendances, setAttendances] = useState([]);
   const [students, setStudents] = useState([]);
@@ -16,16 +19,19 @@ const Attendance = () => {
     date: '',
     status: '전체',
   });
-  const [filteredData, setFilteredData] = useState([]);
+  // 이름 입력창 값; filters.studentName 에는 지연 반영된다
+  const [studentNameInput, setStudentNameInput] = useState('');
+  const hasFilters = Boolean(studentNameInput || filters.date || filters.status !== '전체');
 
+  // 필터는 서버에서 적용하므로 조건에 맞는 행만 받아온다
   const fetchData = async () => {
+    const params = { include: 'student' };
+    if (filters.studentName) params.student_name = filters.studentName;
+    if (filters.date) params.date = filters.date;
+    if (filters.status !== '전체') params.status = filters.status;
     try {
-      const [attendanceRes, studentsRes] = await Promise.all([
-        attendanceAPI.getAll(),
-        studentsAPI.getAll(),
-      ]);
-      setAttendances(attendanceRes.data);
-      setStudents(studentsRes.data);
+      const response = await attendanceAPI.getAll(params);
+      setAttendances(response.data);
     } catch (error) {
       console.error('데이터 조회 실패:', error);
     } finally {
@@ -34,33 +40,24 @@ const Attendance = () => {
   };
 
   useEffect(() => {
-    fetchData();
+    studentsAPI.getAll()
+      .then((response) => setStudents(response.data))
+      .catch((error) => console.error('학생 목록 조회 실패:', error));
   }, []);
 
   useEffect(() => {
-    let result = attendances;
-
-    if (filters.studentName) {
-      result = result.filter((attendance) => {
-        const studentName = getStudentName(attendance.student_id);
-        return studentName.toLowerCase().includes(filters.studentName.toLowerCase());
-      });
-    }
-
-    if (filters.date) {
-      result = result.filter((attendance) =>
-        attendance.date === filters.date
-      );
-    }
+    const timer = setTimeout(
+      () => setFilters((current) => (
+        current.studentName === studentNameInput ? current : { ...current, studentName: studentNameInput }
+      )),
+      FILTER_DEBOUNCE_MS
+    );
+    return () => clearTimeout(timer);
+  }, [studentNameInput]);
 
-    if (filters.status && filters.status !== '전체') {
-      result = result.filter((attendance) =>
-        attendance.status === filters.status
-      );
-    }
-
-    setFilteredData(result);
-  }, [attendances, filters, students]);
+  useEffect(() => {
+    fetchData();
+  }, [filters]);
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -91,11 +88,6 @@ const Attendance = () => {
     }
   };
 
-  const getStudentName = (studentId) => {
-    const student = students.find((s) => s.id === studentId);
-    return student ? student.name : '알 수 없음';
-  };
-
   const getStatusColor = (status) => {
     switch (status) {
       case '출석':
@@ -110,6 +102,7 @@ const Attendance = () => {
   };
 
   const handleResetFilters = () => {
+    setStudentNameInput('');
     setFilters({
       studentName: '',
       date: '',
@@ -140,8 +133,8 @@ const Attendance = () => {
             <label className="block text-sm font-medium text-gray-700 mb-1">학생 이름 검색</label>
             <input
               type="text"
-              value={filters.studentName}
-              onChange={(e) => setFilters({ ...filters, studentName: e.target.value })}
+              value={studentNameInput}
+              onChange={(e) => setStudentNameInput(e.target.value)}
               placeholder="학생 이름 입력"
               className="w-full px-3 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500 outline-none"
             />
@@ -178,7 +171,7 @@ const Attendance = () => {
           </div>
         </div>
         <div className="mt-4 text-sm text-gray-600">
-          총 {filteredData.length}건 (전체 {attendances.length}건)
+          총 {attendances.length}건
         </div>
       </div>
 
@@ -194,11 +187,11 @@ const Attendance = () => {
             </tr>
           </thead>
           <tbody className="divide-y">
-            {filteredData.map((attendance) => (
+            {attendances.map((attendance) => (
               <tr key={attendance.id} className="hover:bg-gray-50">
                 <td className="px-6 py-4">{attendance.id}</td>
                 <td className="px-6 py-4 font-medium">
-                  {getStudentName(attendance.student_id)}
+                  {attendance.student_name}
                 </td>
                 <td className="px-6 py-4">{attendance.date}</td>
                 <td className="px-6 py-4">
@@ -222,9 +215,9 @@ const Attendance = () => {
             ))}
           </tbody>
         </table>
-        {filteredData.length === 0 && (
+        {attendances.length === 0 && (
           <div className="text-center py-8 text-gray-500">
-            {attendances.length === 0 ? '출결 기록이 없습니다.' : '필터 결과가 없습니다.'}
+            {hasFilters ? '필터 결과가 없습니다.' : '출결 기록이 없습니다.'}
           </div>
         )}
       </div>
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { statsAPI } from '../api';
+import { batchAPI } from '../api';
 import {
   PieChart, Pie, Cell, BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend,
   LineChart, Line, ResponsiveContainer
@@ -18,18 +18,21 @@ const Dashboard = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [dashboardRes, attendanceRes, subjectRes, distRes, dailyRes] = await Promise.all([
-          statsAPI.getDashboard(),
-          statsAPI.getAttendanceSummary(),
-          statsAPI.getGradesBySubject(),
-          statsAPI.getGradesDistribution(),
-          statsAPI.getAttendanceDaily(14),
+        const responses = await batchAPI.get([
+          { path: '/api/stats/dashboard' },
+          { path: '/api/stats/attendance/summary' },
+          { path: '/api/stats/grades/by-subject' },
+          { path: '/api/stats/grades/distribution' },
+          { path: '/api/stats/attendance/daily', params: { days: 14 } },
         ]);
-        setDashboardData(dashboardRes.data);
-        setAttendanceData(attendanceRes.data);
-        setGradesBySubject(subjectRes.data);
-        setGradeDistribution(distRes.data);
-        setDailyAttendance(dailyRes.data);
+        const failed = responses.find((res) => res.status !== 200);
+        if (failed) throw new Error(`Dashboard request failed with ${failed.status}`);
+        const [dashboard, attendance, bySubject, distribution, daily] = responses.map((res) => res.body);
+        setDashboardData(dashboard);
+        setAttendanceData(attendance);
+        setGradesBySubject(bySubject);
+        setGradeDistribution(distribution);
+        setDailyAttendance(daily);
       } catch (error) {
         console.error('Data loading failed:', error);
       } finally {
@@ -1,6 +1,9 @@
 import { useState, useEffect } from 'react';
 import { gradesAPI, studentsAPI } from '../api';
 
+// 텍스트 필터는 입력이 멈춘 뒤 한 번만 조회한다
+const FILTER_DEBOUNCE_MS = 300;
+
 const Grades = () => {
   const [grades, setGrades] = useState([]);
   const [students, setStudents] = useState([]);
@@ -12,20 +15,22 @@ const Grades = () => {
     subject: '',
     score: '',
   });
-  const [filters, setFilters] = useState({
+  // filterInput 은 입력창 값, filters 는 조회에 쓰는 (지연 반영된) 값
+  const [filterInput, setFilterInput] = useState({
     studentName: '',
     subject: '',
   });
-  const [filteredData, setFilteredData] = useState([]);
+  const [filters, setFilters] = useState(filterInput);
+  const hasFilters = Boolean(filterInput.studentName || filterInput.subject);
 
+  // 필터는 서버에서 적용하므로 조건에 맞는 행만 받아온다
   const fetchData = async () => {
+    const params = { include: 'student' };
+    if (filters.studentName) params.student_name = filters.studentName;
+    if (filters.subject) params.subject = filters.subject;
     try {
-      const [gradesRes, studentsRes] = await Promise.all([
-        gradesAPI.getAll(),
-        studentsAPI.getAll(),
-      ]);
-      setGrades(gradesRes.data);
-      setStudents(studentsRes.data);
+      const response = await gradesAPI.getAll(params);
+      setGrades(response.data);
     } catch (error) {
       console.error('데이터 조회 실패:', error);
     } finally {
@@ -34,27 +39,19 @@ const Grades = () => {
   };
 
   useEffect(() => {
-    fetchData();
+    studentsAPI.getAll()
+      .then((response) => setStudents(response.data))
+      .catch((error) => console.error('학생 목록 조회 실패:', error));
   }, []);
 
   useEffect(() => {
-    let result = grades;
-
-    if (filters.studentName) {
-      result = result.filter((grade) => {
-        const studentName = getStudentName(grade.student_id);
-        return studentName.toLowerCase().includes(filters.studentName.toLowerCase());
-      });
-    }
-
-    if (filters.subject) {
-      result = result.filter((grade) =>
-        grade.subject.toLowerCase().includes(filters.subject.toLowerCase())
-      );
-    }
+    const timer = setTimeout(() => setFilters(filterInput), FILTER_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [filterInput]);
 
-    setFilteredData(result);
-  }, [grades, filters, students]);
+  useEffect(() => {
+    fetchData();
+  }, [filters]);
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -104,11 +101,6 @@ const Grades = () => {
     setShowModal(true);
   };
 
-  const getStudentName = (studentId) => {
-    const student = students.find((s) => s.id === studentId);
-    return student ? student.name : '알 수 없음';
-  };
-
   const getScoreColor = (score) => {
     if (score >= 90) return 'text-green-600';
     if (score >= 70) return 'text-blue-600';
@@ -117,10 +109,12 @@ const Grades = () => {
   };
 
   const handleResetFilters = () => {
-    setFilters({
+    const empty = {
       studentName: '',
       subject: '',
-    });
+    };
+    setFilterInput(empty);
+    setFilters(empty);
   };
 
   if (loading) {
@@ -146,8 +140,8 @@ const Grades = () => {
             <label className="block text-sm font-medium text-gray-700 mb-1">학생 이름 검색</label>
             <input
               type="text"
-              value={filters.studentName}
-              onChange={(e) => setFilters({ ...filters, studentName: e.target.value })}
+              value={filterInput.studentName}
+              onChange={(e) => setFilterInput({ ...filterInput, studentName: e.target.value })}
               placeholder="학생 이름 입력"
               className="w-full px-3 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500 outline-none"
             />
@@ -156,8 +150,8 @@ const Grades = () => {
             <label className="block text-sm font-medium text-gray-700 mb-1">과목 검색</label>
             <input
               type="text"
-              value={filters.subject}
-              onChange={(e) => setFilters({ ...filters, subject: e.target.value })}
+              value={filterInput.subject}
+              onChange={(e) => setFilterInput({ ...filterInput, subject: e.target.value })}
               placeholder="과목명 입력"
               className="w-full px-3 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500 outline-none"
             />
@@ -172,7 +166,7 @@ const Grades = () => {
           </div>
         </div>
         <div className="mt-4 text-sm text-gray-600">
-          총 {filteredData.length}건 (전체 {grades.length}건)
+          총 {grades.length}건
         </div>
       </div>
 
@@ -188,10 +182,10 @@ const Grades = () => {
             </tr>
           </thead>
           <tbody className="divide-y">
-            {filteredData.map((grade) => (
+            {grades.map((grade) => (
               <tr key={grade.id} className="hover:bg-gray-50">
                 <td className="px-6 py-4">{grade.id}</td>
-                <td className="px-6 py-4 font-medium">{getStudentName(grade.student_id)}</td>
+                <td className="px-6 py-4 font-medium">{grade.student_name}</td>
                 <td className="px-6 py-4">{grade.subject}</td>
                 <td className={`px-6 py-4 font-bold ${getScoreColor(grade.score)}`}>
                   {grade.score}
@@ -214,9 +208,9 @@ const Grades = () => {
             ))}
           </tbody>
         </table>
-        {filteredData.length === 0 && (
+        {grades.length === 0 && (
           <div className="text-center py-8 text-gray-500">
-            {grades.length === 0 ? '성적 기록이 없습니다.' : '필터 결과가 없습니다.'}
+            {hasFilters ? '필터 결과가 없습니다.' : '성적 기록이 없습니다.'}
           </div>
         )}
       </div>